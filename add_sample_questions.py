@@ -3,10 +3,12 @@
 Script to add 100 sample questions to the Q&A platform
 """
 
-from app import app, db, User, Question, Tag, Answer
+from app import create_app, db, User, Question, Tag, Answer
 from datetime import datetime, timedelta
 import random
 
+app = create_app()
+
 def create_sample_questions():
     with app.app_context():
         # Get existing user or create one
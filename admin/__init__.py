@@ -0,0 +1,56 @@
+"""
+Admin-only operational endpoints for Q&A Platform
+"""
+
+from functools import wraps
+import hmac
+
+from flask import abort, current_app, request
+from flask_login import current_user
+
+
+def has_admin_token():
+    """Whether the request carries the bearer ADMIN_TOKEN"""
+    token = current_app.config.get('ADMIN_TOKEN')
+    auth = request.headers.get('Authorization', '')
+    return bool(token) and auth.startswith('Bearer ') and hmac.compare_digest(auth[7:], token)
+
+
+def is_admin():
+    """Bearer ADMIN_TOKEN (for scripts) or a logged-in user listed in ADMIN_USERNAMES"""
+    if has_admin_token():
+        return True
+    return current_user.is_authenticated and current_user.username in current_app.config.get('ADMIN_USERNAMES', ())
+
+
+def admin_required(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_admin():
+            abort(403)
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def register_admin_blueprints(app, csrf=None):
+    """Register all admin blueprints under /admin"""
+    from .export import export_bp
+    from .imports import imports_bp
+    from .profiling import profiling_bp
+    from .slow_queries import slow_queries_bp
+
+    for blueprint in (profiling_bp, slow_queries_bp, export_bp, imports_bp):
+        app.register_blueprint(blueprint, url_prefix='/admin')
+        if csrf is not None:
+            # Token clients (scripts) carry no CSRF token and cannot be forged
+            # cross-site; requests riding on the login cookie still need one.
+            # The hook goes on the app, so each create_app() gets its own
+            csrf.exempt(blueprint)
+            app.before_request_funcs.setdefault(blueprint.name, []).append(_protect_session_requests(csrf))
+
+
+def _protect_session_requests(csrf):
+    def protect():
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE') and not has_admin_token():
+            csrf.protect()
+    return protect
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from admin import admin_required
+from services.export import ENTITIES, FORMATS, export
+from utils.compression import accepts_gzip
+
+export_bp = Blueprint('export_admin', __name__)
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+@export_bp.route('/export/<entity>', methods=['GET'])
+@admin_required
+def export_entity(entity):
+    """Stream every row of an entity as NDJSON or CSV (?format=, ?since=ISO-8601, ?after_id=)"""
+    fmt = request.args.get('format', 'ndjson')
+    if entity not in ENTITIES:
+        return jsonify({'error': f"Unknown entity; expected one of {', '.join(ENTITIES)}"}), 404
+    if fmt not in FORMATS:
+        return jsonify({'error': f"Unknown format; expected one of {', '.join(FORMATS)}"}), 400
+
+    since = request.args.get('since')
+    if since:
+        try:
+            since = datetime.fromisoformat(since.replace('Z', '+00:00'))
+        except ValueError:
+            return jsonify({'error': 'since must be an ISO-8601 timestamp'}), 400
+    after_id = request.args.get('after_id', type=int)
+    compress = accepts_gzip(request.headers.get('Accept-Encoding'))
+
+    response = Response(stream_with_context(export(entity, fmt, since or None, after_id, compress)),
+                        mimetype=CONTENT_TYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename={entity}.{fmt}{".gz" if compress else ""}'
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['X-Accel-Buffering'] = 'no'  # let proxies pass chunks straight through
+    return response
@@ -0,0 +1,36 @@
+from flask import Blueprint, jsonify, request
+
+from admin import admin_required
+from services.importer import BulkImporter, ImportFailed
+
+imports_bp = Blueprint('imports_admin', __name__)
+
+@imports_bp.route('/import/<source>', methods=['POST'])
+@admin_required
+def import_source(source):
+    """Import an NDJSON request body; POST the same body again to resume a failed run"""
+    chunk_size = min(request.args.get('chunk_size', 1000, type=int), 10000)
+    try:
+        report = BulkImporter(source, chunk_size).run(request.stream)
+    except ImportFailed as e:
+        return jsonify({'error': str(e)}), 409
+    return jsonify(report)
+
+@imports_bp.route('/import/<source>', methods=['GET'])
+@admin_required
+def import_status(source):
+    """Progress of an import run"""
+    from app import ImportRun, db
+
+    run = db.session.get(ImportRun, source)
+    if run is None:
+        return jsonify({'error': 'Unknown import source'}), 404
+    return jsonify({
+        'source': run.source,
+        'status': run.status,
+        'position': run.position,
+        'imported': run.imported,
+        'rejected': run.rejected,
+        'started_at': run.started_at.isoformat() if run.started_at else None,
+        'finished_at': run.finished_at.isoformat() if run.finished_at else None
+    })
@@ -0,0 +1,100 @@
+from flask import Blueprint, Response, jsonify, request
+
+from admin import admin_required
+from utils.profiling import memory_snapshots, profiler
+
+profiling_bp = Blueprint('profiling_admin', __name__)
+
+@profiling_bp.route('/profile', methods=['GET'])
+@admin_required
+def profile_status():
+    """Current profiling state for this worker"""
+    return jsonify({
+        'requests': profiler.status(),
+        'memory_snapshots': memory_snapshots.listing()
+    })
+
+@profiling_bp.route('/profile', methods=['POST'])
+@admin_required
+def start_profile():
+    """Profile the next N requests whose path matches a regex"""
+    data = request.get_json() or {}
+    pattern = data.get('pattern', '.*')
+    try:
+        count = max(1, min(int(data.get('requests', 10)), 1000))
+        interval_ms = max(float(data.get('sample_interval_ms', 5)), 1)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'requests and sample_interval_ms must be numbers'}), 400
+
+    try:
+        profiler.arm(pattern, count, sample_interval=interval_ms / 1000)
+    except Exception as e:
+        return jsonify({'error': f'Invalid pattern: {e}'}), 400
+
+    return jsonify(profiler.status()), 202
+
+@profiling_bp.route('/profile', methods=['DELETE'])
+@admin_required
+def reset_profile():
+    """Discard collected profiles and disarm"""
+    profiler.reset()
+    return jsonify(profiler.status())
+
+@profiling_bp.route('/profile/stats.pstats', methods=['GET'])
+@admin_required
+def download_pstats():
+    """Aggregated cProfile data in pstats format"""
+    data = profiler.dump_pstats()
+    if data is None:
+        return jsonify({'error': 'No profiled requests yet'}), 404
+    return Response(data, mimetype='application/octet-stream',
+                    headers={'Content-Disposition': 'attachment; filename=profile.pstats'})
+
+@profiling_bp.route('/profile/stats.txt', methods=['GET'])
+@admin_required
+def pstats_report():
+    """Human-readable pstats listing"""
+    sort = request.args.get('sort', 'cumulative')
+    limit = request.args.get('limit', 50, type=int)
+    try:
+        return Response(profiler.report(sort, limit), mimetype='text/plain')
+    except KeyError:
+        return jsonify({'error': f'Unknown sort key: {sort}'}), 400
+
+@profiling_bp.route('/profile/stacks.txt', methods=['GET'])
+@admin_required
+def collapsed_stacks():
+    """Sampled stacks in collapsed format for flame graphs"""
+    return Response(profiler.sampler.collapsed(), mimetype='text/plain',
+                    headers={'Content-Disposition': 'attachment; filename=stacks.collapsed.txt'})
+
+@profiling_bp.route('/profile/memory', methods=['POST'])
+@admin_required
+def take_memory_snapshot():
+    """Take a tracemalloc snapshot (starts tracing on first use)"""
+    frames = max(1, min(request.args.get('frames', 25, type=int), 100))
+    snapshot_id = memory_snapshots.take(frames)
+    return jsonify({'id': snapshot_id, 'snapshots': memory_snapshots.listing()}), 201
+
+@profiling_bp.route('/profile/memory', methods=['DELETE'])
+@admin_required
+def stop_memory_tracing():
+    """Drop snapshots and stop tracemalloc"""
+    memory_snapshots.stop()
+    return jsonify({'snapshots': []})
+
+@profiling_bp.route('/profile/memory/diff', methods=['GET'])
+@admin_required
+def memory_diff():
+    """Top allocation differences between two snapshots"""
+    from_id = request.args.get('from', type=int)
+    to_id = request.args.get('to', type=int)
+    key_type = request.args.get('key', 'lineno')
+    limit = request.args.get('limit', 30, type=int)
+
+    if key_type not in ('lineno', 'filename', 'traceback'):
+        return jsonify({'error': 'key must be lineno, filename or traceback'}), 400
+    if from_id not in memory_snapshots.snapshots or to_id not in memory_snapshots.snapshots:
+        return jsonify({'error': 'Unknown snapshot id'}), 404
+
+    return Response(memory_snapshots.diff(from_id, to_id, key_type, limit), mimetype='text/plain')
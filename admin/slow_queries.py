@@ -0,0 +1,25 @@
+from flask import Blueprint, jsonify, request
+
+from admin import admin_required
+from utils.slow_queries import slow_query_log
+
+slow_queries_bp = Blueprint('slow_queries_admin', __name__)
+
+@slow_queries_bp.route('/slow-queries', methods=['GET'])
+@admin_required
+def list_slow_queries():
+    """Slow statement shapes ranked by total time, with plans and call sites"""
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    route = request.args.get('route')
+
+    return jsonify({
+        'threshold_ms': slow_query_log.threshold * 1000,
+        'queries': slow_query_log.ranked(limit=limit, route=route)
+    })
+
+@slow_queries_bp.route('/slow-queries', methods=['DELETE'])
+@admin_required
+def clear_slow_queries():
+    """Reset the slow query log"""
+    slow_query_log.clear()
+    return jsonify({'success': True})
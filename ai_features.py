@@ -4,11 +4,38 @@ AI-powered features for Q&A Platform
 """
 
 import re
+import threading
+import time
 from collections import Counter
 from difflib import SequenceMatcher
 import random
 from datetime import datetime, timedelta
 
+from utils.aho_corasick import AhoCorasick
+from utils.metrics import timed
+
+# Built-in keyword -> tags map, used until the tag_keyword table is seeded
+# (see init_tag_keywords.py). The first tag of each entry is the primary match.
+DEFAULT_TAG_KEYWORDS = {
+    'python': ['python', 'programming'],
+    'javascript': ['javascript', 'web-development', 'frontend'],
+    'react': ['react', 'javascript', 'frontend'],
+    'flask': ['flask', 'python', 'web-development'],
+    'django': ['django', 'python', 'web-development'],
+    'sql': ['sql', 'database'],
+    'database': ['database', 'sql'],
+    'api': ['api', 'rest', 'backend'],
+    'html': ['html', 'frontend', 'web-development'],
+    'css': ['css', 'frontend', 'web-development'],
+    'docker': ['docker', 'devops', 'containers'],
+    'git': ['git', 'version-control'],
+    'machine learning': ['machine-learning', 'ai', 'python'],
+    'ai': ['ai', 'machine-learning'],
+    'security': ['security', 'authentication'],
+    'testing': ['testing', 'unit-testing'],
+    'performance': ['performance', 'optimization']
+}
+
 class AIRecommendationEngine:
     def __init__(self):
         self.stop_words = set([
@@ -47,6 +74,7 @@ class AIRecommendationEngine:
         
         return similarity
     
+    @timed('similar_questions')
     def get_similar_questions(self, question_id, limit=5):
         """Get similar questions based on content"""
         from flask import current_app
@@ -74,6 +102,7 @@ class AIRecommendationEngine:
         similarities.sort(key=lambda x: x[1], reverse=True)
         return [q[0] for q in similarities[:limit]]
     
+    @timed('recommend_questions')
     def recommend_questions_for_user(self, user_id, limit=10):
         """Recommend questions based on user's interests and activity"""
         from flask import current_app
@@ -126,6 +155,7 @@ class SmartSearchEngine:
     def __init__(self):
         self.ai_engine = AIRecommendationEngine()
     
+    @timed('search_questions')
     def search_questions(self, query, user_id=None, limit=20):
         """Advanced search with AI-powered ranking"""
         from flask import current_app
@@ -179,6 +209,7 @@ class SmartSearchEngine:
         # Return just the questions (they're still attached to the session)
         return [q[0] for q in ranked_results[:limit]]
     
+    @timed('trending_topics')
     def get_trending_topics(self, days=7, limit=10):
         """Get trending topics based on recent activity"""
         from flask import current_app
@@ -219,6 +250,7 @@ class SmartSearchEngine:
         return trending_topics
 
 class ContentAnalyzer:
+    @timed('question_quality')
     def analyze_question_quality(self, question):
         """Analyze question quality for moderation and ranking"""
         quality_score = 0.0
@@ -254,50 +286,116 @@ class ContentAnalyzer:
         
         return min(quality_score, 1.0)
     
+    @timed('suggest_tags')
     def suggest_tags(self, title, content, limit=5):
         """Suggest relevant tags based on content"""
-        from flask import current_app
-        from app import Tag
+        from services.tag_resolver import tag_resolver
         
-        # Get the database session from the current app context
-        db = current_app.extensions['sqlalchemy'].db
+        ranked = tag_suggester.rank(title or '', content or '')
         
-        combined_text = (title + ' ' + content).lower()
-        
-        # Common tech keywords and their associated tags
-        tech_keywords = {
-            'python': ['python', 'programming'],
-            'javascript': ['javascript', 'web-development', 'frontend'],
-            'react': ['react', 'javascript', 'frontend'],
-            'flask': ['flask', 'python', 'web-development'],
-            'django': ['django', 'python', 'web-development'],
-            'sql': ['sql', 'database'],
-            'database': ['database', 'sql'],
-            'api': ['api', 'rest', 'backend'],
-            'html': ['html', 'frontend', 'web-development'],
-            'css': ['css', 'frontend', 'web-development'],
-            'docker': ['docker', 'devops', 'containers'],
-            'git': ['git', 'version-control'],
-            'machine learning': ['machine-learning', 'ai', 'python'],
-            'ai': ['ai', 'machine-learning'],
-            'security': ['security', 'authentication'],
-            'testing': ['testing', 'unit-testing'],
-            'performance': ['performance', 'optimization']
-        }
-        
-        suggested_tags = []
-        for keyword, tags in tech_keywords.items():
-            if keyword in combined_text:
-                suggested_tags.extend(tags)
-        
-        # Remove duplicates and limit
-        suggested_tags = list(set(suggested_tags))[:limit]
-        
-        # Verify tags exist in database
-        valid_tags = []
-        for tag_name in suggested_tags:
-            tag = db.session.query(Tag).filter_by(name=tag_name).first()
-            if tag:
-                valid_tags.append(tag)
+        # Suggestions only cover existing tags; load them in one batch
+        return tag_resolver.get_tags(ranked[:limit], create=False)
+
+class TagSuggester:
+    """Keyword -> tag index compiled into an Aho-Corasick automaton.
+    
+    Built on first use, then rebuilt on a background thread whenever the
+    'tag_vocabulary' version changes, so lookups never wait on the database.
+    """
+    VERSION_CHECK_INTERVAL = 1.0  # seconds between version stamp checks
+    TITLE_BOOST = 2.0
+    SECONDARY_TAG_WEIGHT = 0.5
+    
+    def __init__(self):
+        self.automaton = None
+        self.version = None
+        self._checked_at = 0.0
+        self._rebuilding = False
+        self._lock = threading.Lock()
+    
+    def _current_version(self):
+        from utils.versions import get_versions
+        return get_versions(['tag_vocabulary'])['tag_vocabulary'][0]
+    
+    def load_keywords(self):
+        """Return {keyword: {tag name: weight}} from tag_keyword rows (or the defaults) plus every tag name"""
+        from app import Tag, TagKeyword, db
+        
+        vocabulary = {name for (name,) in db.session.query(Tag.name)}
+        keywords = {}
+        
+        rows = db.session.query(TagKeyword.keyword, TagKeyword.tag_name, TagKeyword.weight).all()
+        if not rows:
+            rows = [(keyword, tag_name, 1.0 if position == 0 else self.SECONDARY_TAG_WEIGHT)
+                    for keyword, tag_names in DEFAULT_TAG_KEYWORDS.items()
+                    for position, tag_name in enumerate(tag_names)]
+        for keyword, tag_name, weight in rows:
+            if tag_name in vocabulary:
+                keywords.setdefault(keyword.lower(), {})[tag_name] = weight or 1.0
+        
+        # Every tag matches its own name ('machine-learning' also as 'machine learning')
+        for name in vocabulary:
+            for keyword in {name.lower(), name.lower().replace('-', ' ')}:
+                keywords.setdefault(keyword, {}).setdefault(name, 1.0)
+        
+        return keywords
+    
+    def build(self):
+        """Compile the automaton from the current vocabulary"""
+        version = self._current_version()
+        automaton = AhoCorasick(self.load_keywords())
+        with self._lock:
+            self.automaton, self.version = automaton, version
+        return automaton
+    
+    def _rebuild_in_background(self, app):
+        def run():
+            try:
+                with app.app_context():
+                    self.build()
+            except Exception as e:
+                print(f"Tag suggester rebuild failed: {e}")
+            finally:
+                self._rebuilding = False
+        
+        threading.Thread(target=run, name='tag-suggester-rebuild', daemon=True).start()
+    
+    def refresh(self):
+        """Build on first use; afterwards schedule a rebuild when the vocabulary changes"""
+        from flask import current_app
         
-        return valid_tags
+        if self.automaton is None:
+            self.build()
+            return
+        
+        now = time.monotonic()
+        if now - self._checked_at < self.VERSION_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        
+        if self._current_version() != self.version:
+            with self._lock:
+                if self._rebuilding:
+                    return
+                self._rebuilding = True
+            self._rebuild_in_background(current_app._get_current_object())
+    
+    def rank(self, title, content):
+        """Scan title + content once and return tag names ordered by match weight"""
+        self.refresh()
+        
+        title_text = title.lower()
+        content_text = re.sub(r'<[^>]+>', ' ', content).lower()
+        text = title_text + '\n' + content_text
+        
+        scores = Counter()
+        for start, end, keyword, tags in self.automaton.iter_matches(text):
+            boost = self.TITLE_BOOST if start < len(title_text) else 1.0
+            for tag_name, weight in tags.items():
+                scores[tag_name] += weight * boost
+        
+        # Highest score first; ties broken by name so results are deterministic
+        return [name for name, score in sorted(scores.items(), key=lambda x: (-x[1], x[0]))]
+
+# Shared per-process suggester (the automaton outlives ContentAnalyzer instances)
+tag_suggester = TagSuggester()
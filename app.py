@@ -8,39 +8,42 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 import os
 import re
+import sys
 
-# Import AI features
-from ai_features import AIRecommendationEngine, SmartSearchEngine, ContentAnalyzer
+# Let `from app import ...` (API blueprints, AI engines) reuse this module when run as a script
+if __name__ == '__main__':
+    sys.modules.setdefault('app', sys.modules[__name__])
+
+from services.tag_resolver import tag_resolver
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-here-change-in-production')
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///qa_platform.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'pool_pre_ping': True,
-    'pool_recycle': 300,
-}
-app.config['WTF_CSRF_ENABLED'] = True
+# Pool sizing, SQLite WAL/PRAGMAs, PostgreSQL timeouts and liveness (utils/engine.py)
+from utils.engine import engine_options, init_engine_metrics
+# Read replicas serving safe requests, with read-your-writes stickiness (utils/routing.py)
+from utils.routing import RoutingSession, init_read_routing, replica_binds
+from utils.query_audit import query_budget
+from utils.server_timing import stage
+from utils.routes import DeferredRoutes
 
 # Get port from environment (Render uses port 10000)
 port = int(os.environ.get('PORT', 5001))
 
-# Initialize CSRF protection
-csrf = CSRFProtect(app)
-
-db = SQLAlchemy(app)
-login_manager = LoginManager(app)
+# Extensions and views are bound to an app in create_app(): importing this
+# module (models, scripts, the API blueprints) builds no app and no engine
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+csrf = CSRFProtect()
+login_manager = LoginManager()
 login_manager.login_view = 'login'
+routes = DeferredRoutes()
 
 # Custom Jinja2 filters
-@app.template_filter('nl2br')
+@routes.template_filter('nl2br')
 def nl2br_filter(text):
     """Convert newlines to <br> tags"""
     if text is None:
         return ''
     return re.sub(r'\r?\n', '<br>', text)
 
-@app.template_filter('clean_html')
+@routes.template_filter('clean_html')
 def clean_html_filter(text):
     """Clean up HTML content from rich text editor"""
     if text is None:
@@ -123,8 +126,11 @@ class Question(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    # Last edit, score change or new acceptance; Core UPDATEs (votes) set it too
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    score = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # sum of vote values
     
     answers = db.relationship('Answer', backref='question', lazy=True, cascade='all, delete-orphan')
     votes = db.relationship('Vote', backref='question', lazy=True)
@@ -134,9 +140,11 @@ class Answer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False, index=True)
     is_accepted = db.Column(db.Boolean, default=False)
+    score = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # sum of vote values
     
     votes = db.relationship('Vote', backref='answer', lazy=True)
 
@@ -148,12 +156,22 @@ class Vote(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     value = db.Column(db.Integer)  # +1 or -1
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
-    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=True)
-    answer_id = db.Column(db.Integer, db.ForeignKey('answer.id'), nullable=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=True, index=True)
+    answer_id = db.Column(db.Integer, db.ForeignKey('answer.id'), nullable=True, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # cast or last changed
+    
+    # One vote per user and target; partial so the NULL side of each vote is ignored
+    __table_args__ = (
+        db.Index('uq_vote_user_question', user_id, question_id, unique=True,
+                 sqlite_where=question_id.isnot(None), postgresql_where=question_id.isnot(None)),
+        db.Index('uq_vote_user_answer', user_id, answer_id, unique=True,
+                 sqlite_where=answer_id.isnot(None), postgresql_where=answer_id.isnot(None)),
+    )
 
 question_tags = db.Table('question_tags',
     db.Column('question_id', db.Integer, db.ForeignKey('question.id'), primary_key=True),
-    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id'), primary_key=True)
+    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id'), primary_key=True),
+    db.Index('ix_question_tags_tag_id', 'tag_id')  # the primary key only serves lookups by question
 )
 
 # Badge system models
@@ -183,8 +201,101 @@ class Notification(db.Model):
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (db.Index('ix_notification_user_unread', 'user_id', 'is_read', 'created_at'),)
+    
     user = db.relationship('User', backref=db.backref('notifications', lazy=True, cascade='all, delete-orphan'))
 
+class TagKeyword(db.Model):
+    """Keyword that, when found in a question, suggests a tag"""
+    id = db.Column(db.Integer, primary_key=True)
+    keyword = db.Column(db.String(100), nullable=False)
+    tag_name = db.Column(db.String(50), nullable=False)
+    weight = db.Column(db.Float, default=1.0)
+
+    __table_args__ = (db.UniqueConstraint('keyword', 'tag_name'),)
+
+class EntityVersion(db.Model):
+    """Per-entity change counters used for HTTP ETags and cache invalidation"""
+    __tablename__ = 'entity_version'
+
+    key = db.Column(db.String(80), primary_key=True)  # e.g. 'questions', 'question:42', 'tags'
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SchemaMigration(db.Model):
+    """Applied schema migrations (see migrations/)"""
+    __tablename__ = 'schema_migrations'
+
+    version = db.Column(db.String(20), primary_key=True)
+    description = db.Column(db.String(200), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ImportRun(db.Model):
+    """Progress of a bulk import, checkpointed per chunk so it can resume"""
+    __tablename__ = 'import_run'
+
+    source = db.Column(db.String(80), primary_key=True)  # caller-chosen name, e.g. 'legacy-forum-a'
+    position = db.Column(db.Integer, nullable=False, default=0)  # input lines committed
+    status = db.Column(db.String(20), nullable=False, default='running')  # running, finalizing, completed
+    imported = db.Column(db.Integer, nullable=False, default=0)
+    rejected = db.Column(db.Integer, nullable=False, default=0)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+class ImportMapping(db.Model):
+    """Legacy id -> platform id, so later rows (and resumed runs) can resolve references"""
+    __tablename__ = 'import_mapping'
+
+    source = db.Column(db.String(80), primary_key=True)
+    entity = db.Column(db.String(20), primary_key=True)  # user, question, answer
+    legacy_id = db.Column(db.String(80), primary_key=True)
+    new_id = db.Column(db.Integer, nullable=False)
+
+class DailyStat(db.Model):
+    """Per-day platform counters (by creation day), maintained on write for /api/v1/stats"""
+    __tablename__ = 'daily_stats'
+
+    day = db.Column(db.Date, primary_key=True)
+    new_users = db.Column(db.Integer, nullable=False, default=0)
+    new_questions = db.Column(db.Integer, nullable=False, default=0)
+    new_answers = db.Column(db.Integer, nullable=False, default=0)
+    accepted_answers = db.Column(db.Integer, nullable=False, default=0)
+    answered_questions = db.Column(db.Integer, nullable=False, default=0)  # questions created that day with >= 1 answer
+
+class JobLease(db.Model):
+    """Next due time and current owner of each scheduled job (see scheduler/)"""
+    __tablename__ = 'job_lease'
+
+    job = db.Column(db.String(80), primary_key=True)
+    owner = db.Column(db.String(120))  # host:pid:nonce of the process running it, if any
+    expires_at = db.Column(db.DateTime)
+    next_run_at = db.Column(db.DateTime, nullable=False)
+    last_started_at = db.Column(db.DateTime)
+
+class JobRun(db.Model):
+    """History of scheduled job runs with outcome and duration"""
+    __tablename__ = 'job_run'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job = db.Column(db.String(80), nullable=False)
+    owner = db.Column(db.String(120), nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # running, succeeded, failed, timeout
+    started_at = db.Column(db.DateTime, nullable=False, index=True)
+    finished_at = db.Column(db.DateTime)
+    duration_ms = db.Column(db.Float)
+    error = db.Column(db.Text)
+
+    __table_args__ = (db.Index('ix_job_run_job_started', 'job', 'started_at'),)
+
+# Keep version stamps and the daily stats rollup in step with every write
+from utils.versions import track_entity_versions, touch
+from services.stats import rebuild_daily_stats, track_daily_stats
+track_entity_versions(db)
+track_daily_stats(db)
+
+# Hot-path counters (profile views) are buffered and written in batches
+from utils.counters import profile_views
+
 # Custom validators for password strength
 def validate_password_strength(form, field):
     """Custom validator to ensure password meets security requirements"""
@@ -254,29 +365,17 @@ class SettingsForm(FlaskForm):
 def load_user(user_id):
     return User.query.get(int(user_id))
 
-# Initialize AI engines (will be created when needed)
-ai_engine = None
-smart_search = None
-content_analyzer = None
-
 def get_ai_engines():
-    """Lazy initialization of AI engines"""
-    global ai_engine, smart_search, content_analyzer
+    """AI engines, built on first use or by the warm-up hook (utils/warmup.py)"""
     try:
-        if ai_engine is None:
-            ai_engine = AIRecommendationEngine()
-        if smart_search is None:
-            smart_search = SmartSearchEngine()
-        if content_analyzer is None:
-            content_analyzer = ContentAnalyzer()
+        from utils.helpers import get_ai_engines as shared_ai_engines
+        return shared_ai_engines()
     except Exception as e:
         print(f"AI engines not available: {e}")
-        ai_engine = smart_search = content_analyzer = None
-
-    # Always return a tuple, even if None
-    return (ai_engine, smart_search, content_analyzer)
+        # Always return a tuple, even if None
+        return (None, None, None)
 
-@app.route('/')
+@routes.route('/')
 def index():
     search_form = SearchForm()
     
@@ -297,14 +396,16 @@ def index():
     
     if current_user.is_authenticated and ai_engine:
         try:
-            recommended_questions = ai_engine.recommend_questions_for_user(current_user.id, limit=5)
+            with stage('ai-recommend'):
+                recommended_questions = ai_engine.recommend_questions_for_user(current_user.id, limit=5)
         except Exception as e:
             print(f"AI recommendations not available: {e}")
     
     # Get trending topics
     if smart_search:
         try:
-            trending_topics = smart_search.get_trending_topics(days=7, limit=5)
+            with stage('ai-trending'):
+                trending_topics = smart_search.get_trending_topics(days=7, limit=5)
         except Exception as e:
             print(f"Trending topics not available: {e}")
     
@@ -317,7 +418,7 @@ def index():
                          recommended_questions=recommended_questions,
                          trending_topics=trending_topics)
 
-@app.route('/login', methods=['GET', 'POST'])
+@routes.route('/login', methods=['GET', 'POST'])
 def login():
     if current_user.is_authenticated:
         return redirect(url_for('index'))
@@ -342,7 +443,7 @@ def login():
     
     return render_template('login.html', form=form)
 
-@app.route('/register', methods=['GET', 'POST'])
+@routes.route('/register', methods=['GET', 'POST'])
 def register():
     if current_user.is_authenticated:
         return redirect(url_for('index'))
@@ -366,14 +467,14 @@ def register():
     
     return render_template('register.html', form=form)
 
-@app.route('/logout')
+@routes.route('/logout')
 @login_required
 def logout():
     logout_user()
     flash('You have been logged out', 'info')
     return redirect(url_for('index'))
 
-@app.route('/ask', methods=['GET', 'POST'])
+@routes.route('/ask', methods=['GET', 'POST'])
 @login_required
 def ask_question():
     form = QuestionForm()
@@ -385,14 +486,8 @@ def ask_question():
             user_id=current_user.id
         )
         
-        # Process tags
-        tag_names = [tag.strip() for tag in form.tags.data.split(',') if tag.strip()]
-        for tag_name in tag_names:
-            tag = Tag.query.filter_by(name=tag_name).first()
-            if not tag:
-                tag = Tag(name=tag_name)
-                db.session.add(tag)
-            question.tags.append(tag)
+        # Process tags (resolved/created in one batch)
+        question.tags = tag_resolver.get_tags(form.tags.data.split(','))
         
         db.session.add(question)
         db.session.commit()
@@ -401,15 +496,14 @@ def ask_question():
     
     return render_template('ask_question.html', form=form)
 
-@app.route('/question/<int:id>')
+@routes.route('/question/<int:id>')
 def question_detail(id):
     question = Question.query.get_or_404(id)
     form = AnswerForm()
     
-    # Increment profile views
+    # Increment profile views (buffered, flushed in batches)
     if question.author:
-        question.author.profile_views += 1
-        db.session.commit()
+        profile_views.add(question.user_id)
     
     # Calculate vote counts
     question_votes = sum(vote.value for vote in question.votes)
@@ -427,10 +521,12 @@ def question_detail(id):
     ai_engine, smart_search, content_analyzer = get_ai_engines()
     
     # Get AI-powered similar questions
-    similar_questions = ai_engine.get_similar_questions(id, limit=3)
+    with stage('ai-similar'):
+        similar_questions = ai_engine.get_similar_questions(id, limit=3)
     
     # Analyze question quality
-    quality_score = content_analyzer.analyze_question_quality(question)
+    with stage('quality-analysis'):
+        quality_score = content_analyzer.analyze_question_quality(question)
     
     return render_template('question_detail.html', 
                          question=question, 
@@ -440,7 +536,7 @@ def question_detail(id):
                          similar_questions=similar_questions,
                          quality_score=quality_score)
 
-@app.route('/answer/<int:question_id>', methods=['POST'])
+@routes.route('/answer/<int:question_id>', methods=['POST'])
 @login_required
 def post_answer(question_id):
     question = Question.query.get_or_404(question_id)
@@ -454,6 +550,8 @@ def post_answer(question_id):
         )
         db.session.add(answer)
         db.session.commit()
+        from realtime import trigger_answer_delta
+        trigger_answer_delta(answer)
         
         # Create notification for question author if it's not their own answer
         if question.author.id != current_user.id:
@@ -469,10 +567,12 @@ def post_answer(question_id):
     
     return redirect(url_for('question_detail', id=question_id))
 
-@app.route('/vote', methods=['POST'])
+@routes.route('/vote', methods=['POST'])
 @login_required
 def vote():
-    data = request.get_json()
+    from services.votes import InvalidVote, VoteTargetNotFound, cast_vote
+    
+    data = request.get_json() or {}
     item_type = data.get('item_type')  # 'question' or 'answer'
     item_id = data.get('item_id')
     value = data.get('value')  # 1 or -1
@@ -480,53 +580,16 @@ def vote():
     if not all([item_type, item_id, value is not None]):
         return jsonify({'success': False, 'error': 'Missing required fields'}), 400
     
-    if item_type == 'question':
-        existing_vote = Vote.query.filter_by(
-            user_id=current_user.id,
-            question_id=item_id,
-            answer_id=None
-        ).first()
-        
-        if existing_vote:
-            existing_vote.value = value
-        else:
-            vote = Vote(
-                value=value,
-                user_id=current_user.id,
-                question_id=item_id
-            )
-            db.session.add(vote)
-    
-    elif item_type == 'answer':
-        existing_vote = Vote.query.filter_by(
-            user_id=current_user.id,
-            answer_id=item_id,
-            question_id=None
-        ).first()
-        
-        if existing_vote:
-            existing_vote.value = value
-        else:
-            vote = Vote(
-                value=value,
-                user_id=current_user.id,
-                answer_id=item_id
-            )
-            db.session.add(vote)
-    
-    db.session.commit()
-    
-    # Return new vote count
-    if item_type == 'question':
-        question = Question.query.get(item_id)
-        vote_count = sum(vote.value for vote in question.votes)
-    else:
-        answer = Answer.query.get(item_id)
-        vote_count = sum(vote.value for vote in answer.votes)
+    try:
+        vote_count = cast_vote(item_type, item_id, current_user.id, value)
+    except InvalidVote as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except VoteTargetNotFound as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
     
     return jsonify({'success': True, 'vote_count': vote_count})
 
-@app.route('/accept_answer/<int:answer_id>', methods=['POST'])
+@routes.route('/accept_answer/<int:answer_id>', methods=['POST'])
 @login_required
 def accept_answer(answer_id):
     answer = Answer.query.get_or_404(answer_id)
@@ -543,6 +606,8 @@ def accept_answer(answer_id):
     # Accept this answer
     answer.is_accepted = True
     db.session.commit()
+    from realtime import trigger_accept_delta
+    trigger_accept_delta(answer)
     
     # Create notification for answer author
     if answer.author.id != current_user.id:
@@ -557,7 +622,7 @@ def accept_answer(answer_id):
     flash('Answer accepted!', 'success')
     return redirect(url_for('question_detail', id=question.id))
 
-@app.route('/search', methods=['GET', 'POST'])
+@routes.route('/search', methods=['GET', 'POST'])
 def search():
     form = SearchForm()
     questions = []
@@ -572,10 +637,11 @@ def search():
         # Get AI engines and use smart search
         ai_engine, smart_search, content_analyzer = get_ai_engines()
         
-        if current_user.is_authenticated:
-            questions = smart_search.search_questions(query, current_user.id, limit=20)
-        else:
-            questions = smart_search.search_questions(query, limit=20)
+        with stage('ai-search'):
+            if current_user.is_authenticated:
+                questions = smart_search.search_questions(query, current_user.id, limit=20)
+            else:
+                questions = smart_search.search_questions(query, limit=20)
         
         search_time = round((time.time() - start_time) * 1000, 2)  # in milliseconds
         
@@ -584,7 +650,7 @@ def search():
     
     return render_template('search_results.html', questions=questions, form=form, query=request.args.get('q', ''), search_time=search_time)
 
-@app.route('/profile/<username>')
+@routes.route('/profile/<username>')
 def user_profile(username):
     """View user profile page"""
     user = User.query.filter_by(username=username).first_or_404()
@@ -615,7 +681,7 @@ def user_profile(username):
                          answers=answers,
                          stats=stats)
 
-@app.route('/settings', methods=['GET', 'POST'])
+@routes.route('/settings', methods=['GET', 'POST'])
 @login_required
 def settings():
     """User settings page"""
@@ -643,7 +709,7 @@ def settings():
 
     return render_template('settings.html', form=form)
 
-@app.route('/delete_account', methods=['POST'])
+@routes.route('/delete_account', methods=['POST'])
 @login_required
 def delete_account():
     """Delete user account"""
@@ -655,8 +721,9 @@ def delete_account():
             # Delete user's questions, answers, and votes
             user = current_user
 
-            # Delete votes first
-            Vote.query.filter_by(user_id=user.id).delete()
+            # Delete votes first, taking them out of the scores of other users' posts
+            from services.votes import retract_votes
+            touch(*retract_votes(db.session.connection(), user.id))
 
             # Delete answers
             Answer.query.filter_by(user_id=user.id).delete()
@@ -667,6 +734,11 @@ def delete_account():
             # Delete user badges
             UserBadge.query.filter_by(user_id=user.id).delete()
 
+            # Bulk deletes bypass the flush listeners, so bump their versions and
+            # recount the days the user's content could have been created on
+            touch('questions', 'tags', 'users', 'badges')
+            rebuild_daily_stats(db.session.connection(), since=user.created_at)
+
             # Delete user
             db.session.delete(user)
             db.session.commit()
@@ -680,7 +752,7 @@ def delete_account():
 
     return redirect(url_for('settings'))
 
-@app.route('/api/notifications')
+@routes.route('/api/notifications')
 @login_required
 def get_notifications():
     """API endpoint to get user notifications for badge count"""
@@ -701,7 +773,21 @@ def get_notifications():
         'created_at': n.created_at.isoformat()
     } for n in notifications])
 
-@app.route('/api/notifications/<int:notification_id>/read', methods=['POST'])
+@routes.route('/api/suggest_tags')
+@query_budget(6)
+def api_suggest_tags():
+    """Tag suggestions for the ask form (called as the user types)"""
+    title = request.args.get('title', '')
+    content = request.args.get('content', '')
+    
+    ai_engine, smart_search, content_analyzer = get_ai_engines()
+    if not content_analyzer or not (title or content):
+        return jsonify([])
+    
+    suggested = content_analyzer.suggest_tags(title, content, limit=5)
+    return jsonify([{'id': tag.id, 'name': tag.name} for tag in suggested])
+
+@routes.route('/api/notifications/<int:notification_id>/read', methods=['POST'])
 @login_required
 def mark_notification_read(notification_id):
     """Mark a specific notification as read"""
@@ -715,7 +801,7 @@ def mark_notification_read(notification_id):
     
     return jsonify({'success': True})
 
-@app.route('/api/notifications/mark_all_read', methods=['POST'])
+@routes.route('/api/notifications/mark_all_read', methods=['POST'])
 @login_required
 def mark_all_notifications_read():
     """Mark all notifications as read for current user"""
@@ -725,7 +811,7 @@ def mark_all_notifications_read():
     
     return jsonify({'success': True})
 
-@app.route('/dashboard')
+@routes.route('/dashboard')
 @login_required
 def dashboard():
     """Enhanced user dashboard with analytics"""
@@ -755,7 +841,8 @@ def dashboard():
     
     # Get AI engines and recommended questions
     ai_engine, smart_search, content_analyzer = get_ai_engines()
-    recommended = ai_engine.recommend_questions_for_user(user.id, limit=10)
+    with stage('ai-recommend'):
+        recommended = ai_engine.recommend_questions_for_user(user.id, limit=10)
     
     return render_template('dashboard.html', 
                          user=user, 
@@ -765,7 +852,7 @@ def dashboard():
                          user_badges=user_badges,
                          recommended_questions=recommended)
 
-@app.route('/notifications')
+@routes.route('/notifications')
 @login_required
 def notifications():
     """View user notifications page"""
@@ -781,9 +868,123 @@ def notifications():
                          notifications=pagination.items,
                          pagination=pagination)
 
+def create_app(config=None):
+    """Build the Flask app from the environment; ``config`` overrides settings
+
+    The database engine, the CSRF/login extensions, the views and the optional
+    subsystems are bound here rather than at import. Entry points (serve.py,
+    `python app.py`, the CLIs and scripts) call this once; tests build their
+    own app on a scratch database.
+    """
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-here-change-in-production')
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///qa_platform.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['DB_REPLICA_STICKY_SECONDS'] = float(os.environ.get('DB_REPLICA_STICKY_SECONDS', 10))
+    app.config['DB_REPLICA_MAX_LAG_SECONDS'] = float(os.environ.get('DB_REPLICA_MAX_LAG_SECONDS', 5))
+    app.config['DB_REPLICA_CHECK_SECONDS'] = float(os.environ.get('DB_REPLICA_CHECK_SECONDS', 2))
+    app.config['WTF_CSRF_ENABLED'] = True
+    # /metrics is loopback-only unless a bearer token is configured
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+    # Admin endpoints: bearer ADMIN_TOKEN or one of these logged-in users. No
+    # usernames by default: /register is open, so any listed name could be claimed
+    app.config['ADMIN_TOKEN'] = os.environ.get('ADMIN_TOKEN')
+    app.config['ADMIN_USERNAMES'] = [u.strip() for u in os.environ.get('ADMIN_USERNAMES', '').split(',') if u.strip()]
+
+    # Socket.IO async mode (threading, gevent, eventlet); serve.py sets it to match its workers
+    app.config['SOCKETIO_ASYNC_MODE'] = os.environ.get('SOCKETIO_ASYNC_MODE')
+    # Shared message queue so emits reach sockets held by other workers (utils/pubsub.py)
+    app.config['SOCKETIO_MESSAGE_QUEUE'] = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+    app.config['SOCKETIO_CHANNEL'] = os.environ.get('SOCKETIO_CHANNEL', 'flask-socketio')
+    # 'websocket' when workers can't pin a client's long-polling requests to one process
+    app.config['SOCKETIO_TRANSPORTS'] = [t for t in os.environ.get('SOCKETIO_TRANSPORTS', '').split(',') if t] or None
+    # Online users (utils/presence.py); defaults to the message queue when that is Redis
+    app.config['PRESENCE_URL'] = os.environ.get('PRESENCE_URL')
+    app.config['PRESENCE_TTL'] = int(os.environ.get('PRESENCE_TTL', 60))
+    # Question room deltas: coalescing window, and the send backlog past which a client skips them
+    app.config['REALTIME_COALESCE_MS'] = int(os.environ.get('REALTIME_COALESCE_MS', 250))
+    app.config['REALTIME_MAX_BACKLOG'] = int(os.environ.get('REALTIME_MAX_BACKLOG', 32))
+    # Optional subsystems; disabling them skips their imports and routes at startup
+    app.config['API_ENABLED'] = os.environ.get('API_ENABLED', '1').lower() in ('1', 'true', 'yes')
+    app.config['ADMIN_ENABLED'] = os.environ.get('ADMIN_ENABLED', '1').lower() in ('1', 'true', 'yes')
+    app.config['REALTIME_ENABLED'] = os.environ.get('REALTIME_ENABLED', '1').lower() in ('1', 'true', 'yes')
+
+    app.config.update(config or {})
+
+    # Settings derived from the ones above, unless given explicitly
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+    app.config.setdefault('SQLALCHEMY_BINDS', replica_binds(
+        [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]))
+    queue = app.config['SOCKETIO_MESSAGE_QUEUE'] or ''
+    if not app.config['PRESENCE_URL']:
+        app.config['PRESENCE_URL'] = queue if queue.startswith(('redis://', 'rediss://')) else 'memory://'
+
+    # Initialize CSRF protection
+    csrf.init_app(app)
+
+    # Compress large HTML/JSON responses; built assets are served precompressed
+    from utils.compression import GzipMiddleware
+    from utils.assets import init_assets
+    app.wsgi_app = GzipMiddleware(app.wsgi_app)
+    init_assets(app)
+
+    # Per-route latency, SQL and cache metrics at /metrics
+    from utils.metrics import init_metrics
+    init_metrics(app)
+
+    # N+1 detection and query budgets (enable with QUERY_AUDIT=1)
+    from utils.query_audit import init_query_audit
+    init_query_audit(app)
+
+    # Sampled Server-Timing headers (SERVER_TIMING_SAMPLE_RATE)
+    from utils.server_timing import init_server_timing
+    init_server_timing(app)
+
+    # Admin-armed cProfile/stack sampling and tracemalloc snapshots
+    from utils.profiling import init_profiling
+    init_profiling(app)
+
+    # Slow query log with EXPLAIN capture (SLOW_QUERY_THRESHOLD_MS)
+    from utils.slow_queries import init_slow_query_log
+    init_slow_query_log(app)
+
+    # The engine (and its pool) is created here, for this app's database URI
+    db.init_app(app)
+    init_engine_metrics(app, db)
+    init_read_routing(app, db)
+
+    # /healthz (liveness) and /readyz (warm-up, database, pool) for probes
+    from utils.health import init_health
+    init_health(app)
+    login_manager.init_app(app)
+    routes.init_app(app)
+
+    # Buffered counters still pending at exit are written through this app
+    from utils.counters import init_counters
+    init_counters(app)
+
+    # Periodic maintenance jobs (SCHEDULER_ENABLED=1 here, or python -m scheduler)
+    from scheduler import init_scheduler
+    init_scheduler(app)
+
+    # Optional subsystems, imported only when enabled. Socket.IO (realtime.py)
+    # is attached by serve.py when REALTIME_ENABLED.
+    if app.config['API_ENABLED']:
+        from rest_api import register_api_blueprints
+        register_api_blueprints(app)
+
+    if app.config['ADMIN_ENABLED']:
+        from admin import register_admin_blueprints
+        register_admin_blueprints(app, csrf)
+
+    return app
+
 if __name__ == '__main__':
+    app = create_app()
     with app.app_context():
-        db.create_all()
+        # Creates missing tables and applies pending index migrations
+        from migrations import upgrade
+        upgrade()
         
         # Add sample data if database is empty
         if User.query.count() == 0:
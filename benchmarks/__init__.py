@@ -0,0 +1,9 @@
+"""
+Benchmark suite for Q&A Platform
+
+    python -m benchmarks.dataset --scale 1          # load a synthetic dataset
+    python -m benchmarks --scale 1 --output out.json  # load (if empty) and benchmark
+
+Point DATABASE_URL at a scratch database; loading refuses to touch a
+database that already has users unless --reset is given.
+"""
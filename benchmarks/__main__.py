@@ -0,0 +1,142 @@
+"""
+Run the benchmark suite against a synthetic dataset
+
+    python -m benchmarks --scale 1 --iterations 50 --output benchmarks/results/run.json
+    python -m benchmarks --only search,similar --compare benchmarks/results/baseline.json
+
+Without DATABASE_URL a scratch SQLite file under the system temp dir is
+used (and reused across runs at the same scale and seed).
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Q&A Platform benchmark suite')
+    parser.add_argument('--scale', type=float, default=1.0, help='dataset size multiplier (1 = ~100k rows)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--only', help='comma-separated substrings of case names to run')
+    parser.add_argument('--output', help='write a JSON report to this path')
+    parser.add_argument('--compare', help='previous JSON report to diff against')
+    parser.add_argument('--reset', action='store_true', help='reload the dataset even if one exists')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Must happen before the app is built
+    if 'DATABASE_URL' not in os.environ:
+        path = os.path.join(tempfile.gettempdir(), f'qa_bench_s{args.scale:g}_seed{args.seed}.db')
+        os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import create_app, db, User
+    from benchmarks.dataset import load_dataset, scaled_counts
+    from benchmarks.harness import Benchmark, compare, environment_info, write_report
+
+    app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        empty = User.query.first() is None
+    if empty or args.reset:
+        print(f"📦 Loading dataset (scale {args.scale:g}, seed {args.seed})...")
+        load_dataset(app, args.scale, args.seed, reset=args.reset)
+
+    counts = scaled_counts(args.scale)
+    rng = random.Random(args.seed)
+    app.config['WTF_CSRF_ENABLED'] = False
+    bench = Benchmark(args.iterations, args.warmup)
+    queries = ['python flask', 'database index performance', 'docker deployment error', 'async memory']
+
+    with app.app_context():
+        from app import get_ai_engines
+        ai_engine, smart_search, content_analyzer = get_ai_engines()
+        dialect = db.engine.dialect.name
+        meta = dict(environment_info(db.engine), scale=args.scale, seed=args.seed,
+                    iterations=args.iterations, rows=counts)
+
+    # The cases run outside any app context. Flask reuses an enclosing one for
+    # every request, which would carry g and the session's identity map from
+    # one request to the next; the AI cases push their own per call instead
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = '1'
+
+    @bench.case('ai.search')
+    def _():
+        with app.app_context():
+            smart_search.search_questions(rng.choice(queries), limit=20)
+
+    @bench.case('ai.similar_questions')
+    def _():
+        with app.app_context():
+            ai_engine.get_similar_questions(rng.randint(1, counts['questions']))
+
+    @bench.case('ai.recommend_questions')
+    def _():
+        with app.app_context():
+            ai_engine.recommend_questions_for_user(rng.randint(1, counts['users']))
+
+    @bench.case('ai.trending_topics')
+    def _():
+        with app.app_context():
+            smart_search.get_trending_topics(days=365)
+
+    @bench.case('http.question_detail')
+    def _():
+        _get(client, f"/question/{rng.randint(1, counts['questions'])}")
+
+    @bench.case('http.vote')
+    def _():
+        _post(client, '/vote', {'item_type': 'question', 'item_id': rng.randint(1, counts['questions']),
+                                'value': rng.choice([1, -1])})
+
+    @bench.case('http.api_questions')
+    def _():
+        _get(client, '/api/v1/questions?per_page=20')
+
+    @bench.case('http.api_stats')
+    def _():
+        _get(client, '/api/v1/stats')
+
+    @bench.case('http.api_leaderboard')
+    def _():
+        _get(client, '/api/v1/stats/leaderboard')
+
+    print(f"⏱️  Running {args.iterations} iterations per case on {dialect}...")
+    results = bench.run(only=args.only.split(',') if args.only else None)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        write_report(args.output, results, meta)
+        print(f"📝 Report written to {args.output}")
+    if args.compare:
+        regressed = compare(results, args.compare)
+        if regressed:
+            print(f"❌ {len(regressed)} case(s) regressed")
+            return 1
+    return 0
+
+
+def _get(client, url):
+    response = client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f'GET {url} returned {response.status_code}')
+
+
+def _post(client, url, payload):
+    response = client.post(url, json=payload)
+    if response.status_code != 200:
+        raise RuntimeError(f'POST {url} returned {response.status_code}')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
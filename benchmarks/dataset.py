@@ -0,0 +1,216 @@
+"""
+Deterministic synthetic dataset generator
+
+Row counts scale linearly with ``scale`` (scale 1 is about 100k rows) and
+every value derives from ``seed``, so two runs at the same scale produce
+identical databases. Rows are bulk-inserted with Core executemany in
+chunks, with primary keys assigned up front so foreign keys need no
+round trips.
+"""
+
+from datetime import datetime, timedelta
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Rows per unit of scale
+BASE_COUNTS = {
+    'users': 1000,
+    'tags': 200,
+    'questions': 5000,
+    'answers': 15000,
+    'votes': 50000,
+    'notifications': 10000,
+}
+
+CHUNK_SIZE = 5000
+TAGS_PER_QUESTION = (1, 5)
+EPOCH = datetime(2025, 1, 1)
+
+TOPIC_WORDS = [
+    'python', 'flask', 'django', 'javascript', 'react', 'database', 'sql', 'postgresql',
+    'sqlite', 'docker', 'kubernetes', 'api', 'rest', 'graphql', 'cache', 'redis', 'testing',
+    'security', 'authentication', 'performance', 'async', 'threading', 'memory', 'index',
+    'query', 'deployment', 'css', 'html', 'git', 'linux', 'network', 'json', 'orm', 'migration'
+]
+FILLER_WORDS = [
+    'how', 'do', 'i', 'fix', 'the', 'error', 'when', 'using', 'with', 'my', 'application',
+    'slow', 'best', 'way', 'to', 'configure', 'handle', 'large', 'data', 'in', 'production',
+    'why', 'does', 'fail', 'after', 'update', 'can', 'improve', 'setup', 'between', 'and'
+]
+
+
+def scaled_counts(scale):
+    return {name: max(1, int(count * scale)) for name, count in BASE_COUNTS.items()}
+
+
+def _sentence(rng, words):
+    picked = [rng.choice(TOPIC_WORDS if rng.random() < 0.3 else FILLER_WORDS) for _ in range(words)]
+    return ' '.join(picked)
+
+
+def _timestamp(rng, days=365):
+    return EPOCH + timedelta(seconds=rng.randrange(days * 86400))
+
+
+def _chunks(rows, size=CHUNK_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_rows(counts, seed=42):
+    """Yield (table name, row iterator) pairs in foreign-key order"""
+    from werkzeug.security import generate_password_hash
+
+    rng = random.Random(seed)
+    password_hash = generate_password_hash('Benchmark1!')  # hashing per user would dominate load time
+    n_users, n_tags, n_questions, n_answers = (counts['users'], counts['tags'],
+                                               counts['questions'], counts['answers'])
+
+    yield 'user', ({
+        'id': i, 'username': f'user{i}', 'email': f'user{i}@bench.example',
+        'password_hash': password_hash, 'created_at': _timestamp(rng),
+        'reputation': rng.randint(1, 2000), 'badge_level': 'Beginner', 'profile_views': rng.randint(0, 500)
+    } for i in range(1, n_users + 1))
+
+    tag_names = (TOPIC_WORDS + [f'{a}-{b}' for a in TOPIC_WORDS for b in TOPIC_WORDS if a != b])[:n_tags]
+    yield 'tag', ({'id': i, 'name': name} for i, name in enumerate(tag_names, 1))
+
+    question_times = {}
+
+    def questions():
+        for i in range(1, n_questions + 1):
+            created = _timestamp(rng)
+            question_times[i] = created
+            yield {
+                'id': i, 'title': _sentence(rng, rng.randint(6, 12)).capitalize() + '?',
+                'content': _sentence(rng, rng.randint(30, 120)),
+                'created_at': created, 'user_id': rng.randint(1, n_users)
+            }
+    yield 'question', questions()
+
+    def question_tags():
+        # Skewed towards low tag ids so some tags are hot, as in real forums
+        for question_id in range(1, n_questions + 1):
+            chosen = set()
+            for _ in range(rng.randint(*TAGS_PER_QUESTION)):
+                chosen.add(min(len(tag_names), int(rng.paretovariate(1.2)) + rng.randrange(3)))
+            for tag_id in sorted(chosen):
+                yield {'question_id': question_id, 'tag_id': tag_id}
+    yield 'question_tags', question_tags()
+
+    answer_questions = {}
+
+    def answers():
+        for i in range(1, n_answers + 1):
+            question_id = rng.randint(1, n_questions)
+            answer_questions[i] = question_id
+            yield {
+                'id': i, 'content': _sentence(rng, rng.randint(20, 150)),
+                'created_at': question_times[question_id] + timedelta(minutes=rng.randint(1, 20000)),
+                'user_id': rng.randint(1, n_users), 'question_id': question_id,
+                'is_accepted': rng.random() < 0.15
+            }
+    yield 'answer', answers()
+
+    def votes():
+        seen = set()
+        vote_id = 0
+        while vote_id < counts['votes']:
+            user_id = rng.randint(1, n_users)
+            on_question = rng.random() < 0.5
+            target = rng.randint(1, n_questions if on_question else n_answers)
+            key = (user_id, on_question, target)
+            if key in seen:
+                continue
+            seen.add(key)
+            vote_id += 1
+            yield {
+                'id': vote_id, 'value': 1 if rng.random() < 0.85 else -1, 'user_id': user_id,
+                'question_id': target if on_question else None,
+                'answer_id': None if on_question else target
+            }
+    yield 'vote', votes()
+
+    yield 'notification', ({
+        'id': i, 'user_id': rng.randint(1, n_users), 'content': _sentence(rng, 10),
+        'notification_type': rng.choice(['info', 'success', 'warning', 'achievement']),
+        'is_read': rng.random() < 0.6, 'created_at': _timestamp(rng)
+    } for i in range(1, counts['notifications'] + 1))
+
+
+def load_dataset(app, scale=1.0, seed=42, reset=False, verbose=True):
+    """Create the schema and bulk-load a synthetic dataset into ``app``'s database; returns {table: rows}"""
+    from app import db, User
+    from services.stats import rebuild_daily_stats
+
+    counts = scaled_counts(scale)
+    loaded = {}
+    started = time.perf_counter()
+
+    with app.app_context():
+        if reset:
+            db.drop_all()
+        db.create_all()
+        if User.query.first() is not None:
+            raise RuntimeError('Database already has data; pass reset=True (--reset) to replace it')
+
+        tables = db.metadata.tables
+        for table_name, rows in generate_rows(counts, seed):
+            table = tables[table_name]
+            table_started = time.perf_counter()
+            loaded[table_name] = 0
+            for batch in _chunks(rows):
+                db.session.execute(table.insert(), batch)
+                loaded[table_name] += len(batch)
+            db.session.commit()
+            if verbose:
+                elapsed = time.perf_counter() - table_started
+                print(f"✅ {table_name}: {loaded[table_name]} rows in {elapsed:.1f}s "
+                      f"({loaded[table_name] / max(elapsed, 1e-9):,.0f} rows/s)")
+
+        # Denormalized scores, as services.votes would have maintained them
+        for table_name, column in (('question', 'question_id'), ('answer', 'answer_id')):
+            db.session.execute(db.text(
+                f'UPDATE "{table_name}" SET score = COALESCE('
+                f'(SELECT SUM(value) FROM vote WHERE vote.{column} = "{table_name}".id), 0)'))
+        rebuild_daily_stats(db.session.connection())
+        db.session.commit()
+
+        # Sequences don't advance on explicit ids (PostgreSQL); resync them
+        if db.engine.dialect.name == 'postgresql':
+            for table_name in loaded:
+                if 'id' in tables[table_name].c:
+                    db.session.execute(db.text(
+                        f"SELECT setval(pg_get_serial_sequence('\"{table_name}\"', 'id'), "
+                        f"(SELECT MAX(id) FROM \"{table_name}\"))"))
+            db.session.commit()
+
+    if verbose:
+        total = sum(loaded.values())
+        print(f"Loaded {total} rows in {time.perf_counter() - started:.1f}s")
+    return loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load a deterministic synthetic dataset')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier for row counts (1 = ~100k rows)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reset', action='store_true', help='drop and recreate all tables first')
+    args = parser.parse_args(argv)
+    from app import create_app
+    load_dataset(create_app(), args.scale, args.seed, args.reset)
+
+
+if __name__ == '__main__':
+    main()
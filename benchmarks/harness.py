@@ -0,0 +1,126 @@
+"""
+Benchmark harness: timing, query counting and JSON reports
+
+Each case is a zero-argument callable run ``iterations`` times after
+``warmup`` untimed calls. Wall time per call is recorded with
+perf_counter and every SQL statement is counted through the query
+recorder, so a regression shows up either as latency or as extra queries.
+"""
+
+from datetime import datetime
+import json
+import math
+import platform
+import subprocess
+import time
+
+from utils.query_audit import record_queries
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Benchmark:
+    """Named collection of cases with a shared timing loop"""
+
+    def __init__(self, iterations=50, warmup=3):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.cases = {}
+        self.results = {}
+
+    def case(self, name):
+        """Decorator registering a case under ``name``"""
+        def decorator(func):
+            self.cases[name] = func
+            return func
+        return decorator
+
+    def run_case(self, name, func):
+        for _ in range(self.warmup):
+            func()
+
+        durations = []
+        queries = 0
+        for _ in range(self.iterations):
+            with record_queries(capture_stacks=False) as recorder:
+                start = time.perf_counter()
+                func()
+                durations.append(time.perf_counter() - start)
+            queries += len(recorder)
+
+        durations.sort()
+        ms = [d * 1000 for d in durations]
+        return {
+            'iterations': len(ms),
+            'mean_ms': round(sum(ms) / len(ms), 3),
+            'min_ms': round(ms[0], 3),
+            'p50_ms': round(percentile(ms, 50), 3),
+            'p95_ms': round(percentile(ms, 95), 3),
+            'p99_ms': round(percentile(ms, 99), 3),
+            'max_ms': round(ms[-1], 3),
+            'queries_per_call': round(queries / len(ms), 2)
+        }
+
+    def run(self, only=None, verbose=True):
+        for name, func in self.cases.items():
+            if only and not any(pattern in name for pattern in only):
+                continue
+            self.results[name] = result = self.run_case(name, func)
+            if verbose:
+                print(f"  {name:<28} p50 {result['p50_ms']:>9.2f} ms   p95 {result['p95_ms']:>9.2f} ms   "
+                      f"p99 {result['p99_ms']:>9.2f} ms   {result['queries_per_call']:>7.1f} queries")
+        return self.results
+
+
+def environment_info(engine):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'database': engine.dialect.name
+    }
+
+
+def write_report(path, results, meta):
+    with open(path, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(results, baseline_path, threshold=0.10):
+    """Print p50/p95 and query-count changes against a previous report; returns regressed case names"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+
+    regressed = []
+    print(f"\nCompared with {baseline_path}:")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"  {name:<28} (new)")
+            continue
+        changes = []
+        flagged = False
+        for key in ('p50_ms', 'p95_ms'):
+            delta = (result[key] - before[key]) / before[key] if before[key] else 0.0
+            flagged |= delta > threshold
+            changes.append(f"{key[:3]} {delta:+.0%}")
+        query_delta = result['queries_per_call'] - before['queries_per_call']
+        flagged |= query_delta > 0
+        changes.append(f"queries {query_delta:+.1f}")
+        if flagged:
+            regressed.append(name)
+        print(f"  {name:<28} {'   '.join(changes)}{'   ⚠️' if flagged else ''}")
+    return regressed
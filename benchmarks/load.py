@@ -0,0 +1,375 @@
+"""
+Load generator replaying a realistic traffic mix against the app
+
+    python -m benchmarks.load --target inprocess --users 20 --duration 30
+    python -m benchmarks.load --target loopback --ramp 10:1-50,30:50,10:50-0 --output load.json
+
+Each virtual user is a thread with its own logged-in session that picks
+actions by weight (browse home, view question, search, vote, post answer,
+poll notifications) in a closed loop with optional think time. The
+``inprocess`` target drives the WSGI app through Flask's test client; the
+``loopback`` target serves it with a threaded werkzeug server on
+127.0.0.1 and talks real HTTP, so socket and serialization costs count.
+
+Expects the synthetic dataset from benchmarks.dataset (all users share
+its password); it is loaded automatically into an empty database.
+"""
+
+from http.cookiejar import CookieJar
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import percentile
+
+PASSWORD = 'Benchmark1!'
+
+DEFAULT_MIX = {
+    'home': 30,
+    'question': 30,
+    'search': 15,
+    'vote': 10,
+    'answer': 5,
+    'notifications': 10,
+}
+
+SEARCH_TERMS = ['python', 'flask database', 'docker error', 'cache performance', 'async api', 'sql index']
+
+
+def parse_ramp(spec):
+    """'10:1-50,30:50,10:50-0' -> [(seconds, start_users, end_users), ...]"""
+    stages = []
+    for part in spec.split(','):
+        seconds, users = part.split(':')
+        start, _, end = users.partition('-')
+        stages.append((float(seconds), int(start), int(end or start)))
+    return stages
+
+
+def parse_mix(spec):
+    """'home=30,question=30,...' -> {action: weight}"""
+    mix = {}
+    for part in spec.split(','):
+        name, weight = part.split('=')
+        if name not in DEFAULT_MIX:
+            raise ValueError(f'Unknown action {name!r}; expected one of {", ".join(DEFAULT_MIX)}')
+        mix[name] = float(weight)
+    return mix
+
+
+def target_users(stages, elapsed):
+    """Concurrency the ramp profile asks for ``elapsed`` seconds in, or None when finished"""
+    for seconds, start, end in stages:
+        if elapsed < seconds:
+            return round(start + (end - start) * elapsed / seconds)
+        elapsed -= seconds
+    return None
+
+
+def _status(status, location):
+    """Status to record: a redirect to the login page means the session is not logged in
+
+    Redirects are never followed, so a write bounced to /login (expired or
+    failed login) counts as an error rather than as the 200 of the login form.
+    """
+    if 300 <= status < 400 and urllib.parse.urlsplit(location or '').path == '/login':
+        return 401
+    return status
+
+
+class TestClientSession:
+    """Virtual user session driving the app in-process"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def login(self, username):
+        """Whether the login succeeded (it redirects; a failed one re-renders the form)"""
+        return self.post('/login', {'username': username, 'password': PASSWORD}) == 302
+
+    def get(self, path):
+        response = self.client.get(path, follow_redirects=False)
+        return _status(response.status_code, response.headers.get('Location'))
+
+    def post(self, path, form=None, json_body=None):
+        response = self.client.post(path, data=form, json=json_body, follow_redirects=False)
+        return _status(response.status_code, response.headers.get('Location'))
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HTTPSession:
+    """Virtual user session talking HTTP to ``base_url`` with its own cookie jar"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(CookieJar()), _NoRedirect())
+
+    def login(self, username):
+        """Whether the login succeeded (it redirects; a failed one re-renders the form)"""
+        return self.post('/login', {'username': username, 'password': PASSWORD}) == 302
+
+    def _open(self, request):
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:  # includes the redirects _NoRedirect refuses
+            e.read()
+            return _status(e.code, e.headers.get('Location'))
+
+    def get(self, path):
+        return self._open(urllib.request.Request(self.base_url + path))
+
+    def post(self, path, form=None, json_body=None):
+        if json_body is not None:
+            data, content_type = json.dumps(json_body).encode(), 'application/json'
+        else:
+            data, content_type = urllib.parse.urlencode(form or {}).encode(), 'application/x-www-form-urlencoded'
+        request = urllib.request.Request(self.base_url + path, data=data, headers={'Content-Type': content_type})
+        return self._open(request)
+
+
+class Actions:
+    """The traffic mix: each method issues one request and returns its status code"""
+
+    def __init__(self, session, rng, counts):
+        self.session = session
+        self.rng = rng
+        self.counts = counts
+
+    def _question_id(self):
+        # Recent questions get most of the traffic
+        n = self.counts['questions']
+        return max(1, n - int(self.rng.expovariate(1.0 / max(1, n / 10))) % n)
+
+    def home(self):
+        return self.session.get('/')
+
+    def question(self):
+        return self.session.get(f'/question/{self._question_id()}')
+
+    def search(self):
+        return self.session.get('/search?' + urllib.parse.urlencode({'q': self.rng.choice(SEARCH_TERMS)}))
+
+    def vote(self):
+        return self.session.post('/vote', json_body={
+            'item_type': 'question', 'item_id': self._question_id(), 'value': self.rng.choice([1, 1, 1, -1])})
+
+    def answer(self):
+        return self.session.post(f'/answer/{self._question_id()}',
+                                 {'content': f'Load test answer {self.rng.random():.6f}'})
+
+    def notifications(self):
+        return self.session.get('/api/notifications')
+
+
+class LoadTest:
+    """Closed-loop load test following a ramp profile"""
+
+    def __init__(self, session_factory, counts, stages, mix=None, think_time=0.0, seed=42):
+        self.session_factory = session_factory
+        self.counts = counts
+        self.stages = stages
+        self.mix = mix or DEFAULT_MIX
+        self.think_time = think_time
+        self.seed = seed
+        self.samples = []  # (finished_at, action, seconds, ok)
+        self.active = 0
+        self.finished = threading.Event()
+        self._lock = threading.Lock()
+
+    def _record(self, action, seconds, ok):
+        with self._lock:
+            self.samples.append((time.perf_counter() - self.started, action, seconds, ok))
+
+    def _user(self, index):
+        rng = random.Random(self.seed * 1000003 + index)
+        session = self.session_factory()
+        start = time.perf_counter()
+        logged_in = session.login(f"user{1 + index % self.counts['users']}")
+        self._record('login', time.perf_counter() - start, logged_in)
+        if not logged_in:
+            return  # reported as a login error; its votes and answers would all bounce
+        actions = Actions(session, rng, self.counts)
+        names, weights = zip(*self.mix.items())
+
+        while not self.finished.is_set():
+            if index >= self.active:
+                time.sleep(0.05)
+                continue
+            action = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                status = getattr(actions, action)()
+                ok = status < 400
+            except Exception:
+                ok = False
+            self._record(action, time.perf_counter() - start, ok)
+            if self.think_time:
+                time.sleep(rng.expovariate(1.0 / self.think_time))
+
+    def run(self, progress=True):
+        max_users = max(max(start, end) for _, start, end in self.stages)
+        self.started = time.perf_counter()
+        threads = [threading.Thread(target=self._user, args=(i,), name=f'vu-{i}', daemon=True)
+                   for i in range(max_users)]
+        for thread in threads:
+            thread.start()
+
+        last_report = 0
+        while True:
+            elapsed = time.perf_counter() - self.started
+            users = target_users(self.stages, elapsed)
+            if users is None:
+                break
+            self.active = users
+            if progress and int(elapsed) >= last_report + 5:
+                last_report = int(elapsed)
+                with self._lock:
+                    done = len(self.samples)
+                print(f"  t={last_report:>4}s  users={users:<4} requests={done}")
+            time.sleep(0.1)
+
+        self.finished.set()
+        for thread in threads:
+            thread.join(timeout=30)
+        self.duration = time.perf_counter() - self.started
+        return self.report()
+
+    def report(self):
+        def summarize(samples, duration):
+            latencies = sorted(s[2] * 1000 for s in samples)
+            errors = sum(1 for s in samples if not s[3])
+            return {
+                'requests': len(samples),
+                'errors': errors,
+                'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+                'throughput_rps': round(len(samples) / duration, 2) if duration else 0.0,
+                'p50_ms': round(percentile(latencies, 50), 2),
+                'p95_ms': round(percentile(latencies, 95), 2),
+                'p99_ms': round(percentile(latencies, 99), 2),
+                'max_ms': round(latencies[-1], 2) if latencies else 0.0
+            }
+
+        by_action = {}
+        for sample in self.samples:
+            by_action.setdefault(sample[1], []).append(sample)
+
+        # Per-second throughput so a ramp shows where the curve flattens
+        timeline = {}
+        for finished_at, _, _, ok in self.samples:
+            bucket = timeline.setdefault(int(finished_at), {'requests': 0, 'errors': 0})
+            bucket['requests'] += 1
+            bucket['errors'] += 0 if ok else 1
+
+        return {
+            'total': summarize(self.samples, self.duration),
+            'actions': {name: summarize(samples, self.duration) for name, samples in sorted(by_action.items())},
+            'timeline': [dict(second=second, users=target_users(self.stages, second) or 0, **counts)
+                         for second, counts in sorted(timeline.items())]
+        }
+
+
+def print_report(report):
+    header = f"  {'action':<16}{'requests':>10}{'rps':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    rows = list(report['actions'].items()) + [('TOTAL', report['total'])]
+    for name, stats in rows:
+        print(f"  {name:<16}{stats['requests']:>10}{stats['throughput_rps']:>10.1f}{stats['error_rate']:>8.1%}"
+              f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}")
+
+
+def start_loopback_server(app):
+    """Serve ``app`` with a threaded werkzeug server on an ephemeral loopback port"""
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # one access-log line per request skews results
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='loopback-server', daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.load', description='Q&A Platform load generator')
+    parser.add_argument('--target', choices=['inprocess', 'loopback'], default='inprocess')
+    parser.add_argument('--users', type=int, default=10, help='constant concurrency (ignored with --ramp)')
+    parser.add_argument('--duration', type=float, default=30, help='seconds (ignored with --ramp)')
+    parser.add_argument('--ramp', help="stages as 'seconds:users' or 'seconds:from-to', e.g. 10:1-50,30:50")
+    parser.add_argument('--mix', help='action weights, e.g. home=30,question=30,search=15,vote=10,answer=5,notifications=10')
+    parser.add_argument('--think', type=float, default=0.0, help='mean think time between requests (seconds)')
+    parser.add_argument('--scale', type=float, default=0.1, help='dataset scale when loading an empty database')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the JSON report to this path')
+    args = parser.parse_args(argv)
+
+    if 'DATABASE_URL' not in os.environ:
+        path = os.path.join(tempfile.gettempdir(), f'qa_bench_s{args.scale:g}_seed{args.seed}.db')
+        os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+
+    from app import create_app, db, User
+    from benchmarks.dataset import load_dataset, scaled_counts
+
+    app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        dialect = db.engine.dialect.name
+        user_count = User.query.count()
+        question_count = db.session.execute(db.text('SELECT MAX(id) FROM question')).scalar() or 0
+    if user_count == 0:
+        print(f"📦 Loading dataset (scale {args.scale:g}, seed {args.seed})...")
+        load_dataset(app, args.scale, args.seed)
+        counts = scaled_counts(args.scale)
+    else:
+        counts = {'users': user_count, 'questions': max(1, question_count)}
+
+    # The harness logs in with forms and posts JSON without tokens
+    app.config['WTF_CSRF_ENABLED'] = False
+
+    if args.target == 'loopback':
+        server, base_url = start_loopback_server(app)
+        factory = lambda: HTTPSession(base_url)
+    else:
+        server = None
+        factory = lambda: TestClientSession(app)
+
+    stages = parse_ramp(args.ramp) if args.ramp else [(args.duration, args.users, args.users)]
+    mix = parse_mix(args.mix) if args.mix else None
+    print(f"🚀 {args.target} load test: {', '.join(f'{s:g}s@{a}-{b}' for s, a, b in stages)}")
+
+    test = LoadTest(factory, counts, stages, mix, args.think, args.seed)
+    try:
+        report = test.run()
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    print_report(report)
+    if args.output:
+        report['meta'] = {'target': args.target, 'stages': stages, 'mix': mix or DEFAULT_MIX,
+                          'think_time': args.think, 'database': dialect}
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"📝 Report written to {args.output}")
+    return 1 if report['total']['error_rate'] > 0.01 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
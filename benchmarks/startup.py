@@ -0,0 +1,153 @@
+"""
+Cold-start benchmark: a fresh interpreter importing and building the app, profiled with -X importtime
+
+    python -m benchmarks.startup --runs 7 --output benchmarks/results/startup.json
+    python -m benchmarks.startup --compare benchmarks/results/startup.json
+    python -m benchmarks.startup --set API_ENABLED=0 --set ADMIN_ENABLED=0
+
+Each run starts a new interpreter, as a scaled-to-zero instance does on
+wake-up, with bytecode already compiled (one untimed run first). Reports
+the process wall time and the import tree's total (median over runs), the
+slowest modules by cumulative and by self time, and self time per
+top-level package.
+"""
+
+import argparse
+from collections import defaultdict
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        entries.append((module, int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def run_once(target, env):
+    """(wall seconds, importtime entries) for one fresh interpreter"""
+    started = time.perf_counter()
+    # A module with an application factory is built too: the optional
+    # subsystems are imported by create_app(), not by the import
+    code = f"import {target}; getattr({target}, 'create_app', lambda: None)()"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f'import {target} failed:\n{result.stderr[-2000:]}')
+    return wall, parse_importtime(result.stderr)
+
+
+def _stats(values_ms):
+    ordered = sorted(values_ms)
+    return {
+        'p50_ms': round(statistics.median(ordered), 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        'min_ms': round(ordered[0], 3),
+        'queries_per_call': 0.0,
+    }
+
+
+def summarize(runs, top=20):
+    """Median wall/import totals plus per-module and per-package breakdowns"""
+    walls = [wall * 1000 for wall, _ in runs]
+    totals = [sum(cumulative for _, _, cumulative, depth in entries if depth == 0) / 1000
+              for _, entries in runs]
+
+    cumulative = defaultdict(list)
+    self_time = defaultdict(list)
+    packages = defaultdict(list)
+    for _, entries in runs:
+        per_package = defaultdict(int)
+        for module, self_us, cumulative_us, _ in entries:
+            cumulative[module].append(cumulative_us / 1000)
+            self_time[module].append(self_us / 1000)
+            per_package[module.split('.')[0]] += self_us
+        for package, total in per_package.items():
+            packages[package].append(total / 1000)
+
+    def ranked(samples):
+        medians = {name: statistics.median(values) for name, values in samples.items()}
+        return [{'module': name, 'ms': round(ms, 2)}
+                for name, ms in sorted(medians.items(), key=lambda item: -item[1])[:top]]
+
+    return {
+        'results': {'startup.wall': _stats(walls), 'startup.imports': _stats(totals)},
+        'slowest_cumulative': ranked(cumulative),
+        'slowest_self': ranked(self_time),
+        'packages': ranked(packages),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.startup', description='Q&A Platform cold-start benchmark')
+    parser.add_argument('--target', default='app', help='module to import (default: app)')
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--top', type=int, default=20, help='modules to list per ranking')
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help='environment override for the runs, e.g. API_ENABLED=0')
+    parser.add_argument('--output', help='write a JSON report to this path')
+    parser.add_argument('--compare', help='previous JSON report to diff against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative slowdown that counts as a regression')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sys.path.insert(0, PROJECT_ROOT)
+    from benchmarks.harness import compare
+
+    env = dict(os.environ)
+    env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.gettempdir(), 'qa_startup.db')}")
+    env['SCHEDULER_ENABLED'] = '0'
+    for override in args.set:
+        key, _, value = override.partition('=')
+        env[key] = value
+
+    run_once(args.target, env)  # compile bytecode, fill the OS file cache
+    runs = [run_once(args.target, env) for _ in range(args.runs)]
+    summary = summarize(runs, args.top)
+
+    wall, imports = summary['results']['startup.wall'], summary['results']['startup.imports']
+    print(f"🚀 import {args.target}: wall p50 {wall['p50_ms']:.0f} ms (min {wall['min_ms']:.0f}), "
+          f"imports p50 {imports['p50_ms']:.0f} ms over {args.runs} runs")
+    for title, key in (('Slowest modules (cumulative)', 'slowest_cumulative'),
+                       ('Slowest modules (self)', 'slowest_self'),
+                       ('Self time by package', 'packages')):
+        print(f"\n{title}:")
+        for entry in summary[key]:
+            print(f"  {entry['ms']:>8.1f} ms  {entry['module']}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        meta = {'target': args.target, 'runs': args.runs, 'python': sys.version.split()[0],
+                'overrides': args.set, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+        with open(args.output, 'w') as f:
+            json.dump(dict(summary, meta=meta), f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\n📄 Report written to {args.output}")
+
+    if args.compare:
+        regressed = compare(summary['results'], args.compare, args.threshold)
+        if regressed:
+            print(f"⚠️ Startup regressions: {', '.join(regressed)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Fingerprint and precompress static assets for Q&A Platform
+
+Copies static/css/*.css and static/js/*.js to static/dist/ under
+content-hashed names, writes a .gz sibling for each, and records the
+mapping in static/dist/manifest.json for the asset_url() template helper.
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+SOURCE_PATTERNS = ['css/*.css', 'js/*.js']
+
+
+def fingerprint(path):
+    """Short content hash used in the output file name"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def build_static():
+    print("=== Building static assets ===")
+
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+
+    manifest = {}
+    for pattern in SOURCE_PATTERNS:
+        for source in sorted(glob.glob(os.path.join(STATIC_DIR, pattern))):
+            logical = os.path.relpath(source, STATIC_DIR).replace(os.sep, '/')
+            stem, ext = os.path.splitext(logical)
+            hashed = f'{stem}.{fingerprint(source)}{ext}'
+
+            target = os.path.join(DIST_DIR, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+
+            with open(source, 'rb') as f:
+                data = f.read()
+            with open(target + '.gz', 'wb') as f:
+                # mtime=0 keeps builds byte-for-byte reproducible
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+
+            manifest[logical] = hashed
+            print(f"✅ {logical} -> {hashed} ({len(data)} bytes, "
+                  f"{os.path.getsize(target + '.gz')} gzipped)")
+
+    with open(os.path.join(DIST_DIR, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print(f"Built {len(manifest)} assets into {DIST_DIR}")
+    return manifest
+
+
+if __name__ == '__main__':
+    build_static()
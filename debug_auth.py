@@ -3,9 +3,11 @@
 Debug script to test authentication and fix database issues
 """
 
-from app import app, db, User
+from app import create_app, db, User
 from werkzeug.security import generate_password_hash, check_password_hash
 
+app = create_app()
+
 def test_authentication():
     with app.app_context():
         print("=== Authentication Debug ===")
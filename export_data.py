@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Bulk export for Q&A Platform
+
+    python export_data.py questions --output questions.ndjson.gz --gzip
+    python export_data.py votes --format csv --since 2025-06-01T00:00:00 > votes.csv
+
+Streams rows in id order from a server-side cursor, so memory stays flat
+however large the table. ``--after-id`` resumes an interrupted export.
+"""
+
+from datetime import datetime
+import argparse
+import sys
+import time
+
+from app import create_app
+from services.export import ENTITIES, FORMATS, export
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Stream users, questions, answers or votes as NDJSON/CSV')
+    parser.add_argument('entity', choices=ENTITIES)
+    parser.add_argument('--format', choices=FORMATS, default='ndjson')
+    parser.add_argument('--since', type=datetime.fromisoformat,
+                        help='only rows changed (users: created) at or after this ISO-8601 time (UTC unless it has an offset)')
+    parser.add_argument('--after-id', type=int, help='only rows with a greater id')
+    parser.add_argument('--gzip', action='store_true', help='gzip the output')
+    parser.add_argument('--output', help='file to write (default: stdout)')
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    started = time.perf_counter()
+    written = 0
+    try:
+        with create_app().app_context():
+            for chunk in export(args.entity, args.format, args.since, args.after_id, args.gzip):
+                out.write(chunk)
+                written += len(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Exported {args.entity}: {written / 1e6:.1f} MB in {elapsed:.1f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
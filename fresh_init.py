@@ -4,10 +4,12 @@ Fresh database initialization with all enhanced features
 """
 
 import os
-from app import app, db, User, Question, Tag, Answer, Badge, UserBadge, Notification
+from app import create_app, db, User, Question, Tag, Answer, Badge, UserBadge, Notification
 from werkzeug.security import generate_password_hash
 from init_badges import init_badges, award_badges_to_all_users
 
+app = create_app()
+
 def fresh_init():
     with app.app_context():
         print("=== Fresh Database Initialization ===")
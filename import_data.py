@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Bulk import for Q&A Platform
+
+    python import_data.py legacy-forum-a dump.ndjson [--errors rejected.ndjson]
+    zcat dump.ndjson.gz | python import_data.py legacy-forum-a -
+
+Rerunning with the same source name after a failure resumes after the
+last committed chunk. See services/importer.py for the record format.
+"""
+
+import argparse
+import json
+import sys
+
+from app import create_app
+from services.importer import CHUNK_SIZE, BulkImporter, ImportFailed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import NDJSON users, tags, questions, answers and votes')
+    parser.add_argument('source', help='name identifying this import (used to resume it)')
+    parser.add_argument('path', help="NDJSON file, or '-' for stdin")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--errors', help='write rejected rows (line, type, error) here as NDJSON')
+    args = parser.parse_args(argv)
+
+    importer = BulkImporter(args.source, args.chunk_size, progress=lambda message: print(f"  {message}"))
+    stream = sys.stdin if args.path == '-' else open(args.path, encoding='utf-8')
+    try:
+        with create_app().app_context():
+            print(f"📥 Importing {args.path} as {args.source!r}...")
+            report = importer.run(stream)
+    except ImportFailed as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    if args.errors and report['errors']:
+        with open(args.errors, 'w') as f:
+            for error in report['errors']:
+                f.write(json.dumps(error) + '\n')
+
+    imported = ', '.join(f"{count} {entity}s" for entity, count in report['imported'].items() if count)
+    print(f"✅ Imported {imported or 'nothing'} in {report['seconds']}s ({report['rows_per_second']:,.0f} rows/s)")
+    if report['renamed']:
+        print(f"⚠️ Renamed {len(report['renamed'])} users whose username was taken by another account")
+    if report['rejected']:
+        print(f"⚠️ Rejected {report['rejected']} rows" + (f" (see {args.errors})" if args.errors else ''))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
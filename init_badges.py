@@ -3,9 +3,11 @@
 Initialize badge system for Q&A Platform
 """
 
-from app import app, db, Badge, UserBadge, User
+from app import create_app, db, Badge, UserBadge, User
 from datetime import datetime
 
+app = create_app()
+
 def init_badges():
     """Initialize the badge system with predefined badges"""
     with app.app_context():
@@ -3,10 +3,12 @@
 Improved database initialization script
 """
 
-from app import app, db, User, Question, Tag, Answer
+from app import create_app, db, User, Question, Tag, Answer
 from werkzeug.security import generate_password_hash
 from datetime import datetime
 
+app = create_app()
+
 def init_database():
     with app.app_context():
         print("=== Database Initialization ===")
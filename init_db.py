@@ -1,6 +1,8 @@
-from app import app, db, User, Question, Answer, Tag
+from app import create_app, db, User, Question, Answer, Tag
 from werkzeug.security import generate_password_hash
 
+app = create_app()
+
 def init_database():
     with app.app_context():
         # Drop all tables and recreate
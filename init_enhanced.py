@@ -3,10 +3,12 @@
 Enhanced database initialization with all features
 """
 
-from app import app, db, User, Question, Tag, Answer, Badge, UserBadge, Notification
+from app import create_app, db, User, Question, Tag, Answer, Badge, UserBadge, Notification
 from werkzeug.security import generate_password_hash
 from init_badges import init_badges, award_badges_to_all_users
 
+app = create_app()
+
 def init_enhanced_database():
     with app.app_context():
         print("=== Enhanced Database Initialization ===")
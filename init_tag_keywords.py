@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Seed the keyword -> tag map used for AI tag suggestions
+"""
+
+from app import create_app, db, TagKeyword
+from ai_features import DEFAULT_TAG_KEYWORDS, TagSuggester
+
+app = create_app()
+
+def init_tag_keywords():
+    """Copy the built-in keyword map into the tag_keyword table"""
+    with app.app_context():
+        print("=== Initializing Tag Keywords ===")
+        
+        existing = set(db.session.query(TagKeyword.keyword, TagKeyword.tag_name).all())
+        created = 0
+        
+        for keyword, tag_names in DEFAULT_TAG_KEYWORDS.items():
+            for position, tag_name in enumerate(tag_names):
+                if (keyword, tag_name) in existing:
+                    continue
+                weight = 1.0 if position == 0 else TagSuggester.SECONDARY_TAG_WEIGHT
+                db.session.add(TagKeyword(keyword=keyword, tag_name=tag_name, weight=weight))
+                created += 1
+        
+        db.session.commit()
+        print(f"✅ Created {created} keyword mappings ({len(existing)} already present)")
+
+if __name__ == '__main__':
+    init_tag_keywords()
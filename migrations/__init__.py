@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Schema migrations for Q&A Platform
+
+    python -m migrations upgrade   # create missing tables, then apply pending migrations
+    python -m migrations status
+    python -m migrations advise    # report indexes missing for the queries the app issues
+
+Migrations live in ``migrations/m<NNNN>_<name>.py`` and register an
+``upgrade(connection)`` function with @migration. They run on an
+AUTOCOMMIT connection so PostgreSQL indexes can be built CONCURRENTLY
+(without blocking writes); every step must therefore be idempotent.
+Applied versions are recorded in the ``schema_migrations`` table.
+"""
+
+from datetime import datetime
+import importlib
+import pkgutil
+
+from sqlalchemy import text
+
+MIGRATIONS = {}  # version -> (description, upgrade)
+
+
+def migration(version, description):
+    """Register ``upgrade(connection)`` as migration ``version``"""
+    def decorator(upgrade):
+        if version in MIGRATIONS:
+            raise ValueError(f'Duplicate migration version {version}')
+        MIGRATIONS[version] = (description, upgrade)
+        return upgrade
+    return decorator
+
+
+def load_migrations():
+    for module in sorted(m.name for m in pkgutil.iter_modules(__path__) if m.name.startswith('m')):
+        importlib.import_module(f'{__name__}.{module}')
+    return dict(sorted(MIGRATIONS.items()))
+
+
+def create_index(connection, name, table, columns, unique=False, where=None):
+    """CREATE INDEX IF NOT EXISTS; CONCURRENTLY on PostgreSQL so writes keep flowing"""
+    dialect = connection.dialect.name
+    concurrently = ''
+    if dialect == 'postgresql':
+        concurrently = 'CONCURRENTLY '
+        # An interrupted concurrent build leaves an INVALID index that IF NOT EXISTS would skip
+        invalid = connection.execute(text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"), {'name': name}).first()
+        if invalid:
+            connection.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    statement = (f'CREATE {"UNIQUE " if unique else ""}INDEX {concurrently}IF NOT EXISTS '
+                 f'"{name}" ON "{table}" ({column_list})')
+    if where:
+        statement += f' WHERE {where}'
+    connection.execute(text(statement))
+
+
+def drop_index(connection, name):
+    concurrently = 'CONCURRENTLY ' if connection.dialect.name == 'postgresql' else ''
+    connection.execute(text(f'DROP INDEX {concurrently}IF EXISTS "{name}"'))
+
+
+def applied_versions():
+    from app import SchemaMigration
+    return {row.version for row in SchemaMigration.query.all()}
+
+
+def upgrade(verbose=True):
+    """Create missing tables and apply pending migrations; call inside an app context"""
+    from app import SchemaMigration, db
+
+    db.create_all()
+    applied = applied_versions()
+    pending = [(version, entry) for version, entry in load_migrations().items() if version not in applied]
+
+    for version, (description, step) in pending:
+        started = datetime.utcnow()
+        with db.engine.connect() as connection:
+            step(connection.execution_options(isolation_level='AUTOCOMMIT'))
+        db.session.add(SchemaMigration(version=version, description=description, applied_at=datetime.utcnow()))
+        db.session.commit()
+        if verbose:
+            elapsed = (datetime.utcnow() - started).total_seconds()
+            print(f"✅ Applied migration {version}: {description} ({elapsed:.1f}s)")
+
+    if verbose and not pending:
+        print("✅ Schema is up to date")
+    return [version for version, _ in pending]
+
+
+def status():
+    """[(version, description, applied)] for every known migration"""
+    from app import db
+    db.create_all()
+    applied = applied_versions()
+    return [(version, description, version in applied)
+            for version, (description, _) in load_migrations().items()]
+
+
+def add_column(connection, table, column, ddl):
+    """ALTER TABLE ... ADD COLUMN unless the column already exists"""
+    from sqlalchemy import inspect
+    if column not in {c['name'] for c in inspect(connection).get_columns(table)}:
+        connection.execute(text(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {ddl}'))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Command line entry point for schema migrations
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m migrations', description='Q&A Platform schema migrations')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('upgrade', help='create missing tables and apply pending migrations')
+    commands.add_parser('status', help='list migrations and whether they are applied')
+    advise = commands.add_parser('advise', help='replay traffic and report missing indexes')
+    advise.add_argument('--requests', type=int, default=100, help='requests of the benchmark traffic mix to replay')
+    advise.add_argument('--min-rows', type=int, default=1000, help='ignore tables smaller than this')
+    advise.add_argument('--seed', type=int, default=42)
+    advise.add_argument('--allow-writes', action='store_true',
+                        help='also replay votes and answers (writes to DATABASE_URL; use a scratch copy)')
+    args = parser.parse_args(argv)
+
+    # Index builds and backfills may run longer than a web request's statement timeout
+    os.environ.setdefault('DB_STATEMENT_TIMEOUT_MS', '0')
+    from app import create_app
+    from migrations import status, upgrade
+
+    app = create_app()
+
+    with app.app_context():
+        if args.command == 'upgrade':
+            upgrade()
+        elif args.command == 'status':
+            for version, description, applied in status():
+                print(f"{'✅' if applied else '⏳'} {version}  {description}")
+        else:
+            from migrations.advisor import IndexAdvisor, replay_traffic
+            from app import db
+
+            advisor = IndexAdvisor(db.engine)
+            with advisor.capture():
+                replay_traffic(app, args.requests, args.seed, allow_writes=args.allow_writes)
+            advisor.print_report(advisor.recommendations(min_rows=args.min_rows))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Index advisor: compare the predicates of observed queries with existing indexes
+
+Statements are captured from the engine while a workload runs and grouped
+by normalized shape. For each shape the WHERE, JOIN and ORDER BY column
+references are mapped back to their tables and turned into a candidate
+composite index (equality columns first, then one range/sort column).
+Candidates with no usable existing index are reported, together with the
+database's own plan for the statement so full scans stand out.
+"""
+
+from contextlib import contextmanager
+import re
+
+from sqlalchemy import event, inspect, text
+
+from utils.query_audit import normalize_statement
+from utils.slow_queries import slow_query_log
+
+SQL_KEYWORDS = {
+    'WHERE', 'ON', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 'OUTER', 'CROSS', 'ORDER', 'GROUP', 'LIMIT',
+    'OFFSET', 'HAVING', 'UNION', 'AS', 'SET', 'USING', 'FULL', 'NATURAL', 'WINDOW'
+}
+
+_TABLE_REF = re.compile(r'\b(?:FROM|JOIN|UPDATE)\s+"?(\w+)"?(?:\s+(?:AS\s+)?"?(\w+)"?)?', re.I)
+_COLUMN = r'"?(\w+)"?\."?(\w+)"?'
+_COMPARISON = re.compile(_COLUMN + r'\s*(=|!=|<>|<=|>=|<|>|\bIN\b|\bIS\b|\bLIKE\b|\bBETWEEN\b)\s*(?:' + _COLUMN + ')?', re.I)
+_REVERSED_EQUALITY = re.compile(r'(?:\?|:\w+|%\(\w+\)s|\$\d+)\s*=\s*' + _COLUMN)  # lazy loads: "? = answer.question_id"
+_ORDER_BY = re.compile(r'\bORDER BY\s+(.+?)(?:\bLIMIT\b|\bOFFSET\b|\)|$)', re.I | re.S)
+
+EQUALITY = {'=', 'IN', 'IS'}
+
+
+def table_aliases(statement):
+    """{alias or table name: table name} for tables referenced in FROM/JOIN/UPDATE"""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(statement):
+        if table.upper() in SQL_KEYWORDS or table.upper() == 'SELECT':
+            continue
+        aliases[table] = table
+        if alias and alias.upper() not in SQL_KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def candidate_indexes(statement):
+    """{table: (equality columns, range/order column or None)} from one statement's predicates"""
+    aliases = table_aliases(statement)
+    predicates = {}
+
+    def add(alias, column, kind):
+        table = aliases.get(alias)
+        if table is None:
+            return
+        eq, ordered = predicates.setdefault(table, ([], []))
+        target = eq if kind == 'eq' else ordered
+        if column not in eq and column not in target:
+            target.append(column)
+
+    where = re.split(r'\bWHERE\b', statement, maxsplit=1, flags=re.I)
+    for match in _COMPARISON.finditer(statement):
+        alias, column, operator, other_alias, other_column = match.groups()
+        operator = operator.upper()
+        if operator in ('!=', '<>', 'LIKE'):
+            continue  # LIKE is only indexable for prefix patterns, which the app doesn't issue
+        kind = 'eq' if operator in EQUALITY else 'range'
+        add(alias, column, kind)
+        if other_alias:  # join condition: either side may be the inner table
+            add(other_alias, other_column, kind)
+
+    for alias, column in _REVERSED_EQUALITY.findall(statement):
+        add(alias, column, 'eq')
+
+    for clause in _ORDER_BY.findall(where[-1]):
+        for alias, column in re.findall(_COLUMN, clause):
+            add(alias, column, 'range')
+
+    return {table: (tuple(eq), ordered[0] if ordered else None) for table, (eq, ordered) in predicates.items()}
+
+
+def prefix_match(index_columns, eq_columns, range_column):
+    """How many leading columns of an existing index the predicates can use"""
+    used = 0
+    for column in index_columns:
+        if column in eq_columns:
+            used += 1
+        elif column == range_column:
+            return used + 1
+        else:
+            break
+    return used
+
+
+def full_scans(plan_lines):
+    """Tables the plan reads without an index (SQLite 'SCAN t', PostgreSQL 'Seq Scan on t')"""
+    scanned = set()
+    for line in plan_lines or ():
+        match = re.search(r'\bSCAN (?:TABLE )?"?(\w+)"?', line)
+        if match and 'USING' not in line:
+            scanned.add(match.group(1))
+        match = re.search(r'Seq Scan on "?(\w+)"?', line)
+        if match:
+            scanned.add(match.group(1))
+    return scanned
+
+
+class IndexAdvisor:
+    """Capture statements from ``engine`` and recommend indexes for them"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = {}  # shape -> {'statement', 'parameters', 'count'}
+
+    @contextmanager
+    def capture(self):
+        def observe(conn, cursor, statement, parameters, context, executemany):
+            if executemany or not statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                return
+            shape = normalize_statement(statement)
+            entry = self.statements.get(shape)
+            if entry is None:
+                self.statements[shape] = {'statement': statement, 'parameters': parameters, 'count': 1}
+            else:
+                entry['count'] += 1
+
+        event.listen(self.engine, 'before_cursor_execute', observe)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, 'before_cursor_execute', observe)
+
+    def existing_indexes(self):
+        """{table: [column tuples]} covering primary keys, unique constraints and indexes"""
+        inspector = inspect(self.engine)
+        indexes = {}
+        for table in inspector.get_table_names():
+            columns = [tuple(inspector.get_pk_constraint(table)['constrained_columns'])]
+            columns += [tuple(u['column_names']) for u in inspector.get_unique_constraints(table)]
+            columns += [tuple(i['column_names']) for i in inspector.get_indexes(table)]
+            indexes[table] = [c for c in columns if c]
+        return indexes
+
+    def row_counts(self, tables):
+        with self.engine.connect() as connection:
+            return {table: connection.execute(text(f'SELECT COUNT(*) FROM "{table}"')).scalar() for table in tables}
+
+    def recommendations(self, min_rows=1000):
+        """Missing or under-used indexes, most frequently needed first"""
+        indexes = self.existing_indexes()
+        rows = self.row_counts(indexes)
+        found = {}
+
+        for shape, entry in self.statements.items():
+            plan = None
+            for table, (eq, range_column) in candidate_indexes(entry['statement']).items():
+                if table not in indexes or rows.get(table, 0) < min_rows:
+                    continue
+                wanted = len(eq) + (1 if range_column else 0)
+                best = max((prefix_match(columns, eq, range_column) for columns in indexes[table]), default=0)
+                if best >= wanted:
+                    continue
+                if plan is None:
+                    with self.engine.connect() as connection:
+                        plan = slow_query_log.explain(connection, entry['statement'], entry['parameters']) or []
+
+                columns = eq + ((range_column,) if range_column else ())
+                key = (table, columns)
+                rec = found.setdefault(key, {
+                    'table': table,
+                    'columns': list(columns),
+                    'status': 'missing' if best == 0 else 'partial',
+                    'rows': rows[table],
+                    'calls': 0,
+                    'shapes': [],
+                    'full_scan': False
+                })
+                rec['calls'] += entry['count']
+                rec['shapes'].append(shape)
+                rec['full_scan'] |= table in full_scans(plan)
+
+        # Drop candidates that a longer recommendation on the same table already covers
+        results = list(found.values())
+        for rec in list(results):
+            for other in results:
+                if other is not rec and other['table'] == rec['table'] and \
+                        other['columns'][:len(rec['columns'])] == rec['columns'] and len(other['columns']) > len(rec['columns']):
+                    other['calls'] += rec['calls']
+                    other['shapes'] += rec['shapes']
+                    other['full_scan'] |= rec['full_scan']
+                    results.remove(rec)
+                    break
+        return sorted(results, key=lambda rec: (-rec['full_scan'], -rec['calls']))
+
+    @staticmethod
+    def print_report(recommendations):
+        if not recommendations:
+            print("✅ Every observed query shape has a usable index")
+            return
+        print(f"Found {len(recommendations)} index recommendation(s):\n")
+        for rec in recommendations:
+            marker = '🔥 full scan' if rec['full_scan'] else rec['status']
+            print(f"  {rec['table']}({', '.join(rec['columns'])})  [{marker}]  "
+                  f"{rec['calls']} calls, {len(rec['shapes'])} shape(s), {rec['rows']} rows")
+            print(f"      e.g. {rec['shapes'][0][:160]}")
+
+
+# Actions of the benchmark traffic mix that write (votes, answers)
+WRITE_ACTIONS = ('vote', 'answer')
+
+
+def replay_traffic(app, requests, seed=42, allow_writes=False):
+    """Issue ``requests`` requests of the benchmark traffic mix in-process
+
+    Only the read actions run unless ``allow_writes``: the replay goes to
+    whatever DATABASE_URL points at. Question views' buffered view counts
+    are discarded rather than flushed.
+    """
+    import random
+    from benchmarks.load import DEFAULT_MIX, Actions, TestClientSession
+    from app import Question, User
+    from utils.counters import buffers
+
+    mix = {name: weight for name, weight in DEFAULT_MIX.items() if allow_writes or name not in WRITE_ACTIONS}
+    csrf_enabled = app.config.get('WTF_CSRF_ENABLED', True)
+    max_ages = [buffer.max_age for buffer in buffers]
+    app.config['WTF_CSRF_ENABLED'] = False
+    try:
+        if not allow_writes:
+            for buffer in buffers:
+                buffer.max_age = float('inf')
+        counts = {'users': max(1, User.query.count()), 'questions': max(1, Question.query.count())}
+        rng = random.Random(seed)
+        session = TestClientSession(app)
+        session.login('user1')
+        actions = Actions(session, rng, counts)
+        names, weights = zip(*mix.items())
+        for _ in range(requests):
+            getattr(actions, rng.choices(names, weights)[0])()
+    finally:
+        app.config['WTF_CSRF_ENABLED'] = csrf_enabled
+        if not allow_writes:
+            for buffer, max_age in zip(buffers, max_ages):
+                buffer.discard()
+                buffer.max_age = max_age
@@ -0,0 +1,24 @@
+"""
+Indexes for the columns hot queries filter, join and sort on
+"""
+
+from migrations import create_index, migration
+
+INDEXES = [
+    ('ix_question_created_at', 'question', ['created_at']),
+    ('ix_question_user_id', 'question', ['user_id']),
+    ('ix_answer_question_id', 'answer', ['question_id']),
+    ('ix_answer_user_id', 'answer', ['user_id']),
+    ('ix_vote_question_id', 'vote', ['question_id']),
+    ('ix_vote_answer_id', 'vote', ['answer_id']),
+    ('ix_vote_user_question', 'vote', ['user_id', 'question_id']),
+    ('ix_vote_user_answer', 'vote', ['user_id', 'answer_id']),
+    ('ix_notification_user_unread', 'notification', ['user_id', 'is_read', 'created_at']),
+    ('ix_question_tags_tag_id', 'question_tags', ['tag_id']),
+]
+
+
+@migration('0001', 'Add hot-path indexes on questions, answers, votes, notifications and tags')
+def upgrade(connection):
+    for name, table, columns in INDEXES:
+        create_index(connection, name, table, columns)
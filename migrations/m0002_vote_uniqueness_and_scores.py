@@ -0,0 +1,30 @@
+"""
+One vote per user and target, plus denormalized question/answer scores
+"""
+
+from sqlalchemy import text
+
+from migrations import add_column, create_index, drop_index, migration
+
+
+@migration('0002', 'Deduplicate votes, add unique partial vote indexes and score columns')
+def upgrade(connection):
+    add_column(connection, 'question', 'score', 'INTEGER NOT NULL DEFAULT 0')
+    add_column(connection, 'answer', 'score', 'INTEGER NOT NULL DEFAULT 0')
+
+    # Read-then-write voting left duplicates behind; keep each user's latest vote
+    for column in ('question_id', 'answer_id'):
+        connection.execute(text(
+            f'DELETE FROM vote WHERE {column} IS NOT NULL AND id NOT IN '
+            f'(SELECT MAX(id) FROM vote WHERE {column} IS NOT NULL GROUP BY user_id, {column})'))
+        create_index(connection, f'uq_vote_user_{column[:-3]}', 'vote', ['user_id', column],
+                     unique=True, where=f'{column} IS NOT NULL')
+
+    # The unique indexes serve the same lookups as the 0001 composites
+    drop_index(connection, 'ix_vote_user_question')
+    drop_index(connection, 'ix_vote_user_answer')
+
+    for table, column in (('question', 'question_id'), ('answer', 'answer_id')):
+        connection.execute(text(
+            f'UPDATE "{table}" SET score = COALESCE('
+            f'(SELECT SUM(value) FROM vote WHERE vote.{column} = "{table}".id), 0)'))
@@ -0,0 +1,11 @@
+"""
+Track when each vote was cast or last changed, for incremental exports
+"""
+
+from migrations import add_column, create_index, migration
+
+
+@migration('0003', 'Add vote.updated_at for incremental exports')
+def upgrade(connection):
+    add_column(connection, 'vote', 'updated_at', 'TIMESTAMP')
+    create_index(connection, 'ix_vote_updated_at', 'vote', ['updated_at'])
@@ -0,0 +1,11 @@
+"""
+Backfill the daily_stats rollup behind /api/v1/stats
+"""
+
+from migrations import migration
+
+
+@migration('0004', 'Backfill daily_stats rollup')
+def upgrade(connection):
+    from services.stats import rebuild_daily_stats
+    rebuild_daily_stats(connection)
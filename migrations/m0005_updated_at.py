@@ -0,0 +1,22 @@
+"""
+Track when questions and answers last changed, for incremental exports,
+and backfill vote.updated_at left NULL by 0003
+"""
+
+from sqlalchemy import text
+
+from migrations import add_column, create_index, migration
+
+
+@migration('0005', 'Add question/answer updated_at; backfill vote.updated_at')
+def upgrade(connection):
+    for table in ('question', 'answer'):
+        add_column(connection, table, 'updated_at', 'TIMESTAMP')
+        connection.execute(text(f'UPDATE "{table}" SET updated_at = created_at WHERE updated_at IS NULL'))
+        create_index(connection, f'ix_{table}_updated_at', table, ['updated_at'])
+
+    # Votes carry no creation time; their target's is the closest lower bound
+    for table, column in (('question', 'question_id'), ('answer', 'answer_id')):
+        connection.execute(text(
+            f'UPDATE vote SET updated_at = (SELECT created_at FROM "{table}" WHERE "{table}".id = vote.{column}) '
+            f'WHERE updated_at IS NULL AND {column} IS NOT NULL'))
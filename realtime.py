@@ -3,21 +3,144 @@
 Real-time features for Q&A Platform
 """
 
+from flask import current_app, request
+from flask_login import current_user
 from flask_socketio import SocketIO, emit, join_room, leave_room
-from app import app, db, User, Question, Answer, Notification
+from utils.metrics import registry
 from datetime import datetime
 import json
+import threading
 
-# Initialize SocketIO
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Handlers register on this instance at import; init_realtime() attaches it
+# to the app, so importing this module doesn't import (or build) the app
+socketio = SocketIO()
+
+# Online users across workers (utils/presence.py), set by init_realtime()
+presence = None
+# sid -> user id for the sockets this process holds; re-announced every ttl/3
+local_connections = {}
+_heartbeat_started = False
+_emitter = None
+
+def init_realtime(app):
+    """Attach the Socket.IO server (wraps app.wsgi_app) with its message queue and presence store"""
+    global presence
+    from utils.presence import presence_store
+    from utils.pubsub import queue_options
+
+    # Coalesced deltas carry absolute values, so a backed-up client can skip
+    # them and resync instead of queueing every one
+    options = queue_options(app.config['SOCKETIO_MESSAGE_QUEUE'], app.config['SOCKETIO_CHANNEL'],
+                            droppable=(QuestionUpdates.event,), max_backlog=app.config['REALTIME_MAX_BACKLOG'])
+    if app.config['SOCKETIO_TRANSPORTS']:
+        options['transports'] = app.config['SOCKETIO_TRANSPORTS']
+    # async_mode matches the server's worker model, see serve.py; None autodetects
+    socketio.init_app(app, cors_allowed_origins="*", async_mode=app.config['SOCKETIO_ASYNC_MODE'], **options)
+    presence = presence_store(app.config['PRESENCE_URL'], app.config['PRESENCE_TTL'])
+    question_updates.window = app.config['REALTIME_COALESCE_MS'] / 1000
+    return socketio
+
+def emitter():
+    """The attached server, else a write-only emitter on the message queue, else None
+
+    Lets scripts and the scheduler worker reach connected clients when a
+    shared queue is configured.
+    """
+    global _emitter
+    if socketio.server is not None:
+        return socketio
+    if _emitter is None:
+        from utils.pubsub import is_shared, queue_options
+
+        url = current_app.config['SOCKETIO_MESSAGE_QUEUE']
+        if not is_shared(url):
+            return None
+        _emitter = SocketIO()
+        _emitter.init_app(None, **queue_options(url, current_app.config['SOCKETIO_CHANNEL'], write_only=True))
+    return _emitter
+
+def _heartbeat():
+    """Keep this worker's users online in the shared store"""
+    while True:
+        socketio.sleep(presence.ttl / 3)
+        try:
+            presence.heartbeat(dict(local_connections))
+        except Exception as e:
+            print(f"⚠️ Presence heartbeat failed: {e}")
+
+def _ensure_heartbeat():
+    global _heartbeat_started
+    # Started on the first connection, so it runs in the worker that holds the
+    # sockets (not a preloading master) and under the server's async mode
+    if not _heartbeat_started:
+        _heartbeat_started = True
+        socketio.start_background_task(_heartbeat)
+
+QUESTION_CHANGES = registry.counter('realtime_question_changes_total', 'Vote/answer/accept changes published to question rooms')
+QUESTION_DELTAS = registry.counter('realtime_question_deltas_total', 'Coalesced question_delta events emitted')
+
+class QuestionUpdates:
+    """Coalesces changes per question room into one delta event per window
+
+    A burst of votes on a hot question becomes a single ``question_delta``
+    to ``question_<id>``. Deltas carry absolute values (scores, answer count,
+    accepted answer), so later ones supersede earlier ones and a client that
+    misses some (see utils/pubsub.py backpressure) only needs to resync.
+    """
+    event = 'question_delta'
+
+    def __init__(self, window=0.25):
+        self.window = window
+        self._pending = {}  # question_id -> delta
+        self._flush_scheduled = False
+        self._lock = threading.Lock()
+
+    def publish(self, question_id, score=None, answer_scores=None, new_answer_id=None,
+                answer_count=None, accepted_answer_id=None):
+        """Merge a change into the question's pending delta; no-op without a Socket.IO server or queue"""
+        sender = emitter()
+        if sender is None:
+            return
+        with self._lock:
+            delta = self._pending.setdefault(question_id, {'question_id': question_id})
+            if score is not None:
+                delta['score'] = score
+            if answer_scores:
+                delta.setdefault('answer_scores', {}).update({str(k): v for k, v in answer_scores.items()})
+            if new_answer_id is not None:
+                delta.setdefault('new_answer_ids', []).append(new_answer_id)
+            if answer_count is not None:
+                delta['answer_count'] = answer_count
+            if accepted_answer_id is not None:
+                delta['accepted_answer_id'] = accepted_answer_id
+            QUESTION_CHANGES.inc()
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        sender.start_background_task(self._flush_later, sender)
+
+    def _flush_later(self, sender):
+        sender.sleep(self.window)
+        self.flush(sender)
+
+    def flush(self, sender=None):
+        """Emit every pending delta now"""
+        sender = sender or emitter()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flush_scheduled = False
+        for question_id, delta in pending.items():
+            sender.emit(self.event, delta, to=f'question_{question_id}')
+            QUESTION_DELTAS.inc()
+
+
+question_updates = QuestionUpdates()
 
 class NotificationManager:
-    def __init__(self):
-        self.active_users = set()
-    
     def create_notification(self, user_id, content, notification_type='info'):
         """Create and send notification"""
-        with app.app_context():
+        from app import db, Notification
+        with current_app._get_current_object().app_context():
             notification = Notification(
                 user_id=user_id,
                 content=content,
@@ -26,19 +149,23 @@ class NotificationManager:
             db.session.add(notification)
             db.session.commit()
             
-            # Send real-time notification
-            socketio.emit('notification', {
-                'id': notification.id,
-                'content': content,
-                'type': notification_type,
-                'created_at': notification.created_at.isoformat()
-            }, room=f'user_{user_id}')
+            # Send real-time notification (processes without a server or a
+            # shared queue just store the row)
+            sender = emitter()
+            if sender is not None:
+                sender.emit('notification', {
+                    'id': notification.id,
+                    'content': content,
+                    'type': notification_type,
+                    'created_at': notification.created_at.isoformat()
+                }, room=f'user_{user_id}')
             
             return notification
     
     def notify_new_question(self, question):
         """Notify users about new question in their interested tags"""
-        with app.app_context():
+        from app import Answer, Question, Tag
+        with current_app._get_current_object().app_context():
             # Get users who might be interested in this question
             interested_users = set()
             
@@ -89,9 +216,12 @@ def on_connect():
     print(f'Client connected: {request.sid}')
     
     # Join user-specific room if authenticated
+    from app import Notification
     if current_user.is_authenticated:
         join_room(f'user_{current_user.id}')
-        notification_manager.active_users.add(current_user.id)
+        local_connections[request.sid] = current_user.id
+        presence.join(current_user.id, request.sid)
+        _ensure_heartbeat()
         
         # Send unread notifications count
         unread_count = Notification.query.filter_by(
@@ -105,14 +235,16 @@ def on_connect():
 def on_disconnect():
     print(f'Client disconnected: {request.sid}')
     
-    if current_user.is_authenticated:
-        notification_manager.active_users.discard(current_user.id)
+    user_id = local_connections.pop(request.sid, None)
+    if user_id is not None:
+        presence.leave(user_id, request.sid)
 
 @socketio.on('mark_notifications_read')
 def on_mark_notifications_read():
     """Mark all notifications as read for current user"""
+    from app import db, Notification
     if current_user.is_authenticated:
-        with app.app_context():
+        with current_app._get_current_object().app_context():
             Notification.query.filter_by(user_id=current_user.id, is_read=False).update({'is_read': True})
             db.session.commit()
             
@@ -158,7 +290,7 @@ def on_leave_question(data):
 # Live user count
 @socketio.on('request_online_count')
 def on_request_online_count():
-    emit('online_count', {'count': len(notification_manager.active_users)})
+    emit('online_count', {'count': presence.count()})
 
 # Helper functions to trigger notifications
 def trigger_new_question_notification(question):
@@ -176,3 +308,23 @@ def trigger_accepted_answer_notification(answer):
 def trigger_badge_notification(user_id, badge_name):
     """Trigger notification for earned badge"""
     notification_manager.notify_badge_earned(user_id, badge_name)
+
+def trigger_answer_delta(answer):
+    """Push a new answer and the question's answer count to its room"""
+    from app import Answer
+    if emitter() is None:
+        return
+    count = Answer.query.filter_by(question_id=answer.question_id).count()
+    question_updates.publish(answer.question_id, new_answer_id=answer.id, answer_count=count)
+
+def trigger_accept_delta(answer):
+    """Push the question's newly accepted answer to its room"""
+    question_updates.publish(answer.question_id, accepted_answer_id=answer.id)
+
+def trigger_vote_deltas(changes):
+    """Push new scores to question rooms; ``changes`` is [(question_id, item_type, item_id, score)]"""
+    for question_id, item_type, item_id, score in changes:
+        if item_type == 'question':
+            question_updates.publish(question_id, score=score)
+        else:
+            question_updates.publish(question_id, answer_scores={item_id: score})
@@ -1,14 +1,10 @@
 from flask import Blueprint, request, jsonify, url_for
 from flask_login import login_required, current_user
 from datetime import datetime
-
-# Import models from app (they're defined there)
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from sqlalchemy.orm import selectinload
 
 # Import the app to get access to models
-from app import Question, Tag, Vote, Answer, db
+from app import Question, Tag, Answer, db, question_tags
 
 # Import QuestionService if it exists, otherwise define basic functions
 try:
@@ -17,13 +13,9 @@ except ImportError:
     class QuestionService:
         @staticmethod
         def create_question(title, content, tag_names, user_id):
+            from services.tag_resolver import tag_resolver
             question = Question(title=title, content=content, user_id=user_id)
-            for tag_name in tag_names:
-                tag = Tag.query.filter_by(name=tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    db.session.add(tag)
-                question.tags.append(tag)
+            question.tags = tag_resolver.get_tags(tag_names)
             db.session.add(question)
             db.session.commit()
             return question
@@ -37,56 +29,40 @@ except ImportError:
         
         @staticmethod
         def vote(item_type, item_id, user_id, value):
-            if item_type == 'question':
-                existing_vote = Vote.query.filter_by(user_id=user_id, question_id=item_id, answer_id=None).first()
-                if existing_vote:
-                    existing_vote.value = value
-                else:
-                    vote = Vote(value=value, user_id=user_id, question_id=item_id)
-                    db.session.add(vote)
-            elif item_type == 'answer':
-                existing_vote = Vote.query.filter_by(user_id=user_id, answer_id=item_id, question_id=None).first()
-                if existing_vote:
-                    existing_vote.value = value
-                else:
-                    vote = Vote(value=value, user_id=user_id, answer_id=item_id)
-                    db.session.add(vote)
-            db.session.commit()
+            from services.votes import cast_vote
+            return cast_vote(item_type, item_id, user_id, value)
+        
+        @staticmethod
+        def vote_many(user_id, votes):
+            from services.votes import cast_votes
+            return cast_votes(user_id, votes)
         
         @staticmethod
         def get_vote_count(item_type, item_id):
-            if item_type == 'question':
-                question = Question.query.get(item_id)
-                return sum(vote.value for vote in question.votes) if question else 0
-            else:
-                answer = Answer.query.get(item_id)
-                return sum(vote.value for vote in answer.votes) if answer else 0
+            model = Question if item_type == 'question' else Answer
+            return db.session.query(model.score).filter_by(id=item_id).scalar() or 0
         
         @staticmethod
         def get_answers_with_votes(question_id):
             answers = Answer.query.filter_by(question_id=question_id).all()
             answers_with_votes = []
             for answer in answers:
-                vote_count = QuestionService.get_vote_count('answer', answer.id)
-                answers_with_votes.append((answer, vote_count))
+                answers_with_votes.append((answer, answer.score))
             answers_with_votes.sort(key=lambda x: (not x[0].is_accepted, -x[1]))
             return answers_with_votes
 
-# Import AI helpers if available
-try:
-    from utils.helpers import get_ai_engines
-except ImportError:
-    def get_ai_engines():
-        from ai_features import AIRecommendationEngine, SmartSearchEngine, ContentAnalyzer
-        ai_engine = AIRecommendationEngine()
-        smart_search = SmartSearchEngine()
-        content_analyzer = ContentAnalyzer()
-        return ai_engine, smart_search, content_analyzer
+from utils.cache import VersionedCache
+from utils.counters import profile_views
+from utils.helpers import get_ai_engines
+from utils.http_cache import conditional, current_versions
+from utils.query_audit import query_budget
 
 questions_bp = Blueprint('questions_v1', __name__)
 
 # Question endpoints
 @questions_bp.route('/questions', methods=['GET'])
+@query_budget(6)
+@conditional(['questions', 'users'], cache_control='public, max-age=10, must-revalidate')
 def get_questions():
     """Get all questions with pagination and filtering"""
     page = request.args.get('page', 1, type=int)
@@ -94,7 +70,7 @@ def get_questions():
     tag_filter = request.args.get('tag')
     search = request.args.get('search')
     
-    query = Question.query
+    query = Question.query.options(selectinload(Question.author), selectinload(Question.tags))
     
     # Apply filters
     if tag_filter:
@@ -110,6 +86,7 @@ def get_questions():
     questions = query.order_by(Question.created_at.desc()).paginate(
         page=page, per_page=per_page, error_out=False
     )
+    answer_counts = _answer_counts([q.id for q in questions.items])
     
     return jsonify({
         'questions': [{
@@ -119,8 +96,8 @@ def get_questions():
             'author': q.author.username,
             'created_at': q.created_at.isoformat(),
             'tags': [tag.name for tag in q.tags],
-            'answers_count': len(q.answers),
-            'votes': QuestionService.get_vote_count('question', q.id),
+            'answers_count': answer_counts.get(q.id, 0),
+            'votes': q.score,
             'url': url_for('question_detail', id=q.id)
         } for q in questions.items],
         'pagination': {
@@ -135,14 +112,22 @@ def get_questions():
         }
     })
 
+def _answer_counts(question_ids):
+    """{question id: answer count} for a page of questions, in one GROUP BY"""
+    if not question_ids:
+        return {}
+    return dict(db.session.query(Answer.question_id, db.func.count(Answer.id))
+                .filter(Answer.question_id.in_(question_ids))
+                .group_by(Answer.question_id))
+
 @questions_bp.route('/questions/<int:question_id>', methods=['GET'])
+@conditional(lambda question_id: [f'question:{question_id}', 'users'], cache_control='public, no-cache')
 def get_question(question_id):
     """Get specific question with answers"""
     question = Question.query.get_or_404(question_id)
     
-    # Increment view count
-    question.author.profile_views += 1
-    db.session.commit()
+    # Increment view count (buffered, flushed in batches)
+    profile_views.add(question.user_id)
     
     # Get answers with votes
     answers_with_votes = QuestionService.get_answers_with_votes(question_id)
@@ -244,8 +229,7 @@ def vote_question(question_id):
         return jsonify({'error': 'Vote value must be 1 or -1'}), 400
     
     try:
-        QuestionService.vote('question', question_id, current_user.id, data['value'])
-        vote_count = QuestionService.get_vote_count('question', question_id)
+        vote_count = QuestionService.vote('question', question_id, current_user.id, data['value'])
         
         return jsonify({
             'question_id': question_id,
@@ -269,8 +253,7 @@ def vote_answer(answer_id):
         return jsonify({'error': 'Vote value must be 1 or -1'}), 400
     
     try:
-        QuestionService.vote('answer', answer_id, current_user.id, data['value'])
-        vote_count = QuestionService.get_vote_count('answer', answer_id)
+        vote_count = QuestionService.vote('answer', answer_id, current_user.id, data['value'])
         
         return jsonify({
             'answer_id': answer_id,
@@ -281,6 +264,30 @@ def vote_answer(answer_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@questions_bp.route('/votes/batch', methods=['POST'])
+@login_required
+def vote_batch():
+    """Apply many votes in one transaction: {"votes": [{"item_type", "item_id", "value"}, ...]}"""
+    from services.votes import InvalidVote, VoteTargetNotFound
+    
+    data = request.get_json()
+    if not data or not isinstance(data.get('votes'), list) or not data['votes']:
+        return jsonify({'error': 'Missing required field: votes'}), 400
+    
+    try:
+        votes = [(v.get('item_type'), v.get('item_id'), v.get('value')) for v in data['votes']]
+    except AttributeError:
+        return jsonify({'error': 'Each vote must be an object'}), 400
+    
+    try:
+        results = QuestionService.vote_many(current_user.id, votes)
+    except InvalidVote as e:
+        return jsonify({'error': str(e)}), 400
+    except VoteTargetNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    
+    return jsonify({'votes': results})
+
 @questions_bp.route('/answers/<int:answer_id>/accept', methods=['POST'])
 @login_required
 def accept_answer(answer_id):
@@ -344,24 +351,68 @@ def suggest_tags():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Tag listings keyed by (prefix, page, per_page), invalidated by the 'tags' version
+tag_list_cache = VersionedCache('tags')
+
 @questions_bp.route('/tags', methods=['GET'])
+@query_budget(3)
+@conditional(['tags'], cache_control='public, max-age=300')
 def get_tags():
-    """Get all tags with usage counts"""
-    tags = Tag.query.all()
-    
-    tag_data = []
-    for tag in tags:
-        question_count = len(tag.questions)
-        tag_data.append({
-            'id': tag.id,
-            'name': tag.name,
-            'questions_count': question_count
-        })
-    
-    # Sort by usage count
-    tag_data.sort(key=lambda x: x['questions_count'], reverse=True)
-    
-    return jsonify({
-        'tags': tag_data,
-        'total': len(tag_data)
-    })
+    """Get tags with usage counts, optionally filtered by name prefix and paginated"""
+    prefix = request.args.get('prefix', '').strip().lower()
+    page = request.args.get('page', type=int)
+    per_page = max(1, min(request.args.get('per_page', 50, type=int), 500))
+
+    version = current_versions(['tags'])['tags'][0]
+    return jsonify(tag_list_cache.get_or_compute(
+        (prefix, page, per_page if page else None),
+        version,
+        lambda: _load_tag_counts(prefix, page, per_page)
+    ))
+
+def _load_tag_counts(prefix, page, per_page):
+    """One GROUP BY query for the counts, plus a COUNT for the total when paginating"""
+    question_count = db.func.count(question_tags.c.question_id)
+    query = db.session.query(Tag.id, Tag.name, question_count.label('questions_count'))\
+        .outerjoin(question_tags, question_tags.c.tag_id == Tag.id)\
+        .group_by(Tag.id, Tag.name)\
+        .order_by(question_count.desc(), Tag.name)
+
+    name_filter = None
+    if prefix:
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        name_filter = Tag.name.like(escaped + '%', escape='\\')
+        query = query.filter(name_filter)
+
+    if page:
+        page = max(page, 1)
+        rows = query.limit(per_page).offset((page - 1) * per_page).all()
+        total_query = db.session.query(db.func.count(Tag.id))
+        if name_filter is not None:
+            total_query = total_query.filter(name_filter)
+        total = total_query.scalar()
+    else:
+        rows = query.all()
+        total = len(rows)
+
+    result = {
+        'tags': [{
+            'id': row.id,
+            'name': row.name,
+            'questions_count': row.questions_count
+        } for row in rows],
+        'total': total
+    }
+
+    if page:
+        pages = (total + per_page - 1) // per_page
+        result['pagination'] = {
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': pages,
+            'has_next': page < pages,
+            'has_prev': page > 1
+        }
+
+    return result
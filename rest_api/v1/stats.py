@@ -1,111 +1,34 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from datetime import datetime, timedelta
 
-# Import models from app (they're defined there)
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-
 from app import User, Question, Tag, Answer, db
 
-# Import badge models if available
-try:
-    from app import Badge, UserBadge
-except ImportError:
-    # Fallback if badge models aren't available
-    Badge = None
-    UserBadge = None
+from services.stats import SNAPSHOT_KEYS, activity, platform_stats
+from utils.http_cache import conditional
+from utils.query_audit import query_budget
 
 stats_bp = Blueprint('stats_v1', __name__)
 
+def _stats_window():
+    """'new_today'/'new_this_week' windows are day-granular, so they roll over at midnight UTC"""
+    return [datetime.utcnow().strftime('%Y-%m-%d')]
+
 @stats_bp.route('/stats', methods=['GET'])
+@query_budget(6)
+@conditional(SNAPSHOT_KEYS, cache_control='public, max-age=30', extra=_stats_window)
 def get_platform_stats():
-    """Get platform-wide statistics"""
-    return jsonify({
-        'users': {
-            'total': User.query.count(),
-            'new_today': User.query.filter(
-                User.created_at >= datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            ).count(),
-            'new_this_week': User.query.filter(
-                User.created_at >= datetime.utcnow() - timedelta(days=7)
-            ).count(),
-            'new_this_month': User.query.filter(
-                User.created_at >= datetime.utcnow() - timedelta(days=30)
-            ).count()
-        },
-        'questions': {
-            'total': Question.query.count(),
-            'new_today': Question.query.filter(
-                Question.created_at >= datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            ).count(),
-            'new_this_week': Question.query.filter(
-                Question.created_at >= datetime.utcnow() - timedelta(days=7)
-            ).count(),
-            'new_this_month': Question.query.filter(
-                Question.created_at >= datetime.utcnow() - timedelta(days=30)
-            ).count(),
-            'unanswered': Question.query.filter(~Question.answers.any()).count()
-        },
-        'answers': {
-            'total': Answer.query.count(),
-            'new_today': Answer.query.filter(
-                Answer.created_at >= datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            ).count(),
-            'new_this_week': Answer.query.filter(
-                Answer.created_at >= datetime.utcnow() - timedelta(days=7)
-            ).count(),
-            'new_this_month': Answer.query.filter(
-                Answer.created_at >= datetime.utcnow() - timedelta(days=30)
-            ).count(),
-            'accepted': Answer.query.filter_by(is_accepted=True).count()
-        },
-        'tags': {
-            'total': Tag.query.count(),
-            'most_used': get_most_used_tags(10)
-        },
-        'badges': {
-            'total': Badge.query.count(),
-            'total_awarded': UserBadge.query.count()
-        }
-    })
+    """Get platform-wide statistics (served from the daily_stats rollup)"""
+    return jsonify(platform_stats())
 
 @stats_bp.route('/stats/activity', methods=['GET'])
+@query_budget(2)
+@conditional(['questions'], cache_control='public, max-age=60', extra=_stats_window)
 def get_activity_stats():
     """Get activity statistics for different time periods"""
-    days = request.args.get('days', 7, type=int)
-    
-    cutoff_date = datetime.utcnow() - timedelta(days=days)
-    
-    # Questions per day
-    questions_per_day = db.session.query(
-        db.func.date(Question.created_at).label('date'),
-        db.func.count(Question.id).label('count')
-    ).filter(Question.created_at >= cutoff_date).group_by(
-        db.func.date(Question.created_at)
-    ).all()
-    
-    # Answers per day
-    answers_per_day = db.session.query(
-        db.func.date(Answer.created_at).label('date'),
-        db.func.count(Answer.id).label('count')
-    ).filter(Answer.created_at >= cutoff_date).group_by(
-        db.func.date(Answer.created_at)
-    ).all()
-    
-    return jsonify({
-        'period_days': days,
-        'questions_per_day': [{
-            'date': str(q.date),
-            'count': q.count
-        } for q in questions_per_day],
-        'answers_per_day': [{
-            'date': str(a.date),
-            'count': a.count
-        } for a in answers_per_day]
-    })
+    return jsonify(activity(request.args.get('days', 7, type=int)))
 
 @stats_bp.route('/stats/leaderboard', methods=['GET'])
+@query_budget(3)
 def get_leaderboard():
     """Get user leaderboard by reputation"""
     period = request.args.get('period', 'all')  # all, week, month
@@ -122,6 +45,7 @@ def get_leaderboard():
         # For now, return overall reputation
     
     users = query.order_by(User.reputation.desc()).limit(50).all()
+    question_counts, answer_counts = _content_counts([user.id for user in users])
     
     return jsonify({
         'period': period,
@@ -131,12 +55,26 @@ def get_leaderboard():
             'username': user.username,
             'reputation': user.reputation,
             'badge_level': user.badge_level,
-            'questions_count': len(user.questions),
-            'answers_count': len(user.answers),
-            'accepted_answers_count': len([a for a in user.answers if a.is_accepted])
+            'questions_count': question_counts.get(user.id, 0),
+            'answers_count': answer_counts.get(user.id, (0, 0))[0],
+            'accepted_answers_count': answer_counts.get(user.id, (0, 0))[1]
         } for idx, user in enumerate(users)]
     })
 
+def _content_counts(user_ids):
+    """({user id: questions}, {user id: (answers, accepted answers)}), one GROUP BY each"""
+    if not user_ids:
+        return {}, {}
+    questions = dict(db.session.query(Question.user_id, db.func.count(Question.id))
+                     .filter(Question.user_id.in_(user_ids))
+                     .group_by(Question.user_id))
+    accepted = db.func.sum(db.case((Answer.is_accepted.is_(True), 1), else_=0))
+    answers = {user_id: (count, accepted_count or 0) for user_id, count, accepted_count in
+               db.session.query(Answer.user_id, db.func.count(Answer.id), accepted)
+               .filter(Answer.user_id.in_(user_ids))
+               .group_by(Answer.user_id)}
+    return questions, answers
+
 def get_most_used_tags(limit=10):
     """Helper function to get most used tags"""
     tag_counts = db.session.query(
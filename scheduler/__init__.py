@@ -0,0 +1,407 @@
+"""
+In-process periodic job scheduler with database-lease coordination
+
+Jobs are registered on the module-level ``scheduler`` with an interval
+(``every(minutes=5)``) or a cron expression (``cron('30 3 * * *')``, UTC).
+Any number of processes may run a scheduler, inside the web app
+(SCHEDULER_ENABLED=1) or as a dedicated worker (``python -m scheduler``).
+Each job has a row in job_lease holding its next due time and current
+owner; a process only runs a job after atomically claiming a due row whose
+lease is free or expired, so every run happens once across the fleet and a
+crashed owner's lease lapses after the job's timeout (a live owner renews
+the lease while a run overruns). Jobs marked ``local=True`` (flushing
+per-process buffers) skip the lease and run in every scheduler process.
+
+Each run executes in its own thread with an app context and is recorded in
+job_run with its status and duration. A run still going at its timeout is
+recorded as timed out and not started again until it returns; long jobs
+should call ``check_deadline()`` between batches to stop cooperatively.
+"""
+
+from datetime import datetime, timedelta
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+
+from sqlalchemy import or_, select
+
+logger = logging.getLogger(__name__)
+
+LEASE_GRACE = 30  # seconds a lease outlives its job's timeout
+MAX_ERROR_LENGTH = 4000
+
+_deadline = threading.local()
+
+
+class JobTimeout(Exception):
+    """A job ran past its timeout"""
+
+
+def check_deadline():
+    """Raise JobTimeout if the current job has used up its timeout"""
+    deadline = getattr(_deadline, 'value', None)
+    if deadline is not None and time.monotonic() > deadline:
+        raise JobTimeout('job exceeded its timeout')
+
+
+class Interval:
+    """Run every ``seconds``, measured from the start of the previous run"""
+
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError('interval must be positive')
+        self.seconds = seconds
+
+    def first_after(self, moment):
+        return moment
+
+    def next_after(self, moment):
+        return moment + timedelta(seconds=self.seconds)
+
+    def __str__(self):
+        return f'every {self.seconds:g}s'
+
+
+def every(seconds=0, minutes=0, hours=0):
+    return Interval(seconds + minutes * 60 + hours * 3600)
+
+
+class Cron:
+    """Five-field cron expression (minute hour day month weekday) evaluated in UTC
+
+    Fields accept ``*``, numbers, ranges (``1-5``), lists (``0,30``) and steps
+    (``*/15``, ``9-17/2``). Weekday 0 and 7 are Sunday. As in cron, when both
+    day and weekday are restricted a time matches if either does.
+    """
+
+    FIELDS = (('minute', 0, 59), ('hour', 0, 23), ('day', 1, 31), ('month', 1, 12), ('weekday', 0, 7))
+
+    def __init__(self, expression):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f'cron expression needs 5 fields: {expression!r}')
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse(part, name, low, high) for part, (name, low, high) in zip(parts, self.FIELDS))
+        self.weekdays = {0 if day == 7 else day for day in weekdays}
+        self.any_day = parts[2] == '*'
+        self.any_weekday = parts[4] == '*'
+
+    @staticmethod
+    def _parse(part, name, low, high):
+        values = set()
+        for item in part.split(','):
+            step = 1
+            if '/' in item:
+                item, step = item.split('/', 1)
+                step = int(step)
+            if item == '*':
+                start, end = low, high
+            elif '-' in item:
+                start, end = (int(value) for value in item.split('-', 1))
+            else:
+                start = int(item)
+                end = high if step > 1 else start
+            if step < 1 or start < low or end > high or start > end:
+                raise ValueError(f'invalid cron {name} field: {part!r}')
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment):
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays  # cron counts from Sunday
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def first_after(self, moment):
+        return self.next_after(moment)
+
+    def next_after(self, moment):
+        """First matching minute strictly after ``moment``"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f'cron expression never matches: {self.expression!r}')
+
+    def __str__(self):
+        return f'cron {self.expression}'
+
+
+def cron(expression):
+    return Cron(expression)
+
+
+class Job:
+    """A registered periodic function"""
+
+    def __init__(self, name, func, schedule, timeout=300, local=False, description=None):
+        self.name = name
+        self.func = func
+        self.schedule = schedule
+        self.timeout = timeout
+        self.local = local
+        self.description = description or (func.__doc__ or '').strip().split('\n')[0]
+
+
+class Scheduler:
+    """Registry of jobs plus the polling loop that claims and runs them"""
+
+    def __init__(self, poll_interval=5.0):
+        self.app = None
+        self.poll_interval = poll_interval
+        self._nonce = uuid.uuid4().hex[:8]
+        self.jobs = {}
+        self._next_due = {}  # job name -> datetime, local view of job_lease.next_run_at
+        self._running = {}  # job name -> runner thread
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def owner(self):
+        """Lease owner id; includes the pid, so workers forked after import differ"""
+        return f'{socket.gethostname()}:{os.getpid()}:{self._nonce}'
+
+    def init_app(self, app):
+        self.app = app
+
+    def job(self, schedule, name=None, timeout=300, local=False):
+        """Decorator registering a job, e.g. ``@scheduler.job(every(minutes=5))``"""
+        def decorator(func):
+            job = Job(name or func.__name__, func, schedule, timeout, local)
+            if job.name in self.jobs:
+                raise ValueError(f'duplicate job name: {job.name}')
+            self.jobs[job.name] = job
+            return func
+        return decorator
+
+    # Leases
+
+    def _sync_due(self, connection, jobs, now):
+        """Create missing job_lease rows and refresh the local next-due times"""
+        from app import JobLease
+        from utils.sql import dialect_insert
+
+        table = JobLease.__table__
+        connection.execute(dialect_insert(connection, table).on_conflict_do_nothing(),
+                           [{'job': job.name, 'next_run_at': job.schedule.first_after(now)} for job in jobs])
+        rows = connection.execute(select(table.c.job, table.c.next_run_at)
+                                  .where(table.c.job.in_([job.name for job in jobs]))).all()
+        self._next_due.update({row.job: row.next_run_at for row in rows})
+
+    def _claim(self, connection, job, now, force=False):
+        """Take the job's lease if it is due (or ``force``) and not held; True when claimed"""
+        from app import JobLease
+
+        table = JobLease.__table__
+        next_run = job.schedule.next_after(now)
+        stmt = table.update().where(
+            table.c.job == job.name,
+            or_(table.c.expires_at.is_(None), table.c.expires_at < now)
+        ).values(owner=self.owner, expires_at=now + timedelta(seconds=job.timeout + LEASE_GRACE),
+                 next_run_at=next_run, last_started_at=now)
+        if not force:
+            stmt = stmt.where(table.c.next_run_at <= now)
+        claimed = connection.execute(stmt).rowcount == 1
+        if claimed:
+            self._next_due[job.name] = next_run
+        return claimed
+
+    def _renew(self, job):
+        """Push the held lease's expiry LEASE_GRACE seconds out"""
+        from app import JobLease, db
+
+        table = JobLease.__table__
+        with db.engine.begin() as connection:
+            connection.execute(table.update()
+                               .where(table.c.job == job.name, table.c.owner == self.owner)
+                               .values(expires_at=datetime.utcnow() + timedelta(seconds=LEASE_GRACE)))
+
+    def _release(self, job):
+        from app import JobLease, db
+
+        table = JobLease.__table__
+        with db.engine.begin() as connection:
+            connection.execute(table.update()
+                               .where(table.c.job == job.name, table.c.owner == self.owner)
+                               .values(owner=None, expires_at=None))
+
+    # Runs
+
+    def _execute(self, job):
+        """Run one claimed job with its timeout and record the outcome in job_run"""
+        from app import JobRun, db
+
+        table = JobRun.__table__
+        started_at = datetime.utcnow()
+        with db.engine.begin() as connection:
+            run_id = connection.execute(table.insert().values(
+                job=job.name, owner=self.owner, status='running', started_at=started_at)).inserted_primary_key[0]
+
+        outcome = {'status': 'timeout', 'error': f'still running after {job.timeout}s'}
+
+        def target():
+            with self.app.app_context():
+                _deadline.value = time.monotonic() + job.timeout
+                try:
+                    job.func()
+                    outcome.update(status='succeeded', error=None)
+                except JobTimeout as e:
+                    outcome.update(status='timeout', error=str(e))
+                except Exception:
+                    outcome.update(status='failed', error=traceback.format_exc()[-MAX_ERROR_LENGTH:])
+                finally:
+                    _deadline.value = None
+
+        started = time.perf_counter()
+        worker = threading.Thread(target=target, name=f'job:{job.name}', daemon=True)
+        worker.start()
+        worker.join(job.timeout)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        if outcome['status'] == 'failed':
+            logger.error('Job %s failed after %.0f ms:\n%s', job.name, duration_ms, outcome['error'])
+        elif outcome['status'] == 'timeout':
+            logger.warning('Job %s timed out after %.0f ms', job.name, duration_ms)
+
+        with db.engine.begin() as connection:
+            connection.execute(table.update().where(table.c.id == run_id).values(
+                status=outcome['status'], error=outcome['error'],
+                finished_at=datetime.utcnow(), duration_ms=duration_ms))
+
+        # Threads can't be killed: keep renewing the lease so no other process
+        # starts a second copy, and keep this one busy until the run returns
+        while worker.is_alive():
+            if not job.local:
+                self._renew(job)
+            worker.join(LEASE_GRACE / 3)
+        if not job.local:
+            self._release(job)
+        return outcome['status']
+
+    def _start(self, job):
+        runner = threading.Thread(target=self._run_logged, args=(job,), name=f'scheduler:{job.name}', daemon=True)
+        self._running[job.name] = runner
+        runner.start()
+
+    def _run_logged(self, job):
+        try:
+            with self.app.app_context():
+                self._execute(job)
+        except Exception:
+            logger.exception('Scheduler could not run job %s', job.name)
+
+    def tick(self, now=None):
+        """Claim and start every due job not already running here; returns the started names"""
+        from app import db
+
+        now = now or datetime.utcnow()
+        with self._lock:
+            idle = [job for job in self.jobs.values()
+                    if not (job.name in self._running and self._running[job.name].is_alive())]
+            due = [job for job in idle
+                   if self._next_due.get(job.name) is None or self._next_due[job.name] <= now]
+            started = []
+
+            for job in due:
+                if job.local:
+                    if job.name not in self._next_due:
+                        self._next_due[job.name] = job.schedule.first_after(now)
+                    if self._next_due[job.name] <= now:
+                        self._next_due[job.name] = job.schedule.next_after(now)
+                        self._start(job)
+                        started.append(job.name)
+
+            shared = [job for job in due if not job.local]
+            if shared:
+                with db.engine.begin() as connection:
+                    self._sync_due(connection, shared, now)
+                for job in shared:
+                    if self._next_due[job.name] > now:
+                        continue
+                    with db.engine.begin() as connection:
+                        claimed = self._claim(connection, job, now)
+                    if claimed:
+                        self._start(job)
+                        started.append(job.name)
+                    else:
+                        # Someone else ran it or holds it; re-read next poll
+                        self._next_due[job.name] = None
+            return started
+
+    def run_now(self, name):
+        """Run a job immediately in this thread (ignoring its schedule); returns its status"""
+        from app import db
+
+        job = self.jobs[name]
+        if not job.local:
+            now = datetime.utcnow()
+            with db.engine.begin() as connection:
+                self._sync_due(connection, [job], now)
+                if not self._claim(connection, job, now, force=True):
+                    return 'locked'
+        return self._execute(job)
+
+    # Loop
+
+    def run_forever(self):
+        """Poll until stop() is called"""
+        logger.info('Scheduler %s running %d jobs', self.owner, len(self.jobs))
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    self.tick()
+            except Exception:
+                logger.exception('Scheduler tick failed')
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """Run the loop in a daemon thread of this process"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name='scheduler', daemon=True)
+        self._thread.start()
+
+    def wait(self):
+        """Block until the polling thread exits (interruptible by signals)"""
+        while self._thread is not None and self._thread.is_alive():
+            self._thread.join(1)
+
+    def stop(self, timeout=None):
+        """Stop polling and wait up to ``timeout`` for running jobs to finish"""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(self.poll_interval + 1)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for runner in list(self._running.values()):
+            runner.join(None if deadline is None else max(0, deadline - time.monotonic()))
+
+
+scheduler = Scheduler()
+
+
+def init_scheduler(app):
+    """Register the maintenance jobs; start polling in this process if SCHEDULER_ENABLED"""
+    app.config.setdefault('SCHEDULER_ENABLED', os.environ.get('SCHEDULER_ENABLED', '').lower() in ('1', 'true', 'yes'))
+    app.config.setdefault('SCHEDULER_POLL_INTERVAL', float(os.environ.get('SCHEDULER_POLL_INTERVAL', 5)))
+
+    from scheduler import jobs  # noqa: F401  (registers the jobs)
+
+    scheduler.init_app(app)
+    scheduler.poll_interval = app.config['SCHEDULER_POLL_INTERVAL']
+    if app.config['SCHEDULER_ENABLED']:
+        scheduler.start()
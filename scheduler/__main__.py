@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Command line entry point for the maintenance job scheduler
+"""
+
+import argparse
+import logging
+import os
+import signal
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _print_jobs(scheduler):
+    from app import JobLease, JobRun, db
+
+    leases = {lease.job: lease for lease in JobLease.query.all()}
+    for job in scheduler.jobs.values():
+        last = JobRun.query.filter_by(job=job.name).order_by(JobRun.started_at.desc()).first()
+        lease = leases.get(job.name)
+        next_run = 'per process' if job.local else (lease.next_run_at if lease else 'on first poll')
+        last_run = f'{last.status} at {last.started_at:%Y-%m-%d %H:%M:%S}' if last else 'never'
+        print(f'{job.name:<24} {str(job.schedule):<20} timeout {job.timeout}s  next {next_run}  last {last_run}')
+        if lease and lease.owner:
+            print(f'{"":<24} leased by {lease.owner} until {lease.expires_at}')
+    db.session.remove()
+
+
+def _print_history(job_name, limit):
+    from app import JobRun
+
+    query = JobRun.query.order_by(JobRun.started_at.desc())
+    if job_name:
+        query = query.filter_by(job=job_name)
+    for run in query.limit(limit):
+        duration = f'{run.duration_ms:.0f} ms' if run.duration_ms is not None else '-'
+        icon = {'succeeded': '✅', 'failed': '❌', 'timeout': '⚠️', 'running': '⏳'}.get(run.status, '')
+        print(f'{icon} {run.started_at:%Y-%m-%d %H:%M:%S}  {run.job:<24} {run.status:<10} {duration:>10}  {run.owner}')
+        if run.error:
+            print('    ' + run.error.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m scheduler', description='Q&A Platform maintenance job scheduler')
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('worker', help='poll and run due jobs until interrupted (default)')
+    commands.add_parser('list', help='list jobs with their schedule, next run and last result')
+    run = commands.add_parser('run', help='run one job now, ignoring its schedule')
+    run.add_argument('job')
+    history = commands.add_parser('history', help='show recent job runs')
+    history.add_argument('--job')
+    history.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    # Jobs are bounded by their own timeouts, not the web statement timeout
+    os.environ.setdefault('DB_STATEMENT_TIMEOUT_MS', '0')
+    from app import create_app
+    from scheduler import scheduler
+
+    # The app would otherwise start a background scheduler of its own; this
+    # process decides for itself whether to poll
+    app = create_app({'SCHEDULER_ENABLED': False})
+
+    with app.app_context():
+        if args.command == 'list':
+            _print_jobs(scheduler)
+        elif args.command == 'history':
+            _print_history(args.job, args.limit)
+        elif args.command == 'run':
+            if args.job not in scheduler.jobs:
+                parser.error(f'unknown job {args.job!r}; choose from {", ".join(scheduler.jobs)}')
+            status = scheduler.run_now(args.job)
+            print(f"{'✅' if status == 'succeeded' else '❌'} {args.job}: {status}")
+            return 0 if status == 'succeeded' else 1
+
+    if args.command in (None, 'worker'):
+        signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop(timeout=0))
+        scheduler.start()
+        try:
+            scheduler.wait()
+        except KeyboardInterrupt:
+            pass
+        print('Waiting for running jobs to finish...')
+        scheduler.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Maintenance jobs run by the scheduler
+"""
+
+from datetime import datetime, timedelta
+import os
+
+from scheduler import check_deadline, cron, every, scheduler
+
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 90))
+JOB_RUN_RETENTION_DAYS = int(os.environ.get('JOB_RUN_RETENTION_DAYS', 30))
+DELETE_BATCH = 1000
+
+
+def _delete_in_batches(model, *conditions):
+    """Delete matching rows by id in short transactions; returns rows deleted"""
+    from app import db
+
+    deleted = 0
+    while True:
+        ids = [row[0] for row in db.session.query(model.id).filter(*conditions).limit(DELETE_BATCH)]
+        if not ids:
+            return deleted
+        db.session.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += len(ids)
+        check_deadline()
+
+
+@scheduler.job(every(seconds=10), timeout=60, local=True)
+def flush_counters():
+    """Write this process's buffered counter increments (profile views)"""
+    from utils.counters import flush_all
+    flush_all()
+
+
+@scheduler.job(cron('0 * * * *'), timeout=900)
+def award_badges():
+    """Recompute reputation and badge levels and award earned badges for every user"""
+    from app import db
+    from services.badges import refresh_all_users
+    from utils.versions import touch
+
+    try:
+        refresh_all_users(between_batches=check_deadline)
+    finally:
+        # Badge awards are bulk inserts the flush listener doesn't see
+        touch('users', 'badges')
+        db.session.commit()
+
+
+@scheduler.job(cron('15 0 * * *'), timeout=600)
+def rebuild_daily_stats():
+    """Recount the last few days of the daily_stats rollup to correct any drift"""
+    from app import db
+    from services.stats import rebuild_daily_stats as rebuild
+
+    rebuild(db.session.connection(), since=datetime.utcnow().date() - timedelta(days=2))
+    db.session.commit()
+
+
+@scheduler.job(cron('30 3 * * *'), timeout=900)
+def compact_notifications():
+    """Delete read notifications older than NOTIFICATION_RETENTION_DAYS"""
+    from app import Notification
+
+    cutoff = datetime.utcnow() - timedelta(days=NOTIFICATION_RETENTION_DAYS)
+    _delete_in_batches(Notification, Notification.is_read.is_(True), Notification.created_at < cutoff)
+
+
+@scheduler.job(cron('45 3 * * *'), timeout=300)
+def prune_job_runs():
+    """Delete scheduler run history older than JOB_RUN_RETENTION_DAYS"""
+    from app import JobRun
+
+    cutoff = datetime.utcnow() - timedelta(days=JOB_RUN_RETENTION_DAYS)
+    _delete_in_batches(JobRun, JobRun.started_at < cutoff)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Production server entry point for Q&A Platform
+
+Serves the Flask app together with its Socket.IO endpoints (realtime.py,
+unless REALTIME_ENABLED=0) under gunicorn. `python app.py` remains the development server.
+
+Configuration (environment):
+    PORT                     listen port (default 5001; Render sets 10000)
+    SERVER_WORKER_CLASS      threaded | gevent | eventlet (default threaded)
+    WEB_CONCURRENCY          worker processes (default derived from CPUs)
+    SERVER_THREADS           threads per threaded worker (default derived from CPUs)
+    SERVER_CONNECTIONS       concurrent connections per gevent/eventlet worker (default 1000)
+    SERVER_PRELOAD           1 to build the app and warm its indexes once in the
+                             master before forking (threaded workers only)
+    SERVER_MIGRATE           0 to skip `python -m migrations upgrade` on start
+    SERVER_TIMEOUT           seconds before a silent worker is restarted (default 60)
+    SERVER_GRACEFUL_TIMEOUT  seconds workers get to finish on shutdown (default 30)
+    SCHEDULER_ENABLED        1 to run the maintenance scheduler in every worker
+    SOCKETIO_MESSAGE_QUEUE   shared queue (e.g. redis://host:6379/0); without one all
+                             sockets must live in a single worker, with one there
+                             is a worker per CPU
+    PRESENCE_URL             shared presence store (redis://...); required with several
+                             workers unless the queue is Redis
+    DB_POOL_SIZE             pooled connections per worker (default: SERVER_THREADS for
+                             threaded workers, 10 for gevent/eventlet; see utils/engine.py)
+"""
+
+import os
+import subprocess
+import sys
+
+# name -> (gunicorn worker class, Socket.IO async mode)
+WORKER_MODELS = {
+    'threaded': ('gthread', 'threading'),
+    'gevent': ('gevent', 'gevent'),
+    'eventlet': ('eventlet', 'eventlet'),
+}
+
+
+def _flag(name, default=''):
+    return os.environ.get(name, default).lower() in ('1', 'true', 'yes')
+
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def derive_concurrency(model, cpus, clustered):
+    """Default (workers, threads) for a worker model on ``cpus`` CPUs
+
+    Socket.IO rooms and connected clients live in process memory, so without
+    a shared message queue (``clustered``) everything runs in one worker and
+    scales with threads or greenlets instead. With one, each CPU gets a worker.
+    """
+    workers = cpus if clustered else 1
+    threads = max(4, 8 * cpus // workers) if model == 'threaded' else 1
+    return workers, threads
+
+
+def server_options():
+    """gunicorn settings from the environment; returns (model, async_mode, options)"""
+    model = os.environ.get('SERVER_WORKER_CLASS', 'threaded').lower()
+    if model not in WORKER_MODELS:
+        raise SystemExit(f"❌ SERVER_WORKER_CLASS must be one of: {', '.join(WORKER_MODELS)}")
+    worker_class, async_mode = WORKER_MODELS[model]
+    if model == 'gevent':
+        try:
+            import geventwebsocket  # noqa: F401
+            worker_class = 'geventwebsocket.gunicorn.workers.GeventWebSocketWorker'
+        except ImportError:
+            pass  # Socket.IO falls back to long-polling
+
+    # A shared message queue lets workers deliver to each other's sockets
+    queue = os.environ.get('SOCKETIO_MESSAGE_QUEUE', '')
+    clustered = bool(queue) and not queue.startswith('local://')
+    workers, threads = derive_concurrency(model, available_cpus(), clustered)
+    preload = _flag('SERVER_PRELOAD')
+    if preload and model != 'threaded':
+        print(f'⚠️ SERVER_PRELOAD ignored: {model} workers must import the app after monkey-patching')
+        preload = False
+
+    return model, async_mode, {
+        'bind': f"0.0.0.0:{os.environ.get('PORT', 5001)}",
+        'worker_class': worker_class,
+        'workers': int(os.environ.get('WEB_CONCURRENCY', workers)),
+        'threads': int(os.environ.get('SERVER_THREADS', threads)),
+        'worker_connections': int(os.environ.get('SERVER_CONNECTIONS', 1000)),
+        'preload_app': preload,
+        'timeout': int(os.environ.get('SERVER_TIMEOUT', 60)),
+        'graceful_timeout': int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30)),
+        'keepalive': 5,
+        'accesslog': '-',
+        'errorlog': '-',
+        'post_worker_init': post_worker_init,
+        'worker_exit': worker_exit,
+    }
+
+
+def check_shared_presence():
+    """Several workers need a shared presence store, or each counts only its own users
+
+    PRESENCE_URL falls back to the message queue when that is Redis, and to
+    per-process memory otherwise. The fallback is refused; an explicit
+    memory:// is accepted with a warning.
+    """
+    queue = os.environ.get('SOCKETIO_MESSAGE_QUEUE', '')
+    presence = os.environ.get('PRESENCE_URL', '')
+    if presence.startswith('memory://'):
+        print('⚠️ PRESENCE_URL=memory:// with several workers: online counts cover one worker each')
+    elif not presence and not queue.startswith(('redis://', 'rediss://')):
+        raise SystemExit('❌ Several workers need a shared presence store: set PRESENCE_URL=redis://... '
+                         '(or WEB_CONCURRENCY=1, or PRESENCE_URL=memory:// to accept per-worker counts)')
+
+
+def load_app(preloading):
+    """Build the app and attach its Socket.IO server when REALTIME_ENABLED"""
+    from app import create_app, db
+
+    app = create_app()
+
+    if app.config['REALTIME_ENABLED']:
+        from realtime import init_realtime
+        init_realtime(app)
+
+    if preloading:
+        from utils.warmup import run_warmup
+        run_warmup(app)
+        # Workers must not share the master's pooled connections
+        with app.app_context():
+            db.engine.dispose()
+    return app
+
+
+def post_worker_init(worker):
+    """Per worker: warm indexes not built by the master and start the scheduler"""
+    from utils.warmup import ensure_warmup
+
+    # The app load_app() built, in this worker or (preloaded) in the master
+    app = worker.wsgi
+    ensure_warmup(app)
+    if os.environ.get('QA_SCHEDULER_ENABLED') == '1':
+        from scheduler import scheduler
+        scheduler.start()
+
+
+def worker_exit(server, worker):
+    """Graceful shutdown: let running jobs finish, then write buffered counters"""
+    from scheduler import scheduler
+    from utils.counters import flush_all
+
+    scheduler.stop(timeout=server.cfg.graceful_timeout / 2)
+    with worker.wsgi.app_context():
+        try:
+            flushed = flush_all()
+            if flushed:
+                worker.log.info('Flushed %d buffered counter rows', flushed)
+        except Exception as e:
+            worker.log.error('Could not flush buffered counters: %s', e)
+
+
+def main():
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print('❌ gunicorn is not installed (pip install -r requirements.txt); use `python app.py` for development')
+        return 1
+
+    model, async_mode, options = server_options()
+
+    # Workers inherit these; create_app() reads them (utils/engine.py
+    # sizes the connection pool to the worker model)
+    os.environ['SOCKETIO_ASYNC_MODE'] = async_mode
+    os.environ['SERVER_WORKER_CLASS'] = model
+    os.environ['SERVER_THREADS'] = str(options['threads'])
+    if options['workers'] > 1 and _flag('REALTIME_ENABLED', '1'):
+        check_shared_presence()
+    if options['workers'] > 1 and not os.environ.get('SOCKETIO_TRANSPORTS'):
+        # gunicorn can't route a client's long-polling requests back to the
+        # worker holding its session; websocket connections stay on one
+        os.environ['SOCKETIO_TRANSPORTS'] = 'websocket'
+    # Started per worker in post_worker_init instead of at import (the
+    # master must not run it, and preloaded threads don't survive fork)
+    os.environ['QA_SCHEDULER_ENABLED'] = '1' if _flag('SCHEDULER_ENABLED') else '0'
+    os.environ['SCHEDULER_ENABLED'] = '0'
+
+    if _flag('SERVER_MIGRATE', '1'):
+        # In a subprocess, so the master stays free of app imports and connections
+        subprocess.run([sys.executable, '-m', 'migrations', 'upgrade'], check=True)
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return load_app(preloading=self.cfg.preload_app)
+
+    print(f"🚀 Serving on {options['bind']}: {options['workers']} {model} worker(s), "
+          f"{options['threads'] if model == 'threaded' else options['worker_connections']} "
+          f"{'threads' if model == 'threaded' else 'connections'} each"
+          f"{', preloaded' if options['preload_app'] else ''}")
+    Server().run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Set-wise reputation, badge level and badge award refresh
+"""
+
+from datetime import datetime
+
+from sqlalchemy.orm import selectinload
+
+from utils.sql import dialect_insert
+
+BATCH_SIZE = 500
+
+
+def refresh_users(user_ids):
+    """Recompute reputation/badge level and award badges for a batch of users; returns awards"""
+    from app import Answer, Badge, Notification, Question, User, UserBadge, db
+
+    users = (User.query
+             .options(selectinload(User.questions).selectinload(Question.votes),
+                      selectinload(User.answers).selectinload(Answer.votes),
+                      selectinload(User.votes))
+             .filter(User.id.in_(user_ids)).all())
+    badges = Badge.query.all()
+    held = set(db.session.query(UserBadge.user_id, UserBadge.badge_id)
+               .filter(UserBadge.user_id.in_(user_ids)).all())
+
+    awards = []
+    now = datetime.utcnow()
+    for user in users:
+        user.reputation = user.calculate_reputation()
+        user.update_badge_level()
+        # Same criteria as init_badges.check_and_award_badges
+        stats = {
+            'questions': len(user.questions),
+            'answers': len(user.answers),
+            'accepted_answers': len([a for a in user.answers if a.is_accepted]),
+            'reputation': user.reputation,
+            'votes': len(user.votes),
+            'early_adopter': 1 if (now - user.created_at).days <= 30 else 0
+        }
+        for badge in badges:
+            if (user.id, badge.id) not in held and stats.get(badge.requirement_type, 0) >= badge.requirement_value:
+                awards.append((user.id, badge))
+    db.session.flush()
+
+    if awards:
+        connection = db.session.connection()
+        connection.execute(
+            dialect_insert(connection, UserBadge.__table__).on_conflict_do_nothing(),
+            [{'user_id': user_id, 'badge_id': badge.id, 'earned_at': now} for user_id, badge in awards])
+        connection.execute(Notification.__table__.insert(), [{
+            'user_id': user_id,
+            'content': f'Congratulations! You earned the "{badge.name}" badge!',
+            'notification_type': 'achievement',
+            'is_read': False,
+            'created_at': now
+        } for user_id, badge in awards])
+    db.session.commit()
+    return len(awards)
+
+
+def refresh_all_users(batch_size=BATCH_SIZE, between_batches=None):
+    """refresh_users() over every user in id order; ``between_batches`` may raise to stop early"""
+    from app import User, db
+
+    awarded = 0
+    last_id = 0
+    while True:
+        user_ids = [row[0] for row in db.session.query(User.id).filter(User.id > last_id)
+                    .order_by(User.id).limit(batch_size)]
+        if not user_ids:
+            return awarded
+        awarded += refresh_users(user_ids)
+        last_id = user_ids[-1]
+        if between_batches:
+            between_batches()
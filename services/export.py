@@ -0,0 +1,138 @@
+"""
+Streaming bulk export of users, questions, answers and votes
+"""
+
+from datetime import datetime, timezone
+import csv
+import io
+import json
+import zlib
+
+from sqlalchemy import select
+
+ENTITIES = ('users', 'questions', 'answers', 'votes')
+FORMATS = ('ndjson', 'csv')
+BATCH_SIZE = 1000
+
+
+def _statement(entity, since=None, after_id=None):
+    """SELECT for one entity, ordered by id so ``after_id`` can resume an export"""
+    from app import Answer, Question, User, Vote
+
+    if entity == 'users':
+        # No email or password hash: exports leave the building
+        table = User.__table__
+        columns = [table.c.id, table.c.username, table.c.created_at, table.c.reputation, table.c.badge_level]
+        changed = table.c.created_at
+    elif entity == 'questions':
+        table = Question.__table__
+        columns = [table.c.id, table.c.title, table.c.content, table.c.created_at, table.c.user_id, table.c.score,
+                   table.c.updated_at]
+        changed = table.c.updated_at  # edits and score changes, not just new rows
+    elif entity == 'answers':
+        table = Answer.__table__
+        columns = [table.c.id, table.c.question_id, table.c.user_id, table.c.content, table.c.created_at,
+                   table.c.is_accepted, table.c.score, table.c.updated_at]
+        changed = table.c.updated_at  # acceptance flips and score changes too
+    elif entity == 'votes':
+        table = Vote.__table__
+        columns = [table.c.id, table.c.user_id, table.c.question_id, table.c.answer_id, table.c.value,
+                   table.c.updated_at]
+        changed = table.c.updated_at  # votes flip in place, so sync on last change
+    else:
+        raise ValueError(f"Unknown entity {entity!r}; expected one of {', '.join(ENTITIES)}")
+
+    stmt = select(*columns).order_by(table.c.id)
+    if since is not None:
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)  # columns hold naive UTC
+        stmt = stmt.where(changed >= since)
+    if after_id is not None:
+        stmt = stmt.where(table.c.id > after_id)
+    return stmt
+
+
+def columns(entity):
+    names = [column.name for column in _statement(entity).selected_columns]
+    return names + ['tags'] if entity == 'questions' else names
+
+
+def iter_batches(entity, since=None, after_id=None, batch_size=BATCH_SIZE):
+    """Yield lists of row dicts, streaming from a server-side cursor
+
+    Memory stays bounded by ``batch_size`` whatever the table size. Question
+    tags are attached with one query per batch rather than per row.
+    """
+    from app import db, question_tags, Tag
+
+    stmt = _statement(entity, since, after_id)
+    tag_names = None
+    if entity == 'questions':
+        tag_names = dict(db.session.execute(select(Tag.id, Tag.name)).all())
+
+    with db.engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, max_row_buffer=batch_size).execute(stmt)
+        for partition in result.mappings().partitions(batch_size):
+            rows = [dict(row) for row in partition]
+            if tag_names is not None:
+                tags = {row['id']: [] for row in rows}
+                pairs = db.session.execute(
+                    select(question_tags.c.question_id, question_tags.c.tag_id)
+                    .where(question_tags.c.question_id.in_(list(tags)))
+                ).all()
+                for question_id, tag_id in pairs:
+                    tags[question_id].append(tag_names.get(tag_id))
+                for row in rows:
+                    row['tags'] = sorted(name for name in tags[row['id']] if name)
+            yield rows
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def ndjson_chunks(batches):
+    for rows in batches:
+        yield ''.join(json.dumps(row, default=_json_default, ensure_ascii=False) + '\n' for row in rows)
+
+
+def csv_chunks(entity, batches):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns(entity))
+    for rows in batches:
+        for row in rows:
+            writer.writerow([
+                ';'.join(value) if isinstance(value, list) else
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in row.values()
+            ])
+        yield out.getvalue()
+        out.seek(0)
+        out.truncate()
+    if out.tell():
+        yield out.getvalue()
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a stream of bytes chunks into one gzip member"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export(entity, fmt='ndjson', since=None, after_id=None, compress=False, batch_size=BATCH_SIZE):
+    """Iterator of encoded bytes chunks for one entity"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    _statement(entity)  # validate the entity before streaming starts
+
+    batches = iter_batches(entity, since, after_id, batch_size)
+    text_chunks = ndjson_chunks(batches) if fmt == 'ndjson' else csv_chunks(entity, batches)
+    chunks = (chunk.encode('utf-8') for chunk in text_chunks)
+    return gzip_chunks(chunks) if compress else chunks
@@ -0,0 +1,479 @@
+"""
+Bulk NDJSON import of users, tags, questions, answers and votes
+
+One record per line, tagged with its type and carrying the legacy ids of
+whatever it references:
+
+    {"type": "user", "id": 7, "username": "ann", "email": "ann@example.com"}
+    {"type": "question", "id": 12, "user_id": 7, "title": "...", "content": "...", "tags": ["sql"]}
+    {"type": "answer", "id": 30, "question_id": 12, "user_id": 7, "content": "...", "is_accepted": true}
+    {"type": "vote", "user_id": 7, "answer_id": 30, "value": 1}
+    {"type": "tag", "name": "postgresql"}
+
+Users already on the platform are merged by email. An imported username
+taken by a different account gets a numeric suffix (ann -> ann_2), and the
+renames are listed in the report.
+
+Records must come after the records they reference. Lines are processed
+in chunks, each in one transaction that inserts rows with Core
+executemany, records legacy -> new id mappings and advances the run's
+checkpoint; rerunning the same source resumes after the last committed
+chunk. Invalid rows are rejected individually and reported.
+
+Side effects the interactive paths perform per write (scores, reputation,
+badge awards and their notifications, cache/version invalidation) run
+once, set-wise, after the last chunk. Historical answers do not notify
+question authors.
+"""
+
+from datetime import datetime, timezone
+import itertools
+import json
+import secrets
+import time
+
+from sqlalchemy import func, select, text, tuple_, update
+from werkzeug.security import generate_password_hash
+
+from services.badges import refresh_users
+from services.stats import rebuild_daily_stats
+from services.tag_resolver import tag_resolver
+from utils.sql import dialect_insert
+from utils.versions import touch
+
+ENTITY_ORDER = ('user', 'tag', 'question', 'answer', 'vote')
+MAPPED_ENTITIES = ('user', 'question', 'answer')
+CHUNK_SIZE = 1000
+FINALIZE_BATCH = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFailed(Exception):
+    """The import cannot start or continue"""
+
+
+class RowError(ValueError):
+    """One input record is invalid; it is skipped and reported"""
+
+
+def _text(record, field, max_length=None, required=True):
+    value = record.get(field)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise RowError(f'missing {field}')
+        return None
+    if not isinstance(value, str):
+        raise RowError(f'{field} must be a string')
+    if max_length and len(value) > max_length:
+        raise RowError(f'{field} longer than {max_length} characters')
+    return value
+
+
+def _timestamp(record, field='created_at'):
+    value = record.get(field)
+    if value is None:
+        return datetime.utcnow()
+    try:
+        moment = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        raise RowError(f'{field} is not an ISO-8601 timestamp')
+    if moment.tzinfo is not None:
+        # Columns hold naive UTC
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _legacy_id(record, field='id'):
+    value = record.get(field)
+    if value is None or value == '':
+        raise RowError(f'missing {field}')
+    return str(value)
+
+
+def allocate_ids(connection, table, count):
+    """Reserve ``count`` primary keys so executemany needs no RETURNING"""
+    if connection.dialect.name == 'postgresql':
+        rows = connection.execute(text(
+            "SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+            {'table': f'"{table.name}"', 'count': count})
+        return [row[0] for row in rows]
+    # SQLite: the checkpoint UPDATE already holds the write lock, so MAX(id) is stable
+    start = connection.execute(select(text('COALESCE(MAX(id), 0)')).select_from(table)).scalar() + 1
+    return list(range(start, start + count))
+
+
+def _free_username(connection, table, username, taken):
+    """``username`` with the lowest numeric suffix not in ``taken`` or the table"""
+    for start in itertools.count(2, 20):
+        candidates = [f'{username[:80 - len(str(n)) - 1]}_{n}' for n in range(start, start + 20)]
+        taken.update(connection.execute(
+            select(table.c.username).where(table.c.username.in_(candidates))).scalars())
+        for candidate in candidates:
+            if candidate not in taken:
+                return candidate
+
+
+class BulkImporter:
+    """Chunked, resumable import of one named source"""
+
+    def __init__(self, source, chunk_size=CHUNK_SIZE, progress=None):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.progress = progress  # callable(message) for per-chunk progress lines
+        self.maps = {entity: {} for entity in MAPPED_ENTITIES}
+        self.counts = {entity: 0 for entity in ENTITY_ORDER}
+        self.rejected = 0
+        self.errors = []
+        self.renamed = []
+        self.password_hash = generate_password_hash(secrets.token_urlsafe(32))  # imported users reset their password
+
+    # Run bookkeeping
+
+    def _start(self):
+        from app import ImportMapping, ImportRun, db
+
+        run = db.session.get(ImportRun, self.source)
+        if run is None:
+            run = ImportRun(source=self.source)
+            db.session.add(run)
+        elif run.status == 'completed':
+            raise ImportFailed(f'Import {self.source!r} already completed')
+
+        for entity, legacy_id, new_id in db.session.query(
+                ImportMapping.entity, ImportMapping.legacy_id, ImportMapping.new_id).filter_by(source=self.source):
+            self.maps[entity][legacy_id] = new_id
+        position, status = run.position, run.status
+        db.session.commit()
+        return position, status
+
+    def _reject(self, line, record_type, error):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'type': record_type, 'error': str(error)})
+
+    def _rename(self, line, username, renamed_to):
+        if len(self.renamed) < MAX_REPORTED_ERRORS:
+            self.renamed.append({'line': line, 'username': username, 'renamed_to': renamed_to})
+
+    def _resolve(self, pending, entity, legacy_id):
+        if legacy_id is None:
+            raise RowError(f'missing {entity}_id')
+        key = str(legacy_id)
+        new_id = pending[entity].get(key, self.maps[entity].get(key))
+        if new_id is None:
+            raise RowError(f'unknown {entity} {key}')
+        return new_id
+
+    # Chunk processing
+
+    def run(self, lines):
+        """Import an iterable of NDJSON lines; returns a report dict"""
+        started = time.perf_counter()
+        position, status = self._start()
+        lines_seen = position
+
+        if status != 'finalizing':
+            chunk = []
+            for lineno, line in enumerate(lines, 1):
+                if lineno <= position:
+                    continue  # committed by an earlier attempt
+                if isinstance(line, bytes):
+                    line = line.decode('utf-8')
+                chunk.append((lineno, line))
+                lines_seen = lineno
+                if len(chunk) >= self.chunk_size:
+                    self._import_chunk(chunk, started)
+                    chunk = []
+            if chunk:
+                self._import_chunk(chunk, started)
+
+        self._finalize()
+        elapsed = time.perf_counter() - started
+        imported = sum(self.counts.values())
+        return {
+            'source': self.source,
+            'resumed_from_line': position,
+            'lines': lines_seen,
+            'imported': dict(self.counts),
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'renamed': self.renamed,
+            'seconds': round(elapsed, 2),
+            'rows_per_second': round(imported / elapsed, 1) if elapsed else 0.0
+        }
+
+    def _import_chunk(self, chunk, started):
+        from app import ImportRun, db
+
+        rejected_before = self.rejected
+        by_type = {entity: [] for entity in ENTITY_ORDER}
+        for lineno, line in chunk:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise RowError('record must be a JSON object')
+                if record.get('type') not in by_type:
+                    raise RowError(f"type must be one of {', '.join(ENTITY_ORDER)}")
+            except (ValueError, RowError) as e:
+                self._reject(lineno, None, e)
+                continue
+            by_type[record['type']].append((lineno, record))
+
+        pending = {entity: {} for entity in MAPPED_ENTITIES}
+        counts = {entity: 0 for entity in ENTITY_ORDER}
+        connection = db.session.connection()
+        try:
+            # The checkpoint write comes first: on SQLite it takes the write lock for the chunk
+            run = ImportRun.__table__
+            connection.execute(update(run).where(run.c.source == self.source)
+                               .values(position=chunk[-1][0]))
+
+            tag_ids = self._tags(by_type['tag'], by_type['question'])
+            counts['user'] = self._users(connection, by_type['user'], pending)
+            counts['tag'] = len(by_type['tag'])
+            counts['question'] = self._questions(connection, by_type['question'], pending, tag_ids)
+            counts['answer'] = self._answers(connection, by_type['answer'], pending)
+            counts['vote'] = self._votes(connection, by_type['vote'], pending)
+            self._save_mappings(connection, pending)
+
+            connection.execute(update(run).where(run.c.source == self.source).values(
+                imported=run.c.imported + sum(counts.values()),
+                rejected=run.c.rejected + (self.rejected - rejected_before)))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            tag_resolver.invalidate()  # may hold ids of tags created in the rolled-back chunk
+            raise
+
+        for entity in MAPPED_ENTITIES:
+            self.maps[entity].update(pending[entity])
+        for entity, count in counts.items():
+            self.counts[entity] += count
+
+        if self.progress:
+            elapsed = time.perf_counter() - started
+            total = sum(self.counts.values())
+            self.progress(f'line {chunk[-1][0]}: {total} rows imported, {self.rejected} rejected '
+                          f'({total / max(elapsed, 1e-9):,.0f} rows/s)')
+
+    def _save_mappings(self, connection, pending):
+        from app import ImportMapping
+        rows = [{'source': self.source, 'entity': entity, 'legacy_id': legacy_id, 'new_id': new_id}
+                for entity, mapping in pending.items() for legacy_id, new_id in mapping.items()]
+        if rows:
+            connection.execute(ImportMapping.__table__.insert(), rows)
+
+    def _tags(self, tag_records, question_records):
+        names = []
+        for lineno, record in tag_records:
+            try:
+                names.append(_text(record, 'name', 50))
+            except RowError as e:
+                self._reject(lineno, 'tag', e)
+        for _, record in question_records:
+            if isinstance(record.get('tags'), list):
+                names.extend(name for name in record['tags'] if isinstance(name, str))
+        return tag_resolver.resolve_ids(names, create=True) if names else {}
+
+    def _users(self, connection, records, pending):
+        from app import User
+        table = User.__table__
+
+        valid = []
+        for lineno, record in records:
+            try:
+                legacy_id = _legacy_id(record)
+                if legacy_id in self.maps['user'] or legacy_id in pending['user']:
+                    raise RowError(f'duplicate user {legacy_id}')
+                valid.append((lineno, legacy_id, {
+                    'username': _text(record, 'username', 80),
+                    'email': _text(record, 'email', 120).lower(),
+                    'created_at': _timestamp(record),
+                    'reputation': int(record.get('reputation') or 1)
+                }))
+            except (RowError, TypeError, ValueError) as e:
+                self._reject(lineno, 'user', e)
+        if not valid:
+            return 0
+
+        # People already on the platform are merged by email only: usernames
+        # from different forums collide, so a clash is renamed instead
+        usernames = [row['username'] for _, _, row in valid]
+        emails = [row['email'] for _, _, row in valid]
+        existing = {email.lower(): user_id for user_id, email in connection.execute(
+            select(table.c.id, table.c.email).where(table.c.email.in_(emails)))}
+        taken = set(connection.execute(
+            select(table.c.username).where(table.c.username.in_(usernames))).scalars())
+
+        new_rows = []
+        first_in_chunk = {}  # email -> legacy id of the first new row using it
+        duplicates = []
+        for lineno, legacy_id, row in valid:
+            user_id = existing.get(row['email'])
+            first = first_in_chunk.get(row['email'])
+            if user_id is not None:
+                pending['user'][legacy_id] = user_id
+            elif first is not None:
+                duplicates.append((legacy_id, first))
+            else:
+                if row['username'] in taken:
+                    renamed_to = _free_username(connection, table, row['username'], taken)
+                    self._rename(lineno, row['username'], renamed_to)
+                    row['username'] = renamed_to
+                taken.add(row['username'])
+                row['password_hash'] = self.password_hash
+                new_rows.append((legacy_id, row))
+                first_in_chunk[row['email']] = legacy_id
+
+        if new_rows:
+            for (legacy_id, row), new_id in zip(new_rows, allocate_ids(connection, table, len(new_rows))):
+                row['id'] = new_id
+                pending['user'][legacy_id] = new_id
+            connection.execute(table.insert(), [row for _, row in new_rows])
+        for legacy_id, first in duplicates:
+            pending['user'][legacy_id] = pending['user'][first]
+        return len(valid)
+
+    def _questions(self, connection, records, pending, tag_ids):
+        from app import Question, question_tags
+        table = Question.__table__
+
+        rows = []
+        for lineno, record in records:
+            try:
+                legacy_id = _legacy_id(record)
+                if legacy_id in self.maps['question'] or legacy_id in pending['question']:
+                    raise RowError(f'duplicate question {legacy_id}')
+                tags = record.get('tags') or []
+                if not isinstance(tags, list):
+                    raise RowError('tags must be a list')
+                rows.append((legacy_id, {
+                    'title': _text(record, 'title', 200),
+                    'content': _text(record, 'content'),
+                    'created_at': _timestamp(record),
+                    'user_id': self._resolve(pending, 'user', record.get('user_id')),
+                    'score': 0
+                }, tags))
+                pending['question'][legacy_id] = None  # reserve against duplicates later in the chunk
+            except RowError as e:
+                self._reject(lineno, 'question', e)
+        if not rows:
+            return 0
+
+        links = set()
+        for (legacy_id, row, tags), new_id in zip(rows, allocate_ids(connection, table, len(rows))):
+            row['id'] = new_id
+            pending['question'][legacy_id] = new_id
+            for name in tag_resolver.normalize_all(tags):
+                if name in tag_ids:
+                    links.add((new_id, tag_ids[name]))
+        connection.execute(table.insert(), [row for _, row, _ in rows])
+        if links:
+            connection.execute(question_tags.insert(),
+                               [{'question_id': q, 'tag_id': t} for q, t in sorted(links)])
+        return len(rows)
+
+    def _answers(self, connection, records, pending):
+        from app import Answer
+        table = Answer.__table__
+
+        rows = []
+        for lineno, record in records:
+            try:
+                legacy_id = _legacy_id(record)
+                if legacy_id in self.maps['answer'] or legacy_id in pending['answer']:
+                    raise RowError(f'duplicate answer {legacy_id}')
+                rows.append((legacy_id, {
+                    'content': _text(record, 'content'),
+                    'created_at': _timestamp(record),
+                    'user_id': self._resolve(pending, 'user', record.get('user_id')),
+                    'question_id': self._resolve(pending, 'question', record.get('question_id')),
+                    'is_accepted': bool(record.get('is_accepted')),
+                    'score': 0
+                }))
+                pending['answer'][legacy_id] = None
+            except RowError as e:
+                self._reject(lineno, 'answer', e)
+        if not rows:
+            return 0
+
+        for (legacy_id, row), new_id in zip(rows, allocate_ids(connection, table, len(rows))):
+            row['id'] = new_id
+            pending['answer'][legacy_id] = new_id
+        connection.execute(table.insert(), [row for _, row in rows])
+        return len(rows)
+
+    def _votes(self, connection, records, pending):
+        from app import Vote
+        table = Vote.__table__
+
+        by_target = {'question_id': {}, 'answer_id': {}}
+        for lineno, record in records:
+            try:
+                value = record.get('value')
+                if value not in (1, -1) or isinstance(value, bool):
+                    raise RowError('value must be 1 or -1')
+                user_id = self._resolve(pending, 'user', record.get('user_id'))
+                if record.get('question_id') is not None:
+                    column, target = 'question_id', self._resolve(pending, 'question', record['question_id'])
+                else:
+                    column, target = 'answer_id', self._resolve(pending, 'answer', record.get('answer_id'))
+                by_target[column][(user_id, target)] = {
+                    'user_id': user_id, column: target, 'value': value,
+                    'updated_at': _timestamp(record)
+                }
+            except RowError as e:
+                self._reject(lineno, 'vote', e)
+
+        imported = 0
+        for column, rows in by_target.items():
+            if not rows:
+                continue
+            fk = table.c[column]
+            stmt = dialect_insert(connection, table).on_conflict_do_nothing(
+                index_elements=[table.c.user_id, fk], index_where=fk.isnot(None))
+            if connection.dialect.supports_sane_multi_rowcount:
+                imported += connection.execute(stmt, list(rows.values())).rowcount
+            else:
+                # psycopg2's batched executemany reports no total rowcount;
+                # count the votes ON CONFLICT will skip instead
+                existing = connection.execute(select(func.count()).select_from(table).where(
+                    tuple_(table.c.user_id, fk).in_(list(rows)))).scalar()
+                connection.execute(stmt, list(rows.values()))
+                imported += len(rows) - existing
+        return imported
+
+    # Deferred side effects
+
+    def _finalize(self):
+        """Scores, reputation, badges and cache invalidation for everything imported"""
+        from app import ImportMapping, ImportRun, db
+
+        run = db.session.get(ImportRun, self.source)
+        run.status = 'finalizing'
+        db.session.commit()
+
+        for table, column, entity in (('question', 'question_id', 'question'), ('answer', 'answer_id', 'answer')):
+            db.session.execute(text(
+                f'UPDATE "{table}" SET score = COALESCE('
+                f'(SELECT SUM(value) FROM vote WHERE vote.{column} = "{table}".id), 0) '
+                f'WHERE id IN (SELECT new_id FROM import_mapping WHERE source = :source AND entity = :entity)'),
+                {'source': self.source, 'entity': entity})
+        db.session.commit()
+
+        user_ids = [row[0] for row in db.session.query(ImportMapping.new_id)
+                    .filter_by(source=self.source, entity='user').distinct().order_by(ImportMapping.new_id)]
+        awarded = 0
+        for start in range(0, len(user_ids), FINALIZE_BATCH):
+            awarded += refresh_users(user_ids[start:start + FINALIZE_BATCH])
+
+        # Imported rows carry historical dates and bypass the ORM listeners
+        rebuild_daily_stats(db.session.connection())
+        touch('questions', 'tags', 'tag_vocabulary', 'users', 'badges')
+        run.status = 'completed'
+        run.finished_at = datetime.utcnow()
+        db.session.commit()
+        if self.progress:
+            self.progress(f'finalized {len(user_ids)} users, awarded {awarded} badges')
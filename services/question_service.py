@@ -1,6 +1,6 @@
-from models.question import Question, Tag, Vote
-from models.answer import Answer
-from models import db
+from app import Question, Tag, Answer, db
+from services.tag_resolver import tag_resolver
+from services.votes import cast_vote, cast_votes
 from datetime import datetime
 
 class QuestionService:
@@ -15,13 +15,8 @@ class QuestionService:
             user_id=user_id
         )
         
-        # Process tags
-        for tag_name in tag_names:
-            tag = Tag.query.filter_by(name=tag_name).first()
-            if not tag:
-                tag = Tag(name=tag_name)
-                db.session.add(tag)
-            question.tags.append(tag)
+        # Process tags (resolved/created in one batch)
+        question.tags = tag_resolver.get_tags(tag_names)
         
         db.session.add(question)
         db.session.commit()
@@ -39,6 +34,8 @@ class QuestionService:
         
         db.session.add(answer)
         db.session.commit()
+        from realtime import trigger_answer_delta
+        trigger_answer_delta(answer)
         
         return answer
     
@@ -58,57 +55,27 @@ class QuestionService:
         # Accept this answer
         answer.is_accepted = True
         db.session.commit()
+        from realtime import trigger_accept_delta
+        trigger_accept_delta(answer)
         
         return answer
     
     @staticmethod
     def vote(item_type, item_id, user_id, value):
-        """Vote on question or answer"""
-        if item_type == 'question':
-            existing_vote = Vote.query.filter_by(
-                user_id=user_id,
-                question_id=item_id,
-                answer_id=None
-            ).first()
-            
-            if existing_vote:
-                existing_vote.value = value
-            else:
-                vote = Vote(
-                    value=value,
-                    user_id=user_id,
-                    question_id=item_id
-                )
-                db.session.add(vote)
-        
-        elif item_type == 'answer':
-            existing_vote = Vote.query.filter_by(
-                user_id=user_id,
-                answer_id=item_id,
-                question_id=None
-            ).first()
-            
-            if existing_vote:
-                existing_vote.value = value
-            else:
-                vote = Vote(
-                    value=value,
-                    user_id=user_id,
-                    answer_id=item_id
-                )
-                db.session.add(vote)
-        
-        db.session.commit()
+        """Vote on question or answer; returns the new score"""
+        return cast_vote(item_type, item_id, user_id, value)
+    
+    @staticmethod
+    def vote_many(user_id, votes):
+        """Apply (item_type, item_id, value) votes in one transaction"""
+        return cast_votes(user_id, votes)
     
     @staticmethod
     def get_vote_count(item_type, item_id):
         """Get vote count for question or answer"""
-        if item_type == 'question':
-            question = Question.query.get(item_id)
-            return sum(vote.value for vote in question.votes) if question else 0
-        else:
-            answer = Answer.query.get(item_id)
-            return sum(vote.value for vote in answer.votes) if answer else 0
+        model = Question if item_type == 'question' else Answer
+        score = db.session.query(model.score).filter_by(id=item_id).scalar()
+        return score or 0
     
     @staticmethod
     def get_question_with_votes(question_id):
@@ -124,8 +91,7 @@ class QuestionService:
         
         answers_with_votes = []
         for answer in answers:
-            vote_count = QuestionService.get_vote_count('answer', answer.id)
-            answers_with_votes.append((answer, vote_count))
+            answers_with_votes.append((answer, answer.score))
         
         # Sort: accepted first, then by vote count (descending)
         answers_with_votes.sort(key=lambda x: (not x[0].is_accepted, -x[1]))
@@ -0,0 +1,274 @@
+"""
+Daily stats rollup and cached platform stats snapshot
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+import logging
+
+from sqlalchemy import case, delete, event, exists, func, inspect, select
+
+from utils.cache import VersionedCache
+from utils.sql import dialect_insert
+from utils.http_cache import current_versions
+
+COUNTERS = ('new_users', 'new_questions', 'new_answers', 'accepted_answers', 'answered_questions')
+SNAPSHOT_KEYS = ['questions', 'users', 'tags', 'badges']
+MAX_ACTIVITY_DAYS = 365
+PENDING_KEY = 'pending_daily_stats'  # session.info entry
+
+logger = logging.getLogger(__name__)
+
+snapshot_cache = VersionedCache('platform_stats', max_entries=4)
+
+
+def _day(value):
+    return (value or datetime.utcnow()).date()
+
+
+def _loaded(obj, name):
+    """Attribute value without triggering a load (deleted rows can't be refreshed)"""
+    return inspect(obj).dict.get(name)
+
+
+def apply_deltas(connection, deltas):
+    """Add {(day, counter): n} to the rollup, creating day rows as needed"""
+    from app import DailyStat
+    table = DailyStat.__table__
+
+    by_day = defaultdict(dict)
+    for (day, counter), amount in deltas.items():
+        if amount:
+            by_day[day][counter] = amount
+
+    for day in sorted(by_day):  # stable order avoids lock inversion on PostgreSQL
+        values = by_day[day]
+        stmt = dialect_insert(connection, table).values(day=day, **{c: values.get(c, 0) for c in COUNTERS})
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.day],
+            set_={c: table.c[c] + amount for c, amount in values.items()}
+        )
+        connection.execute(stmt)
+
+
+def _collect_before_flush(session):
+    """Deletes and acceptance changes, while their attributes can still be loaded"""
+    from app import Answer, Question, User
+
+    deltas = defaultdict(int)
+    removed_answers = defaultdict(int)  # question id -> answers deleted in this flush
+    deleted_questions = {}
+
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            deltas[(_day(obj.created_at), 'new_users')] -= 1
+        elif isinstance(obj, Question):
+            deltas[(_day(obj.created_at), 'new_questions')] -= 1
+            deleted_questions[obj.id] = _day(obj.created_at)
+        elif isinstance(obj, Answer):
+            deltas[(_day(obj.created_at), 'new_answers')] -= 1
+            if obj.is_accepted:
+                deltas[(_day(obj.created_at), 'accepted_answers')] -= 1
+            removed_answers[obj.question_id] += 1
+
+    for obj in session.dirty:
+        if isinstance(obj, Answer) and obj not in session.deleted:
+            history = inspect(obj).attrs.is_accepted.history
+            if history.has_changes():
+                was, now = bool(history.deleted and history.deleted[0]), bool(obj.is_accepted)
+                if was != now:
+                    deltas[(_day(obj.created_at), 'accepted_answers')] += 1 if now else -1
+
+    session.info['daily_stats'] = (deltas, removed_answers, deleted_questions)
+
+
+def _collect_after_flush(session, connection):
+    """Inserts (defaults such as created_at are populated now) and answered/unanswered flips"""
+    from app import Answer, Question, User
+
+    deltas, removed_answers, deleted_questions = session.info.pop('daily_stats', ({}, {}, {}))
+    deltas = defaultdict(int, deltas)
+    added_answers = defaultdict(int)
+
+    for obj in session.new:
+        if isinstance(obj, User):
+            deltas[(_day(_loaded(obj, 'created_at')), 'new_users')] += 1
+        elif isinstance(obj, Question):
+            deltas[(_day(_loaded(obj, 'created_at')), 'new_questions')] += 1
+        elif isinstance(obj, Answer):
+            created = _day(_loaded(obj, 'created_at'))
+            deltas[(created, 'new_answers')] += 1
+            if _loaded(obj, 'is_accepted'):
+                deltas[(created, 'accepted_answers')] += 1
+            added_answers[obj.question_id] += 1
+
+    touched = set(added_answers) | set(removed_answers)
+    if touched:
+        question, answer = Question.__table__, Answer.__table__
+        rows = connection.execute(
+            select(question.c.id, question.c.created_at, func.count(answer.c.id))
+            .select_from(question.outerjoin(answer, answer.c.question_id == question.c.id))
+            .where(question.c.id.in_(touched))
+            .group_by(question.c.id, question.c.created_at)
+        ).all()
+        current = {row[0]: (_day(row[1]), row[2]) for row in rows}
+
+        for question_id in touched:
+            if question_id in current:
+                day, now = current[question_id]
+            elif question_id in deleted_questions:
+                day, now = deleted_questions[question_id], 0
+            else:
+                continue
+            before = now - added_answers.get(question_id, 0) + removed_answers.get(question_id, 0)
+            if before == 0 and now > 0:
+                deltas[(day, 'answered_questions')] += 1
+            elif before > 0 and now == 0:
+                deltas[(day, 'answered_questions')] -= 1
+
+    pending = session.info.setdefault(PENDING_KEY, defaultdict(int))
+    for key, amount in deltas.items():
+        pending[key] += amount
+
+
+def track_daily_stats(db):
+    """Keep the daily_stats rollup in step with ORM writes
+
+    Flushes only collect the deltas; they are applied once the session
+    commits, in a short transaction of their own. Upserting today's row
+    inside the writer's transaction held its lock until commit, so every
+    new user, question or answer waited on the one before it on
+    PostgreSQL. The daily rebuild_daily_stats job corrects any drift
+    (a failed apply, or a savepoint rolled back after its flush).
+    """
+
+    @event.listens_for(db.session, 'before_flush')
+    def _daily_stats_before_flush(session, flush_context, instances):
+        _collect_before_flush(session)
+
+    @event.listens_for(db.session, 'after_flush')
+    def _daily_stats_after_flush(session, flush_context):
+        _collect_after_flush(session, session.connection())
+
+    @event.listens_for(db.session, 'after_commit')
+    def _daily_stats_after_commit(session):
+        deltas = session.info.pop(PENDING_KEY, None)
+        if not deltas or not any(deltas.values()):
+            return
+        try:
+            with db.engine.begin() as connection:
+                apply_deltas(connection, deltas)
+        except Exception:
+            # The write is committed; the rebuild job recounts the day
+            logger.exception('Could not apply daily stats deltas')
+
+    @event.listens_for(db.session, 'after_soft_rollback')
+    def _daily_stats_discard(session, previous_transaction):
+        if previous_transaction.parent is None:  # not a savepoint
+            session.info.pop(PENDING_KEY, None)
+
+
+def rebuild_daily_stats(connection, since=None):
+    """Recompute the rollup from the base tables (all days, or from ``since``)
+
+    Needed after writes that bypass the ORM (bulk deletes, imports) and as a
+    periodic safety net against drift.
+    """
+    from app import Answer, DailyStat, Question, User
+    table = DailyStat.__table__
+    since = since.date() if isinstance(since, datetime) else since
+
+    def per_day(created_at, *where):
+        day = func.date(created_at)
+        stmt = select(day, func.count()).group_by(day)
+        for condition in where:
+            stmt = stmt.where(condition)
+        if since:
+            stmt = stmt.where(created_at >= datetime.combine(since, datetime.min.time()))
+        return connection.execute(stmt).all()
+
+    rows = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    sources = {
+        'new_users': per_day(User.created_at),
+        'new_questions': per_day(Question.created_at),
+        'new_answers': per_day(Answer.created_at),
+        'accepted_answers': per_day(Answer.created_at, Answer.is_accepted.is_(True)),
+        'answered_questions': per_day(Question.created_at, exists().where(Answer.question_id == Question.id)),
+    }
+    for counter, counts in sources.items():
+        for day, count in counts:
+            if day is not None:
+                day = date.fromisoformat(day) if isinstance(day, str) else day
+                rows[day][counter] = count
+
+    stmt = delete(table)
+    if since:
+        stmt = stmt.where(table.c.day >= since)
+    connection.execute(stmt)
+    if rows:
+        connection.execute(table.insert(), [dict(day=day, **counts) for day, counts in sorted(rows.items())])
+    return len(rows)
+
+
+def _totals():
+    """Totals plus today / 7-day / 30-day windows for every counter, in one query"""
+    from app import DailyStat, db
+
+    today = datetime.utcnow().date()
+    windows = {'new_today': today, 'new_this_week': today - timedelta(days=7),
+               'new_this_month': today - timedelta(days=30)}
+    columns = []
+    for counter in COUNTERS:
+        column = getattr(DailyStat, counter)
+        columns.append(func.coalesce(func.sum(column), 0))
+        for start in windows.values():
+            columns.append(func.coalesce(func.sum(case((DailyStat.day >= start, column), else_=0)), 0))
+    values = iter(db.session.execute(select(*columns)).one())
+
+    totals = {}
+    for counter in COUNTERS:
+        totals[counter] = {'total': next(values)}
+        totals[counter].update({name: next(values) for name in windows})
+    return totals
+
+
+def _compute_snapshot():
+    from app import Badge, Tag, UserBadge, db
+    from rest_api.v1.stats import get_most_used_tags
+
+    totals = _totals()
+    snapshot = {name: dict(totals[f'new_{name}']) for name in ('users', 'questions', 'answers')}
+    snapshot['questions']['unanswered'] = totals['new_questions']['total'] - totals['answered_questions']['total']
+    snapshot['answers']['accepted'] = totals['accepted_answers']['total']
+    snapshot['tags'] = {
+        'total': db.session.query(func.count(Tag.id)).scalar(),
+        'most_used': get_most_used_tags(10)
+    }
+    snapshot['badges'] = {
+        'total': db.session.query(func.count(Badge.id)).scalar(),
+        'total_awarded': db.session.query(func.count(UserBadge.id)).scalar()
+    }
+    return snapshot
+
+
+def platform_stats():
+    """Platform stats payload, recomputed only when a contributing version or the day changes"""
+    versions = current_versions(SNAPSHOT_KEYS)
+    version = tuple(versions[key][0] for key in SNAPSHOT_KEYS) + (datetime.utcnow().date(),)
+    return snapshot_cache.get_or_compute('platform', version, _compute_snapshot)
+
+
+def activity(days):
+    """New questions/answers per day for the last ``days`` days, from the rollup"""
+    from app import DailyStat
+
+    days = max(1, min(days, MAX_ACTIVITY_DAYS))
+    cutoff = datetime.utcnow().date() - timedelta(days=days)
+    rows = DailyStat.query.filter(DailyStat.day >= cutoff).order_by(DailyStat.day).all()
+    return {
+        'period_days': days,
+        'questions_per_day': [{'date': str(row.day), 'count': row.new_questions}
+                              for row in rows if row.new_questions],
+        'answers_per_day': [{'date': str(row.day), 'count': row.new_answers}
+                            for row in rows if row.new_answers]
+    }
@@ -0,0 +1,104 @@
+"""
+Batched tag resolution backed by a warm name -> id cache
+"""
+
+import re
+import threading
+
+from utils.sql import dialect_insert
+from utils.versions import touch
+
+MAX_TAG_LENGTH = 50
+
+
+class TagResolver:
+    """Normalize tag names and map them to Tag rows with as few queries as possible"""
+
+    def __init__(self):
+        self._ids = {}
+        self._warm = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(name):
+        """Canonical tag form: lower-case, hyphenated, no leading '#'"""
+        name = re.sub(r'\s+', '-', (name or '').strip().lower().lstrip('#'))
+        return name[:MAX_TAG_LENGTH]
+
+    def normalize_all(self, names):
+        """Normalize and de-duplicate names, preserving their order"""
+        seen = []
+        for name in names:
+            name = self.normalize(name)
+            if name and name not in seen:
+                seen.append(name)
+        return seen
+
+    def warm(self):
+        """Load the whole tag vocabulary into the cache in one query"""
+        from app import Tag, db
+        rows = db.session.query(Tag.name, Tag.id).all()
+        with self._lock:
+            self._ids.update(rows)
+            self._warm = True
+
+    def invalidate(self, names=None):
+        with self._lock:
+            if names is None:
+                self._ids.clear()
+                self._warm = False
+            else:
+                for name in names:
+                    self._ids.pop(name, None)
+
+    def _lookup(self, names):
+        """One IN query for names missing from the cache"""
+        from app import Tag, db
+        rows = db.session.query(Tag.name, Tag.id).filter(Tag.name.in_(names)).all()
+        with self._lock:
+            self._ids.update(rows)
+
+    def _create(self, names):
+        """Insert missing tags, letting concurrent inserts of the same name win quietly"""
+        from app import Tag, db
+        connection = db.session.connection()
+        stmt = dialect_insert(connection, Tag.__table__).on_conflict_do_nothing(index_elements=['name'])
+        connection.execute(stmt, [{'name': name} for name in names])
+        touch('tags', 'tag_vocabulary')
+
+    def resolve_ids(self, names, create=True):
+        """Return {normalized name: tag id}; unknown names are created when ``create`` is set"""
+        if not self._warm:
+            self.warm()
+
+        names = self.normalize_all(names)
+        missing = [name for name in names if name not in self._ids]
+        if missing:
+            self._lookup(missing)
+            missing = [name for name in missing if name not in self._ids]
+        if missing and create:
+            self._create(missing)
+            self._lookup(missing)
+
+        return {name: self._ids[name] for name in names if name in self._ids}
+
+    def get_tags(self, names, create=True):
+        """Return Tag objects for ``names`` in the given order, loaded with one IN query"""
+        from app import Tag
+
+        ids = self.resolve_ids(names, create=create)
+        if not ids:
+            return []
+
+        tags_by_id = {tag.id: tag for tag in Tag.query.filter(Tag.id.in_(list(ids.values()))).all()}
+        stale = [name for name, tag_id in ids.items() if tag_id not in tags_by_id]
+        if stale:
+            # Tags removed behind our back; forget them and resolve again
+            self.invalidate(stale)
+            return self.get_tags(names, create=create)
+
+        return [tags_by_id[ids[name]] for name in ids]
+
+
+# Shared per-process resolver
+tag_resolver = TagResolver()
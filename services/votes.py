@@ -0,0 +1,158 @@
+"""
+Atomic vote casting with denormalized question/answer scores
+"""
+
+from datetime import datetime
+
+from sqlalchemy import bindparam, delete, func, select, update
+
+from utils.sql import dialect_insert
+from utils.versions import touch
+
+VOTE_VALUES = (1, -1)
+MAX_BATCH_SIZE = 100
+
+
+class InvalidVote(ValueError):
+    """Malformed vote request"""
+
+
+class VoteTargetNotFound(LookupError):
+    """The question or answer being voted on does not exist"""
+
+
+def _target(item_type):
+    from app import Answer, Question, Vote
+    vote = Vote.__table__
+    if item_type == 'question':
+        return Question.__table__, vote.c.question_id
+    if item_type == 'answer':
+        return Answer.__table__, vote.c.answer_id
+    raise InvalidVote(f"item_type must be 'question' or 'answer', not {item_type!r}")
+
+
+def validate(item_type, item_id, value):
+    """Normalize one vote tuple or raise InvalidVote"""
+    _target(item_type)
+    # Form-driven clients send ids as strings (data-item-id attributes)
+    try:
+        item_id = None if isinstance(item_id, (bool, float)) else int(item_id)
+    except (TypeError, ValueError):
+        item_id = None
+    if item_id is None or item_id <= 0:
+        raise InvalidVote('item_id must be a positive integer')
+    if value not in VOTE_VALUES or isinstance(value, bool):
+        raise InvalidVote('Vote value must be 1 or -1')
+    return item_type, item_id, value
+
+
+def _apply(connection, item_type, item_id, user_id, value):
+    """Upsert one vote and its score delta; returns (score, question_id, delta)"""
+    from app import Vote
+    target, fk = _target(item_type)
+    vote = Vote.__table__
+    now = datetime.utcnow()
+
+    # Before any write: PostgreSQL checks the vote's foreign key on insert
+    if connection.execute(select(target.c.id).where(target.c.id == item_id)).first() is None:
+        raise VoteTargetNotFound(f'{item_type.capitalize()} {item_id} not found')
+
+    # Values are +/-1, so changing an existing vote moves the score by 2 * value
+    flip = (update(vote)
+            .where(vote.c.user_id == user_id, fk == item_id, vote.c.value != value)
+            .values(value=value, updated_at=now))
+    delta = 2 * value if connection.execute(flip).rowcount else 0
+
+    if not delta:
+        insert = (dialect_insert(connection, vote)
+                  .values({'user_id': user_id, fk.name: item_id, 'value': value, 'updated_at': now})
+                  .on_conflict_do_nothing(index_elements=[vote.c.user_id, fk], index_where=fk.isnot(None)))
+        if connection.execute(insert).rowcount:
+            delta = value
+        elif connection.execute(flip).rowcount:
+            # Lost an insert race to a concurrent vote with the other value
+            delta = 2 * value
+
+    if delta:
+        connection.execute(update(target).where(target.c.id == item_id).values(score=target.c.score + delta))
+
+    question_column = target.c.id if item_type == 'question' else target.c.question_id
+    score, question_id = connection.execute(
+        select(target.c.score, question_column).where(target.c.id == item_id)).one()
+    return score, question_id, delta
+
+
+def cast_votes(user_id, votes):
+    """Apply many (item_type, item_id, value) votes in one transaction
+
+    All-or-nothing: invalid input raises InvalidVote before anything is
+    written, and a missing target rolls the whole batch back. Repeated
+    targets keep the last value. Returns one result dict per target.
+    """
+    from app import db
+
+    if len(votes) > MAX_BATCH_SIZE:
+        raise InvalidVote(f'At most {MAX_BATCH_SIZE} votes per request')
+    latest = {}
+    for item_type, item_id, value in votes:
+        item_type, item_id, value = validate(item_type, item_id, value)
+        latest[(item_type, item_id)] = value
+
+    connection = db.session.connection()
+    results = []
+    keys = set()
+    changes = []
+    try:
+        # Sorted so concurrent batches lock rows in the same order
+        for (item_type, item_id), value in sorted(latest.items()):
+            score, question_id, delta = _apply(connection, item_type, item_id, user_id, value)
+            if delta:
+                keys.update(['questions', f'question:{question_id}'])
+                changes.append((question_id, item_type, item_id, score))
+            results.append({'item_type': item_type, 'item_id': item_id, 'score': score,
+                            'delta': delta, 'user_vote': value})
+        touch(*keys)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if changes:
+        # Coalesced into one delta per question room (realtime.py)
+        from realtime import trigger_vote_deltas
+        trigger_vote_deltas(changes)
+    return results
+
+
+def cast_vote(item_type, item_id, user_id, value):
+    """Cast a single vote; returns the target's new score"""
+    return cast_votes(user_id, [(item_type, item_id, value)])[0]['score']
+
+
+def retract_votes(connection, user_id):
+    """Delete all of a user's votes and take them out of the denormalized scores
+
+    For account deletion; runs in the caller's transaction. Returns the
+    version keys of the affected questions, for touch().
+    """
+    from app import Vote
+    vote = Vote.__table__
+    keys = set()
+    for item_type in ('question', 'answer'):
+        target, fk = _target(item_type)
+        question_column = target.c.id if item_type == 'question' else target.c.question_id
+        totals = connection.execute(
+            select(target.c.id, question_column, func.sum(vote.c.value))
+            .join_from(vote, target, fk == target.c.id)
+            .where(vote.c.user_id == user_id)
+            .group_by(target.c.id, question_column)
+            .order_by(target.c.id)).all()
+        if totals:
+            connection.execute(
+                update(target).where(target.c.id == bindparam('target_id'))
+                .values(score=target.c.score - bindparam('total')),
+                [{'target_id': target_id, 'total': total} for target_id, _, total in totals])
+            keys.update(f'question:{question_id}' for _, question_id, _ in totals)
+    connection.execute(delete(vote).where(vote.c.user_id == user_id))
+    if keys:
+        keys.add('questions')
+    return keys
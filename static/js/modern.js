@@ -485,13 +485,15 @@ class AnalyticsManager {
     setupRealTimeUpdates() {
         // Update dashboard stats in real-time
         setInterval(() => {
-            this.updateStats();
-        }, 30000); // Update every 30 seconds
+            if (!document.hidden) {
+                this.updateStats();
+            }
+        }, 30000); // Update every 30 seconds, skipping background tabs
     }
     
     updateStats() {
         // Fetch latest stats from API
-        fetch('/api/stats')
+        fetch('/api/v1/stats')
             .then(response => response.json())
             .then(data => {
                 this.updateStatElements(data);
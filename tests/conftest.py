@@ -0,0 +1,45 @@
+"""
+Shared fixtures: the app on a throwaway SQLite database seeded with a small
+synthetic dataset, with query auditing in strict mode so any view that
+exceeds its @query_budget fails the request.
+"""
+
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    from app import create_app
+    from benchmarks.dataset import load_dataset
+
+    database = tmp_path_factory.mktemp('db') / 'qa_test.db'
+    app = create_app({
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}',
+        'SQLALCHEMY_BINDS': {},
+        'QUERY_AUDIT': True,
+        'QUERY_BUDGET_STRICT': True,
+        'SCHEDULER_ENABLED': False,
+    })
+    load_dataset(app, scale=0.05, reset=True, verbose=False)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def cold_caches():
+    """Empty every in-process versioned cache, so views take their uncached path"""
+    from utils.cache import caches
+    for cache in caches:
+        cache.clear()
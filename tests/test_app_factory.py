@@ -0,0 +1,35 @@
+"""
+create_app() builds independent apps: importing the module creates no
+engine, and each app gets its own database, views and admin CSRF hooks.
+"""
+
+import app as app_module
+
+
+def test_import_builds_no_app_or_engine():
+    from flask import Flask
+
+    assert not any(isinstance(value, Flask) for value in vars(app_module).values())
+    assert not hasattr(app_module, 'app')
+
+
+def test_apps_are_independent(app, tmp_path):
+    other = app_module.create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'other.db'}",
+        'SQLALCHEMY_BINDS': {},
+        'SCHEDULER_ENABLED': False,
+        'ADMIN_ENABLED': False,
+    })
+
+    with other.app_context():
+        assert app_module.db.engine.url.database == str(tmp_path / 'other.db')
+    with app.app_context():
+        assert app_module.db.engine.url.database != str(tmp_path / 'other.db')
+    assert 'index' in other.view_functions
+    assert 'questions_v1.get_tags' in other.view_functions
+    assert 'profiling_admin' not in other.blueprints
+
+
+def test_admin_csrf_hook_registered_once_per_app(app):
+    for name in ('profiling_admin', 'slow_queries_admin', 'export_admin', 'imports_admin'):
+        assert len(app.before_request_funcs[name]) == 1
@@ -0,0 +1,48 @@
+"""
+The daily_stats rollup is updated after the writer commits, never inside its
+transaction, and not at all when it rolls back.
+"""
+
+from datetime import datetime
+
+from werkzeug.security import generate_password_hash
+
+from utils.query_audit import record_queries
+
+
+def _new_users_today(db):
+    from app import DailyStat
+    # Outside the session's transaction, as another worker would see it
+    with db.engine.connect() as connection:
+        return connection.execute(
+            db.select(DailyStat.new_users).where(DailyStat.day == datetime.utcnow().date())
+        ).scalar() or 0
+
+
+def test_deltas_are_applied_after_commit(app):
+    from app import User, db
+
+    with app.app_context():
+        before = _new_users_today(db)
+        db.session.add(User(username='stats_after_commit', email='stats1@example.com',
+                            password_hash=generate_password_hash('x')))
+        with record_queries(capture_stacks=False) as flushed:
+            db.session.flush()
+        assert not [statement for statement in flushed.statements if 'daily_stats' in statement]
+        db.session.commit()
+        assert _new_users_today(db) == before + 1
+
+
+def test_rolled_back_writes_apply_nothing(app):
+    from app import User, db
+
+    with app.app_context():
+        before = _new_users_today(db)
+        db.session.add(User(username='stats_rolled_back', email='stats2@example.com',
+                            password_hash=generate_password_hash('x')))
+        db.session.flush()
+        db.session.rollback()
+        db.session.add(User(username='stats_kept', email='stats3@example.com',
+                            password_hash=generate_password_hash('x')))
+        db.session.commit()
+        assert _new_users_today(db) == before + 1
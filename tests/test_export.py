@@ -0,0 +1,55 @@
+"""
+Incremental exports (since=) pick up changes to existing questions, answers
+and votes, not just new rows.
+"""
+
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+
+def _ids(entity, since):
+    from services.export import iter_batches
+    return {row['id'] for batch in iter_batches(entity, since=since) for row in batch}
+
+
+def test_since_includes_score_changes_and_acceptance(app):
+    from app import Answer, Question, User, db
+    from services.votes import cast_votes
+
+    with app.app_context():
+        old = datetime.utcnow() - timedelta(days=400)
+        question = Question.query.order_by(Question.id).first()
+        answer = Answer.query.filter(Answer.question_id != question.id, Answer.is_accepted.is_(False)).first()
+        question.updated_at = answer.updated_at = old
+        voter = User(username='export_voter', email='export_voter@example.com',
+                     password_hash=generate_password_hash('x'))
+        db.session.add(voter)
+        db.session.commit()
+        since = datetime.utcnow() - timedelta(seconds=1)
+        assert question.id not in _ids('questions', since)
+        assert answer.id not in _ids('answers', since)
+
+        cast_votes(voter.id, [('question', question.id, 1)])
+        answer = db.session.get(Answer, answer.id)
+        answer.is_accepted = True
+        db.session.commit()
+
+        assert question.id in _ids('questions', since)
+        assert answer.id in _ids('answers', since)
+
+
+def test_migration_backfills_vote_updated_at(app):
+    from app import Question, Vote, db
+    from migrations import load_migrations
+
+    with app.app_context():
+        vote = Vote.query.filter(Vote.question_id.isnot(None)).first()
+        vote.updated_at = None
+        db.session.commit()
+        upgrade = load_migrations()['0005'][1]
+        with db.engine.connect() as connection:
+            upgrade(connection.execution_options(isolation_level='AUTOCOMMIT'))
+        db.session.expire_all()
+        vote = db.session.get(Vote, vote.id)
+        assert vote.updated_at == db.session.get(Question, vote.question_id).created_at
@@ -0,0 +1,46 @@
+"""
+Imported users merge with platform accounts by email only; a username taken
+by another account is renamed, so legacy content is never misattributed.
+"""
+
+import json
+
+from werkzeug.security import generate_password_hash
+
+
+def _lines(*records):
+    return [json.dumps(record) + '\n' for record in records]
+
+
+def test_users_merge_by_email_and_rename_username_clashes(app):
+    from app import Question, User, db
+    from services.importer import BulkImporter
+
+    with app.app_context():
+        db.session.add_all([
+            User(username='import_ann', email='ann@platform.example', password_hash=generate_password_hash('x')),
+            User(username='import_bob', email='bob@legacy.example', password_hash=generate_password_hash('x')),
+        ])
+        db.session.commit()
+        ann = User.query.filter_by(username='import_ann').one()
+        bob = User.query.filter_by(username='import_bob').one()
+
+        report = BulkImporter('test_user_matching').run(_lines(
+            {'type': 'user', 'id': 1, 'username': 'import_ann', 'email': 'ann@legacy.example'},
+            {'type': 'user', 'id': 2, 'username': 'robert', 'email': 'BOB@legacy.example'},
+            {'type': 'user', 'id': 3, 'username': 'import_ann', 'email': 'ann3@legacy.example'},
+            {'type': 'question', 'id': 10, 'user_id': 1, 'title': 'Imported by the other ann',
+             'content': 'Legacy question'},
+            {'type': 'question', 'id': 11, 'user_id': 2, 'title': 'Imported by bob', 'content': 'Legacy question'},
+        ))
+
+        assert report['rejected'] == 0
+        assert [(r['username'], r['renamed_to']) for r in report['renamed']] == [
+            ('import_ann', 'import_ann_2'), ('import_ann', 'import_ann_3')]
+        legacy_ann = User.query.filter_by(email='ann@legacy.example').one()
+        assert legacy_ann.id != ann.id and legacy_ann.username == 'import_ann_2'
+        assert User.query.filter_by(username='robert').first() is None
+
+        owners = dict(db.session.query(Question.title, Question.user_id)
+                      .filter(Question.title.in_(['Imported by the other ann', 'Imported by bob'])))
+        assert owners == {'Imported by the other ann': legacy_ann.id, 'Imported by bob': bob.id}
@@ -0,0 +1,27 @@
+"""
+The load generator only counts real successes: failed logins are reported,
+and writes bounced to the login page are errors.
+"""
+
+import benchmarks.load as load
+
+
+def test_login_result_is_checked(app, monkeypatch):
+    assert load.TestClientSession(app).login('user1')
+    monkeypatch.setattr(load, 'PASSWORD', 'not-the-password')
+    assert not load.TestClientSession(app).login('user1')
+
+
+def test_redirect_to_login_is_an_error(app):
+    session = load.TestClientSession(app)  # never logged in
+    assert session.post('/vote', json_body={'item_type': 'question', 'item_id': 1, 'value': 1}) == 401
+    assert session.post('/answer/1', {'content': 'Not logged in'}) == 401
+
+
+def test_failed_logins_are_reported(app, monkeypatch):
+    monkeypatch.setattr(load, 'PASSWORD', 'not-the-password')
+    test = load.LoadTest(lambda: load.TestClientSession(app), {'users': 5, 'questions': 10},
+                    [(0.3, 2, 2)], mix={'vote': 1})
+    report = test.run(progress=False)
+    assert report['actions']['login']['errors'] == 2
+    assert 'vote' not in report['actions']
@@ -0,0 +1,63 @@
+"""
+MemoryPresence: users are online while any of their sockets is connected,
+and drop out ttl seconds after their worker's last heartbeat.
+"""
+
+import pytest
+
+from utils import presence as presence_module
+from utils.presence import MemoryPresence, presence_store
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(presence_module, 'time', clock)
+    return clock
+
+
+def test_join_leave_and_count(clock):
+    presence = MemoryPresence(ttl=60)
+    presence.join(1, 'sid-a')
+    presence.join(1, 'sid-b')
+    presence.join(2, 'sid-c')
+    assert presence.count() == 2
+
+    presence.leave(1, 'sid-a')
+    assert presence.is_online(1)  # still has sid-b
+    presence.leave(1, 'sid-b')
+    assert not presence.is_online(1)
+    assert presence.count() == 1
+    presence.leave(3, 'sid-unknown')
+    assert presence.count() == 1
+
+
+def test_heartbeat_keeps_users_online_until_ttl(clock):
+    presence = MemoryPresence(ttl=60)
+    presence.join(1, 'sid-a')
+    presence.join(2, 'sid-b')
+
+    clock.now += 40
+    presence.heartbeat({'sid-a': 1})  # user 2's worker stopped announcing
+    clock.now += 30
+    assert presence.is_online(1)
+    assert not presence.is_online(2)
+    assert presence.count() == 1
+
+    clock.now += 31
+    assert presence.count() == 0
+
+
+def test_presence_store_selection():
+    assert isinstance(presence_store('memory://', ttl=5), MemoryPresence)
+    assert isinstance(presence_store(None), MemoryPresence)
+    with pytest.raises(ValueError):
+        presence_store('postgres://localhost/presence')
@@ -0,0 +1,48 @@
+"""
+/admin/profile validates its inputs: non-numeric settings are a 400, and
+counts are clamped into range instead of reaching the profiler.
+"""
+
+import pytest
+
+from utils.profiling import memory_snapshots, profiler
+
+TOKEN = 'test-admin-token'
+
+
+@pytest.fixture
+def admin(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, 'ADMIN_TOKEN', TOKEN)
+    yield lambda method, url, **kwargs: client.open(
+        url, method=method, headers={'Authorization': f'Bearer {TOKEN}'}, **kwargs)
+    profiler.reset()
+    memory_snapshots.stop()
+
+
+@pytest.mark.parametrize('settings', [
+    {'requests': 'ten'},
+    {'sample_interval_ms': 'fast'},
+    {'requests': None},
+    {'sample_interval_ms': [5]},
+])
+def test_non_numeric_settings_are_rejected(admin, settings):
+    response = admin('POST', '/admin/profile', json=settings)
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_request_count_is_clamped(admin):
+    low = admin('POST', '/admin/profile', json={'pattern': '^/nothing$', 'requests': 0})
+    high = admin('POST', '/admin/profile', json={'pattern': '^/nothing$', 'requests': 5000})
+
+    assert (low.status_code, low.get_json()['remaining']) == (202, 1)
+    assert (high.status_code, high.get_json()['remaining']) == (202, 1000)
+
+
+@pytest.mark.parametrize('frames', [0, -3])
+def test_memory_snapshot_frames_clamped_to_one(admin, frames):
+    response = admin('POST', f'/admin/profile/memory?frames={frames}')
+
+    assert response.status_code == 201
+    assert response.get_json()['snapshots']
@@ -0,0 +1,52 @@
+"""
+local:// message queue stand-in: Socket.IO servers in one process sharing a
+channel deliver each other's emits, as workers sharing a broker would.
+"""
+
+from flask import Flask
+from flask_socketio import SocketIO
+
+from utils.pubsub import queue_options
+
+
+def _server(url):
+    app = Flask(__name__)
+    socketio = SocketIO(app, async_mode='threading', **queue_options(url))
+    return app, socketio
+
+
+def test_emit_reaches_client_of_another_server_on_the_channel():
+    app_a, server_a = _server('local://test-fanout')
+    app_b, server_b = _server('local://test-fanout')
+    app_c, server_c = _server('local://test-elsewhere')
+    client_b = server_b.test_client(app_b)
+    client_c = server_c.test_client(app_c)
+    client_b.get_received()
+    client_c.get_received()
+
+    server_a.emit('announcement', {'text': 'hello', 'when': 1})
+
+    assert client_b.get_received() == [{'name': 'announcement', 'args': [{'text': 'hello', 'when': 1}],
+                                        'namespace': '/'}]
+    assert client_c.get_received() == []
+
+
+def test_room_emits_reach_only_members_on_other_servers():
+    app_a, server_a = _server('local://test-rooms')
+    app_b, server_b = _server('local://test-rooms')
+
+    @server_b.on('join')
+    def on_join(room):
+        from flask_socketio import join_room
+        join_room(room)
+
+    member = server_b.test_client(app_b)
+    outsider = server_b.test_client(app_b)
+    member.emit('join', 'question_1')
+    member.get_received()
+    outsider.get_received()
+
+    server_a.emit('question_delta', {'question_id': 1}, to='question_1')
+
+    assert [packet['name'] for packet in member.get_received()] == ['question_delta']
+    assert outsider.get_received() == []
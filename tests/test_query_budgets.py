@@ -0,0 +1,97 @@
+"""
+Every view declaring @query_budget is requested on its most expensive path
+(cold caches, pagination, filters); in strict mode an overrun raises
+QueryBudgetExceeded out of the request.
+"""
+
+import pytest
+
+from utils.query_audit import QueryBudgetExceeded, assert_max_queries, record_queries
+
+# endpoint -> URLs covering its query paths
+BUDGETED_REQUESTS = {
+    'api_suggest_tags': [
+        '/api/suggest_tags?title=python+flask+sql&content=docker+deployment',
+        '/api/suggest_tags',
+    ],
+    'questions_v1.get_tags': [
+        '/api/v1/tags',
+        '/api/v1/tags?page=1',
+        '/api/v1/tags?page=2&per_page=5',
+        '/api/v1/tags?prefix=py',
+        '/api/v1/tags?prefix=py&page=1&per_page=5',
+    ],
+    'stats_v1.get_platform_stats': ['/api/v1/stats'],
+    'stats_v1.get_activity_stats': ['/api/v1/stats/activity', '/api/v1/stats/activity?days=30'],
+    'stats_v1.get_leaderboard': ['/api/v1/stats/leaderboard', '/api/v1/stats/leaderboard?period=week'],
+    'questions_v1.get_questions': [
+        '/api/v1/questions',
+        '/api/v1/questions?per_page=100',
+        '/api/v1/questions?page=2&per_page=10',
+        '/api/v1/questions?tag=python',
+        '/api/v1/questions?search=error',
+        '/api/v1/questions?page=999',
+    ],
+}
+
+CASES = [(endpoint, url) for endpoint, urls in BUDGETED_REQUESTS.items() for url in urls]
+CONDITIONAL_CASES = [(endpoint, url) for endpoint, url in CASES
+                     if endpoint not in ('api_suggest_tags', 'stats_v1.get_leaderboard')]
+
+
+def test_every_budgeted_view_is_covered(app):
+    budgeted = {endpoint for endpoint, view in app.view_functions.items()
+                if getattr(view, 'query_budget', None) is not None}
+    assert budgeted == set(BUDGETED_REQUESTS)
+
+
+@pytest.mark.parametrize('endpoint,url', CASES)
+def test_view_stays_within_budget(app, client, cold_caches, endpoint, url):
+    budget = app.view_functions[endpoint].query_budget
+    response = client.get(url)
+    assert response.status_code == 200
+    assert int(response.headers['X-Query-Count']) <= budget
+
+
+@pytest.mark.parametrize('endpoint,url', CONDITIONAL_CASES)
+def test_conditional_revalidation_is_cheap(client, endpoint, url):
+    first = client.get(url)
+    response = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 304
+    assert int(response.headers['X-Query-Count']) <= 1
+
+
+def test_strict_mode_raises_on_overrun(app, client, cold_caches):
+    view = app.view_functions['questions_v1.get_tags']
+    budget = view.query_budget
+    view.query_budget = 1
+    try:
+        with pytest.raises(QueryBudgetExceeded, match='budget 1'):
+            client.get('/api/v1/tags?page=1')
+    finally:
+        view.query_budget = budget
+
+
+def test_assert_max_queries(app):
+    from app import Tag, db
+
+    with app.app_context():
+        with assert_max_queries(1):
+            Tag.query.limit(5).all()
+        with pytest.raises(QueryBudgetExceeded):
+            with assert_max_queries(1):
+                for tag in Tag.query.limit(3).all():
+                    db.session.query(Tag).filter(Tag.id == tag.id).one()
+
+
+def test_repeated_shapes_are_reported(app):
+    from app import Tag, db
+
+    with app.app_context():
+        tag_ids = [tag.id for tag in Tag.query.limit(4)]
+        with record_queries() as recorder:
+            for tag_id in tag_ids:
+                db.session.query(Tag.name).filter(Tag.id == tag_id).one()
+    [entry] = recorder.repeated_shapes()
+    assert entry['count'] == len(tag_ids) == 4
+    assert entry['stack'][0].startswith('tests')
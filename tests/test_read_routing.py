@@ -0,0 +1,75 @@
+"""
+Read replica routing with two SQLite files standing in for the primary and
+a replica. Each holds a marker tag the other lacks, so a probe view can tell
+which database its reads went to.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def routed(tmp_path):
+    from flask import jsonify, request
+    from app import Tag, create_app, db
+    from utils.routing import monitor, replica_binds
+
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    app = create_app({
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+        'SQLALCHEMY_BINDS': replica_binds([replica_url]),
+        'DB_REPLICA_CHECK_SECONDS': 60,
+        'SCHEDULER_ENABLED': False,
+        'API_ENABLED': False,
+        'ADMIN_ENABLED': False,
+    })
+
+    def probe():
+        if request.method == 'POST' or request.args.get('write'):
+            db.session.add(Tag(name=f'routing_written_{request.method.lower()}'))
+            db.session.flush()
+        names = sorted(name for (name,) in db.session.query(Tag.name).filter(Tag.name.like('routing_%')))
+        db.session.commit()
+        return jsonify(names)
+
+    app.add_url_rule('/_routing_probe', 'routing_probe', probe, methods=['GET', 'POST'])
+
+    with app.app_context():
+        db.create_all()
+        replica = db.engines['replica_1']
+        db.metadata.create_all(replica)
+        with db.engine.begin() as connection:
+            connection.execute(Tag.__table__.insert(), {'name': 'routing_primary'})
+        with replica.begin() as connection:
+            connection.execute(Tag.__table__.insert(), {'name': 'routing_replica'})
+        monitor.check('replica_1', replica)
+    yield app
+    monitor._status.pop('replica_1', None)
+
+
+def test_safe_get_reads_from_replica(routed):
+    assert routed.test_client().get('/_routing_probe').get_json() == ['routing_replica']
+
+
+def test_writes_and_later_reads_go_to_primary(routed):
+    client = routed.test_client()
+    assert client.post('/_routing_probe').get_json() == ['routing_primary', 'routing_written_post']
+    # A safe request that writes reads its own write back from the primary
+    other = routed.test_client()
+    assert other.get('/_routing_probe?write=1').get_json() == [
+        'routing_primary', 'routing_written_get', 'routing_written_post']
+
+
+def test_sticky_cookie_keeps_writer_on_primary(routed):
+    writer = routed.test_client()
+    writer.post('/_routing_probe')
+    assert writer.get('/_routing_probe').get_json() == ['routing_primary', 'routing_written_post']
+    assert routed.test_client().get('/_routing_probe').get_json() == ['routing_replica']
+
+
+def test_replica_marked_down_falls_back_to_primary(routed):
+    from utils.routing import monitor
+
+    monitor.mark_down('replica_1', 'OperationalError')
+    assert routed.test_client().get('/_routing_probe').get_json() == ['routing_primary']
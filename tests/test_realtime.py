@@ -0,0 +1,87 @@
+"""
+Question room deltas: changes within a window coalesce into one event with
+the latest absolute values, and backed-up clients skip droppable events and
+are told to resync once they drain.
+"""
+
+from flask import Flask
+from flask_socketio import SocketIO, join_room
+
+import realtime
+from realtime import QuestionUpdates, trigger_vote_deltas
+from utils.pubsub import queue_options
+
+
+class RecordingSender:
+    """Stands in for the Socket.IO server: records emits, holds the flush task"""
+
+    def __init__(self):
+        self.emitted = []
+        self.tasks = []
+
+    def emit(self, event, data, to=None):
+        self.emitted.append((event, data, to))
+
+    def start_background_task(self, target, *args):
+        self.tasks.append((target, args))
+
+
+def test_votes_within_a_window_emit_one_delta(monkeypatch):
+    sender = RecordingSender()
+    updates = QuestionUpdates(window=0.25)
+    monkeypatch.setattr(realtime, 'emitter', lambda: sender)
+    monkeypatch.setattr(realtime, 'question_updates', updates)
+
+    for score in (1, 2, 3, 2, 4):
+        trigger_vote_deltas([(7, 'question', 7, score)])
+    trigger_vote_deltas([(7, 'answer', 70, 1), (7, 'answer', 71, -1)])
+    trigger_vote_deltas([(7, 'answer', 70, 2)])
+    assert sender.emitted == []
+    assert len(sender.tasks) == 1  # one flush scheduled for the whole burst
+
+    updates.flush(sender)
+    assert sender.emitted == [('question_delta', {
+        'question_id': 7, 'score': 4, 'answer_scores': {'70': 2, '71': -1}}, 'question_7')]
+
+    trigger_vote_deltas([(7, 'question', 7, 5)])
+    assert len(sender.tasks) == 2  # the next change opens a new window
+
+
+def _server(max_backlog=2):
+    app = Flask(__name__)
+    socketio = SocketIO(app, async_mode='threading',
+                        **queue_options(None, droppable=('question_delta',), max_backlog=max_backlog))
+
+    @socketio.on('join_question')
+    def on_join(question_id):
+        join_room(f'question_{question_id}')
+
+    return app, socketio
+
+
+def _names(client):
+    return [(packet['name'], packet['args'][0]) for packet in client.get_received()]
+
+
+def test_backed_up_client_skips_deltas_then_resyncs(monkeypatch):
+    app, socketio = _server(max_backlog=2)
+    manager = socketio.server.manager
+    slow, fast = socketio.test_client(app), socketio.test_client(app)
+    for client in (slow, fast):
+        client.emit('join_question', 1)
+        client.get_received()
+
+    backlog = {slow.eio_sid: 10}
+    monkeypatch.setattr(manager, '_backlog', lambda eio_sid: backlog.get(eio_sid, 0))
+
+    socketio.emit('question_delta', {'question_id': 1, 'score': 3}, to='question_1')
+    socketio.emit('notification', {'content': 'not droppable'}, to='question_1')
+    assert _names(slow) == [('notification', {'content': 'not droppable'})]
+    assert _names(fast) == [('question_delta', {'question_id': 1, 'score': 3}),
+                            ('notification', {'content': 'not droppable'})]
+
+    backlog[slow.eio_sid] = 0  # drained
+    socketio.emit('question_delta', {'question_id': 1, 'score': 5}, to='question_1')
+    assert _names(slow) == [('resync', {'rooms': ['question_1']}),
+                            ('question_delta', {'question_id': 1, 'score': 5})]
+    assert _names(fast) == [('question_delta', {'question_id': 1, 'score': 5})]
@@ -0,0 +1,20 @@
+"""
+/api/v1/tags pagination clamps per_page to 1..500.
+"""
+
+import pytest
+
+
+@pytest.mark.parametrize('per_page', [0, -5])
+def test_per_page_below_one_is_clamped(client, cold_caches, per_page):
+    response = client.get(f'/api/v1/tags?page=1&per_page={per_page}')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['pagination']['per_page'] == 1
+    assert len(data['tags']) == 1
+    assert data['pagination']['pages'] == data['total']
+
+
+def test_per_page_above_maximum_is_clamped(client, cold_caches):
+    response = client.get('/api/v1/tags?page=1&per_page=10000')
+    assert response.get_json()['pagination']['per_page'] == 500
@@ -0,0 +1,37 @@
+"""
+Vote scores stay consistent with the vote rows, including on account deletion.
+"""
+
+from werkzeug.security import generate_password_hash
+
+
+def test_deleting_an_account_retracts_its_votes(app, client):
+    from app import Answer, Question, User, Vote, db
+    from services.votes import cast_votes
+    from utils.versions import get_versions
+
+    with app.app_context():
+        voter = User(username='departing_voter', email='departing@example.com',
+                     password_hash=generate_password_hash('x'))
+        db.session.add(voter)
+        db.session.commit()
+        voter_id = voter.id
+        question = Question.query.filter(Question.user_id != voter_id).first()
+        answer = Answer.query.filter(Answer.user_id != voter_id).first()
+        scores = {'question': question.score, 'answer': answer.score}
+        ids = {'question': question.id, 'answer': answer.id}
+        cast_votes(voter_id, [('question', ids['question'], 1), ('answer', ids['answer'], -1)])
+        versions = get_versions(['questions', f'question:{ids["question"]}', f'question:{answer.question_id}'])
+
+    with client.session_transaction() as session:
+        session['_user_id'] = str(voter_id)
+    response = client.post('/delete_account', data={'confirmation': 'delete my account'})
+    assert response.status_code == 302
+
+    with app.app_context():
+        assert db.session.get(User, voter_id) is None
+        assert Vote.query.filter_by(user_id=voter_id).count() == 0
+        assert db.session.get(Question, ids['question']).score == scores['question']
+        assert db.session.get(Answer, ids['answer']).score == scores['answer']
+        after = get_versions(list(versions))
+        assert all(after[key][0] > versions[key][0] for key in versions)
@@ -0,0 +1,75 @@
+# Aho-Corasick multi-pattern matcher
+from collections import deque
+
+
+class AhoCorasick:
+    """Match many keywords against a text in a single linear pass.
+
+    ``patterns`` maps each keyword to an arbitrary payload; matching yields
+    ``(start, end, keyword, payload)`` for every occurrence, including
+    overlapping ones. With ``whole_words`` set, matches must not be flanked by
+    letters or digits (so 'ai' does not fire inside 'said').
+    """
+
+    def __init__(self, patterns, whole_words=True):
+        self.whole_words = whole_words
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._dict_link = [0]  # nearest suffix state that has its own output
+
+        for keyword, payload in patterns.items():
+            if keyword:
+                self._add(keyword, payload)
+        self._link()
+
+    def __len__(self):
+        return len(self._goto)
+
+    def _add(self, keyword, payload):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._dict_link.append(0)
+            state = next_state
+        self._output[state].append((keyword, payload))
+
+    def _link(self):
+        """Breadth-first construction of failure and dictionary-suffix links"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                fail = self._fail[child]
+                self._dict_link[child] = fail if self._output[fail] else self._dict_link[fail]
+
+    def _is_boundary(self, text, index):
+        return index < 0 or index >= len(text) or not text[index].isalnum()
+
+    def iter_matches(self, text):
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+
+            match_state = state if self._output[state] else self._dict_link[state]
+            while match_state:
+                for keyword, payload in self._output[match_state]:
+                    start = index - len(keyword) + 1
+                    if not self.whole_words or (self._is_boundary(text, start - 1) and
+                                                self._is_boundary(text, index + 1)):
+                        yield start, index + 1, keyword, payload
+                match_state = self._dict_link[match_state]
@@ -0,0 +1,47 @@
+# Fingerprinted, precompressed static assets (built by build_static.py)
+import json
+import mimetypes
+import os
+
+from flask import request, send_from_directory, url_for
+
+from utils.compression import accepts_gzip
+
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def load_manifest(dist_dir):
+    """Load the {logical name: fingerprinted name} map, or {} if assets aren't built"""
+    try:
+        with open(os.path.join(dist_dir, 'manifest.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def init_assets(app):
+    """Register the /assets route and the asset_url() template helper"""
+    dist_dir = os.path.join(app.static_folder, 'dist')
+    manifest = load_manifest(dist_dir)
+
+    def asset_url(filename):
+        """URL for a static file, preferring its fingerprinted build when available"""
+        if filename in manifest:
+            return url_for('built_asset', filename=manifest[filename])
+        return url_for('static', filename=filename)
+
+    @app.route('/assets/<path:filename>')
+    def built_asset(filename):
+        """Serve a fingerprinted asset, using the .gz sibling when the client accepts gzip"""
+        gz_path = os.path.join(dist_dir, filename + '.gz')
+        if accepts_gzip(request.headers.get('Accept-Encoding')) and os.path.isfile(gz_path):
+            response = send_from_directory(dist_dir, filename + '.gz', max_age=31536000)
+            response.headers['Content-Encoding'] = 'gzip'
+            response.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        else:
+            response = send_from_directory(dist_dir, filename, max_age=31536000)
+        response.headers['Cache-Control'] = ASSET_CACHE_CONTROL
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+    app.jinja_env.globals['asset_url'] = asset_url
@@ -0,0 +1,46 @@
+# In-process caches keyed on entity version stamps
+from collections import OrderedDict
+import threading
+
+# Every cache created in this process, for hit/miss reporting
+caches = []
+
+
+class VersionedCache:
+    """Small thread-safe LRU cache whose entries are invalidated by version stamps.
+
+    Each entry remembers the version it was computed at; a lookup with a newer
+    version recomputes, so writes invalidate across workers without a shared
+    cache backend.
+    """
+
+    def __init__(self, name, max_entries=256):
+        self.name = name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        caches.append(self)
+
+    def get_or_compute(self, key, version, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
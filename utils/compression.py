@@ -0,0 +1,96 @@
+# Gzip response compression as plain WSGI middleware (stdlib only)
+import gzip
+
+DEFAULT_COMPRESSIBLE_TYPES = (
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'application/x-ndjson',
+    'image/svg+xml',
+)
+
+
+def accepts_gzip(accept_encoding):
+    """Return True if an Accept-Encoding header allows gzip (q > 0)"""
+    for item in (accept_encoding or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        if coding.strip().lower() not in ('gzip', '*'):
+            continue
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+class GzipMiddleware:
+    """Gzip-compress buffered responses above ``min_size`` for clients that accept it.
+
+    Responses without a Content-Length (streamed), already encoded responses,
+    and non-text content types pass through untouched.
+    """
+
+    def __init__(self, app, min_size=1024, level=6, compressible_types=DEFAULT_COMPRESSIBLE_TYPES):
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+        self.compressible_types = compressible_types
+
+    def _should_compress(self, status, headers):
+        if not status.startswith('200'):
+            return False
+        values = {name.lower(): value for name, value in headers}
+        if 'content-encoding' in values or 'no-transform' in values.get('cache-control', ''):
+            return False
+        content_type = values.get('content-type', '').split(';')[0].strip().lower()
+        if content_type not in self.compressible_types:
+            return False
+        try:
+            return int(values.get('content-length', '')) >= self.min_size
+        except ValueError:
+            return False
+
+    def __call__(self, environ, start_response):
+        if environ.get('REQUEST_METHOD') == 'HEAD' or not accepts_gzip(environ.get('HTTP_ACCEPT_ENCODING')):
+            return self.app(environ, start_response)
+
+        captured = {}
+
+        def capture_start_response(status, headers, exc_info=None):
+            captured['args'] = (status, headers, exc_info)
+            return body_parts.append
+
+        body_parts = []
+        app_iter = self.app(environ, capture_start_response)
+        status, headers, exc_info = captured['args']
+
+        if not self._should_compress(status, headers):
+            write = start_response(status, headers, exc_info)
+            for part in body_parts:
+                write(part)
+            return app_iter
+
+        try:
+            body_parts.extend(app_iter)
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+        body = gzip.compress(b''.join(body_parts), compresslevel=self.level, mtime=0)
+        headers = [(name, value) for name, value in headers
+                   if name.lower() not in ('content-length', 'etag')]
+        # Compressed bytes differ from the identity representation, so only keep weak validators
+        etag = next((value for name, value in captured['args'][1] if name.lower() == 'etag'), None)
+        if etag and etag.startswith('W/'):
+            headers.append(('ETag', etag))
+        headers.append(('Content-Encoding', 'gzip'))
+        headers.append(('Content-Length', str(len(body))))
+        headers.append(('Vary', 'Accept-Encoding'))
+        start_response(status, headers, exc_info)
+        return [body]
@@ -0,0 +1,108 @@
+# Buffered counter increments, written to the database in batches
+#
+# Hot read paths (question views bumping profile_views) used to UPDATE and
+# commit on every request. Increments are now summed in memory per process
+# and applied as one executemany UPDATE by the scheduler's
+# flush_counters job, or lazily by the next add() once the buffer is older
+# than max_age, so counts lag by at most a few seconds.
+import atexit
+import threading
+import time
+
+from sqlalchemy import bindparam
+
+# Every buffer created in this process, for flush_all()
+buffers = []
+
+
+class CounterBuffer:
+    """Per-process sums of ``column += n`` keyed by primary key"""
+
+    def __init__(self, table, column, max_age=30.0):
+        self.table = table
+        self.column = column
+        self.max_age = max_age
+        self._pending = {}
+        self._since = None
+        self._lock = threading.Lock()
+        self._flushing = threading.Lock()
+        buffers.append(self)
+
+    def add(self, key, amount=1):
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + amount
+            if self._since is None:
+                self._since = time.monotonic()
+            stale = time.monotonic() - self._since >= self.max_age
+        if stale:
+            self.flush()
+
+    def pending(self):
+        with self._lock:
+            return dict(self._pending)
+
+    def flush(self):
+        """Apply buffered increments in one transaction; returns rows updated"""
+        from app import db
+
+        if not self._flushing.acquire(blocking=False):
+            return 0  # another thread is already flushing
+        try:
+            with self._lock:
+                pending, self._pending, self._since = self._pending, {}, None
+            if not pending:
+                return 0
+            table = db.metadata.tables[self.table]
+            column = table.c[self.column]
+            stmt = (table.update()
+                    .where(table.c.id == bindparam('key'))
+                    .values({self.column: column + bindparam('amount')}))
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(stmt, [{'key': key, 'amount': amount}
+                                              for key, amount in sorted(pending.items())])
+            except Exception:
+                # Put the increments back so the next flush retries them
+                with self._lock:
+                    for key, amount in pending.items():
+                        self._pending[key] = self._pending.get(key, 0) + amount
+                    if self._since is None:
+                        self._since = time.monotonic()
+                raise
+            return len(pending)
+        finally:
+            self._flushing.release()
+
+
+    def discard(self):
+        """Drop buffered increments without writing them"""
+        with self._lock:
+            self._pending, self._since = {}, None
+
+
+def flush_all():
+    """Flush every buffer in this process; returns rows updated"""
+    return sum(buffer.flush() for buffer in buffers)
+
+
+profile_views = CounterBuffer('user', 'profile_views')
+
+
+_app = None
+
+
+def init_counters(app):
+    """Flush increments still buffered at interpreter exit through ``app``"""
+    global _app
+    _app = app
+
+
+@atexit.register
+def _flush_at_exit():
+    if _app is None:
+        return  # no app was built, so nothing was buffered
+    try:
+        with _app.app_context():
+            flush_all()
+    except Exception:
+        pass  # the database may already be gone at interpreter exit
@@ -0,0 +1,188 @@
+# Per-dialect engine profiles: pool sizing, connection setup, liveness
+#
+# engine_options() returns SQLALCHEMY_ENGINE_OPTIONS for a database URL.
+# Every profile uses a ProfiledPool, a QueuePool that records how long each
+# checkout waited for a connection (db_pool_checkout_wait_seconds), so pool
+# starvation shows up in /metrics before requests time out.
+#
+# SQLite: WAL journal (readers no longer block the writer), synchronous=NORMAL
+# (durable at checkpoints, no fsync per commit), a busy timeout so colliding
+# view-counter and vote writes wait instead of raising "database is locked",
+# plus mmap and page cache sizes. These are per connection, so the pool keeps
+# connections open instead of SQLAlchemy 1.4's NullPool for file databases.
+#
+# PostgreSQL: the pool is sized to the serving model (one connection per
+# gunicorn thread, a fixed pool shared by greenlets), statements and idle
+# transactions time out server-side, and TCP keepalives plus a ping only for
+# connections that sat idle in the pool replace pool_pre_ping's round trip
+# on every checkout.
+import os
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+from utils.metrics import Gauge, registry
+
+POOL_CHECKOUT_WAIT = registry.histogram(
+    'db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection', ('engine',),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0))
+POOL_CHECKOUT_TIMEOUTS = registry.counter(
+    'db_pool_checkout_timeouts_total', 'Checkouts that gave up after pool_timeout', ('engine',))
+POOL_STALE_CONNECTIONS = registry.counter(
+    'db_pool_stale_connections_total', 'Idle connections found dead by the checkout ping', ('engine',))
+
+# role -> engine, for the pool gauges
+engines = {}
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+class ProfiledPool(QueuePool):
+    """QueuePool timing every checkout; subclasses set ``role`` for the metric label"""
+    role = 'primary'
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.inc(engine=self.role)
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, engine=self.role)
+
+
+def pool_size_for(model=None, threads=None):
+    """(pool_size, max_overflow) for the serving model (see serve.py)"""
+    model = model or os.environ.get('SERVER_WORKER_CLASS', 'threaded')
+    if model == 'threaded':
+        threads = threads or _env_int('SERVER_THREADS', 0)
+        if threads:
+            # One connection per request thread, a little headroom for the
+            # scheduler and warm-up threads
+            size, overflow = threads, max(2, threads // 4)
+        else:
+            size, overflow = 5, 10  # development server
+    else:
+        # Greenlets far outnumber connections; they queue on the pool
+        size, overflow = 10, 10
+    return _env_int('DB_POOL_SIZE', size), _env_int('DB_MAX_OVERFLOW', overflow)
+
+
+def sqlite_settings():
+    return {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000),
+        'mmap_size': _env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        # Negative values are KiB rather than pages
+        'cache_size': -_env_int('SQLITE_CACHE_SIZE_KB', 64 * 1024),
+        'temp_store': 'MEMORY',
+    }
+
+
+def _apply_pragmas(settings):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in settings.items():
+                cursor.execute(f'PRAGMA {pragma}={value}')
+        finally:
+            cursor.close()
+    return on_connect
+
+
+def _ping_when_idle(idle_seconds, role):
+    """Checkout hook: SELECT 1 only on connections that sat in the pool for ``idle_seconds``"""
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get('checked_in_at')
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute('SELECT 1')
+        except Exception:
+            POOL_STALE_CONNECTIONS.inc(engine=role)
+            # The pool discards this connection and retries with a fresh one
+            raise exc.DisconnectionError()
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info['checked_in_at'] = time.monotonic()
+
+    return on_checkout, on_checkin
+
+
+def engine_options(uri, role='primary'):
+    """SQLALCHEMY_ENGINE_OPTIONS for ``uri``; listeners ride on a pool subclass per engine"""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    pool_class = type(f'ProfiledPool_{role}', (ProfiledPool,), {'role': role})
+    pool_size, max_overflow = pool_size_for()
+    options = {'pool_timeout': _env_int('DB_POOL_TIMEOUT', 10)}
+
+    if backend == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            return {}  # one shared in-memory connection; nothing to pool or tune
+        event.listen(pool_class, 'connect', _apply_pragmas(sqlite_settings()))
+        options.update(poolclass=pool_class, pool_size=pool_size, max_overflow=max_overflow,
+                       connect_args={'check_same_thread': False})
+    elif backend in ('postgresql', 'postgres'):
+        statement_timeout = _env_int('DB_STATEMENT_TIMEOUT_MS', 30000)
+        idle_timeout = _env_int('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', 60000)
+        on_checkout, on_checkin = _ping_when_idle(_env_int('DB_PING_IDLE_SECONDS', 30), role)
+        event.listen(pool_class, 'checkout', on_checkout)
+        event.listen(pool_class, 'checkin', on_checkin)
+        options.update(poolclass=pool_class, pool_size=pool_size, max_overflow=max_overflow,
+                       pool_recycle=_env_int('DB_POOL_RECYCLE', 300),
+                       # Reuse the most recent connection so surplus ones stay idle and get recycled
+                       pool_use_lifo=True,
+                       connect_args={
+                           'options': f'-c statement_timeout={statement_timeout} '
+                                      f'-c idle_in_transaction_session_timeout={idle_timeout}',
+                           'connect_timeout': _env_int('DB_CONNECT_TIMEOUT', 5),
+                           'keepalives': 1,
+                           'keepalives_idle': 30,
+                           'keepalives_interval': 10,
+                           'keepalives_count': 3,
+                       })
+    else:
+        # Unknown dialect: keep the generic safe defaults
+        options.update(pool_pre_ping=True, pool_recycle=300)
+    return options
+
+
+def register_engine(role, engine):
+    """Expose ``engine``'s pool in the db_pool_connections gauge"""
+    engines[role] = engine
+    return engine
+
+
+def init_engine_metrics(app, db):
+    """Register the primary engine (Flask-SQLAlchemy builds it in SQLAlchemy(app))"""
+    with app.app_context():
+        register_engine('primary', db.engine)
+
+
+def _collect_pools():
+    connections = Gauge('db_pool_connections', 'Pooled connections by state', ('engine', 'state'))
+    for role, engine in engines.items():
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        connections.set(pool.checkedout(), engine=role, state='checked_out')
+        connections.set(pool.checkedin(), engine=role, state='idle')
+        connections.set(max(pool.overflow(), 0), engine=role, state='overflow')
+    return [connections]
+
+
+registry.add_collector(_collect_pools)
@@ -0,0 +1,100 @@
+# Liveness and readiness probes for orchestrators
+#
+# /healthz answers as long as the process can serve a request and never
+# touches the database. /readyz returns 503 until this worker is fit for
+# traffic: warm-up finished, the database answers a SELECT 1 (cached for
+# HEALTH_DB_CACHE_SECONDS so probe storms don't reach it), and the
+# connection pool is not exhausted.
+import os
+import threading
+import time
+
+from flask import jsonify
+from sqlalchemy import text
+
+from utils import warmup
+
+
+class DatabaseCheck:
+    """SELECT 1 on a pooled connection, with the result reused for ``ttl`` seconds"""
+
+    def __init__(self, ttl=2.0):
+        self.ttl = ttl
+        self._result = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, engine):
+        with self._lock:
+            if self._result is not None and time.monotonic() - self._checked_at < self.ttl:
+                return dict(self._result, cached=True)
+            started = time.perf_counter()
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text('SELECT 1'))
+                result = {'ok': True}
+            except Exception as e:
+                result = {'ok': False, 'error': type(e).__name__}
+            result['latency_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            self._result, self._checked_at = result, time.monotonic()
+            return dict(result, cached=False)
+
+
+database_check = DatabaseCheck()
+
+
+def pool_status(engine):
+    """Checked-out connections against pool capacity (QueuePool); unbounded pools never saturate"""
+    pool = engine.pool
+    if not hasattr(pool, 'checkedout') or not hasattr(pool, 'size'):
+        return {'ok': True, 'pool': type(pool).__name__}
+    checked_out = pool.checkedout()
+    max_overflow = getattr(pool, '_max_overflow', 0)
+    if max_overflow < 0:
+        return {'ok': True, 'pool': type(pool).__name__, 'checked_out': checked_out}
+    capacity = pool.size() + max_overflow
+    return {
+        'ok': checked_out < capacity,
+        'pool': type(pool).__name__,
+        'checked_out': checked_out,
+        'capacity': capacity,
+        'saturation': round(checked_out / capacity, 3) if capacity else 1.0
+    }
+
+
+def readiness(app, engine):
+    """(ready, checks) for this worker"""
+    # A server that doesn't warm up itself (python app.py) warms on the first probe
+    warmup.ensure_warmup(app)
+    pool = pool_status(engine)
+    checks = {
+        'warmup': {'ok': warmup.is_warm(), 'tasks': warmup.status()},
+        # An exhausted pool would make the probe itself wait for a connection
+        'database': database_check(engine) if pool['ok'] else {'ok': False, 'skipped': 'pool exhausted'},
+        'pool': pool,
+    }
+    return all(check['ok'] for check in checks.values()), checks
+
+
+def init_health(app):
+    """Register /healthz and /readyz"""
+    app.config.setdefault('HEALTH_DB_CACHE_SECONDS', float(os.environ.get('HEALTH_DB_CACHE_SECONDS', 2)))
+    database_check.ttl = app.config['HEALTH_DB_CACHE_SECONDS']
+
+    @app.route('/healthz')
+    def healthz():
+        """Liveness: the process is up and serving requests"""
+        response = jsonify({'status': 'ok', 'pid': os.getpid()})
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    @app.route('/readyz')
+    def readyz():
+        """Readiness: warm, database reachable, pool not exhausted"""
+        from app import db
+
+        ready, checks = readiness(app, db.engine)
+        response = jsonify({'status': 'ready' if ready else 'unavailable', 'checks': checks})
+        response.status_code = 200 if ready else 503
+        response.headers['Cache-Control'] = 'no-store'
+        return response
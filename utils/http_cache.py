@@ -0,0 +1,73 @@
+# HTTP conditional request helpers (ETag / Last-Modified / 304)
+from functools import wraps
+import hashlib
+
+from flask import g, request, make_response
+
+from utils.versions import get_versions
+
+
+def _weak_etag(versions, extra):
+    """Build a weak ETag from version stamps plus any extra tokens"""
+    parts = [f'{key}={versions[key][0]}' for key in sorted(versions)]
+    parts.extend(str(token) for token in extra)
+    digest = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:20]
+    return digest
+
+
+def _last_modified(versions):
+    stamps = [updated_at for _, updated_at in versions.values() if updated_at]
+    return max(stamps).replace(microsecond=0) if stamps else None
+
+
+def _not_modified(etag, last_modified):
+    """Apply RFC 7232 precedence: If-None-Match wins over If-Modified-Since"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def current_versions(keys):
+    """Version stamps for ``keys``, reusing the ones @conditional read for this request"""
+    versions = g.get('conditional_versions') or {}
+    if all(key in versions for key in keys):
+        return {key: versions[key] for key in keys}
+    return get_versions(keys)
+
+
+def conditional(keys, cache_control='no-cache', extra=None):
+    """Answer GETs with 304 when the version stamps behind a view are unchanged.
+
+    ``keys`` is a list of version keys or a callable receiving the view kwargs
+    and returning one; ``extra`` optionally returns more tokens to mix into the
+    ETag (e.g. the current date for time-windowed stats). The stamps are read
+    before the view runs, so a match skips the query and serialization;
+    the view gets the same stamps from current_versions() without a second read.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            version_keys = keys(**kwargs) if callable(keys) else keys
+            versions = g.conditional_versions = get_versions(version_keys)
+            etag = _weak_etag(versions, extra() if extra else ())
+            last_modified = _last_modified(versions)
+
+            if _not_modified(etag, last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = cache_control
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,269 @@
+# In-process metrics with a Prometheus text-format /metrics endpoint
+#
+# Metrics are per worker process; scrape each worker (or run a single
+# worker) to get the full picture. No external service is needed.
+from contextlib import contextmanager
+from functools import wraps
+import bisect
+import threading
+import time
+
+from flask import Response, abort, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}' for key, v in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        series = self._series.get(self._key(labels))
+        return series[-1] if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key, [('le', '+Inf')])
+            lines.append(f'{self.name}_bucket{labels} {series[-1]}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(series[-2])}')
+            lines.append(f'{self.name}_count{labels} {series[-1]}')
+        return lines
+
+
+class Registry:
+    """Holds metrics plus collector callbacks that produce samples at scrape time"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        """``collector()`` returns an iterable of Metric objects built on demand"""
+        self._collectors.append(collector)
+
+    def render(self):
+        metrics = list(self._metrics.values())
+        for collector in self._collectors:
+            metrics.extend(collector())
+        lines = []
+        for metric in sorted(metrics, key=lambda m: m.name):
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.histogram(
+    'http_request_duration_seconds', 'Request latency by endpoint', ('endpoint', 'method', 'status'))
+REQUEST_QUERIES = registry.histogram(
+    'http_request_db_queries', 'SQL statements issued per request', ('endpoint',),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 1000))
+REQUEST_DB_TIME = registry.histogram(
+    'http_request_db_seconds', 'Time spent in SQL per request', ('endpoint',))
+DB_QUERY_LATENCY = registry.histogram(
+    'db_query_duration_seconds', 'Latency of individual SQL statements', ('operation',))
+AI_LATENCY = registry.histogram(
+    'ai_engine_duration_seconds', 'AI engine call latency', ('operation',))
+
+
+def _collect_caches():
+    from utils.cache import caches
+    hits = Counter('cache_hits_total', 'Cache lookups served from cache', ('cache',))
+    misses = Counter('cache_misses_total', 'Cache lookups that recomputed', ('cache',))
+    for cache in caches:
+        hits.inc(cache.hits, cache=cache.name)
+        misses.inc(cache.misses, cache=cache.name)
+    return [hits, misses]
+
+
+registry.add_collector(_collect_caches)
+
+
+def timed(operation, histogram=AI_LATENCY):
+    """Decorator recording a function's duration under ``operation``"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(operation=operation):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def request_endpoint():
+    """Bounded label for the current request (unmatched URLs share one label)"""
+    return request.endpoint or 'unmatched'
+
+
+# SQL instrumentation on every engine (primary and any replicas)
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'OTHER'
+    DB_QUERY_LATENCY.observe(elapsed, operation=operation)
+
+    if has_request_context() and 'metrics_start' in g:
+        g.metrics_queries += 1
+        g.metrics_db_time += elapsed
+
+
+def _observe_request(status):
+    if g.get('metrics_recorded') or 'metrics_start' not in g:
+        return
+    g.metrics_recorded = True
+    endpoint = request_endpoint()
+    REQUEST_LATENCY.observe(time.perf_counter() - g.metrics_start,
+                            endpoint=endpoint, method=request.method, status=status)
+    REQUEST_QUERIES.observe(g.metrics_queries, endpoint=endpoint)
+    REQUEST_DB_TIME.observe(g.metrics_db_time, endpoint=endpoint)
+
+
+def _metrics_allowed():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        return request.headers.get('Authorization') == f'Bearer {token}'
+    return request.remote_addr in ('127.0.0.1', '::1')
+
+
+def init_metrics(app):
+    """Install request timing hooks and the /metrics endpoint"""
+
+    @app.before_request
+    def _start_request_timer():
+        g.metrics_start = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_db_time = 0.0
+
+    @app.after_request
+    def _record_request(response):
+        _observe_request(response.status_code)
+        return response
+
+    @app.teardown_request
+    def _record_failed_request(exc):
+        if exc is not None:
+            _observe_request(500)
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus text exposition of this worker's metrics"""
+        if not _metrics_allowed():
+            abort(403)
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
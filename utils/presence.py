@@ -0,0 +1,144 @@
+# Online presence shared across Socket.IO workers
+#
+# A user is online while any of their sockets is connected somewhere. Each
+# worker joins/leaves sockets as they connect and disconnect and re-announces
+# the sockets it holds every ttl/3 seconds (heartbeat), so the users of a
+# worker that dies drop out after ``ttl`` instead of staying online forever.
+#
+# count() never scans: the Redis store keeps users in a sorted set scored by
+# expiry (ZREMRANGEBYSCORE trims the expired head, ZCARD counts); the memory
+# store expires from a heap and counts a dict. The memory store is per
+# process, fine for one worker and for tests; more workers need Redis.
+from collections import defaultdict
+import heapq
+import threading
+import time
+
+
+class MemoryPresence:
+    """Presence for a single process"""
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._expires = {}  # user_id -> expiry
+        self._sids = defaultdict(set)
+        self._heap = []  # (expiry, user_id); stale entries are skipped on pop
+        self._lock = threading.Lock()
+
+    def _touch(self, user_id, now):
+        expires = now + self.ttl
+        self._expires[user_id] = expires
+        heapq.heappush(self._heap, (expires, user_id))
+
+    def _expire(self, now):
+        while self._heap and self._heap[0][0] <= now:
+            expires, user_id = heapq.heappop(self._heap)
+            if self._expires.get(user_id) == expires:
+                del self._expires[user_id]
+                self._sids.pop(user_id, None)
+
+    def join(self, user_id, sid):
+        with self._lock:
+            self._sids[user_id].add(sid)
+            self._touch(user_id, time.monotonic())
+
+    def leave(self, user_id, sid):
+        with self._lock:
+            sids = self._sids.get(user_id)
+            if sids is None:
+                return
+            sids.discard(sid)
+            if not sids:
+                del self._sids[user_id]
+                self._expires.pop(user_id, None)
+
+    def heartbeat(self, connections):
+        """Refresh the users behind ``connections`` ({sid: user_id} held by this worker)"""
+        now = time.monotonic()
+        with self._lock:
+            for sid, user_id in connections.items():
+                self._sids[user_id].add(sid)
+            for user_id in set(connections.values()):
+                self._touch(user_id, now)
+
+    def is_online(self, user_id):
+        with self._lock:
+            self._expire(time.monotonic())
+            return user_id in self._expires
+
+    def count(self):
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._expires)
+
+
+# Drop the socket and, when it was the user's last, the user (atomically, so
+# a concurrent join on another worker is not lost)
+_LEAVE = """
+redis.call('SREM', KEYS[2], ARGV[2])
+if redis.call('SCARD', KEYS[2]) == 0 then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+end
+"""
+
+
+class RedisPresence:
+    """Presence shared by every worker through Redis"""
+
+    def __init__(self, url, ttl=60, prefix='qa:presence'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('PRESENCE_URL needs the redis package (pip install redis)')
+        self.ttl = ttl
+        self.client = redis.Redis.from_url(url)
+        self.online_key = f'{prefix}:online'
+        self.prefix = prefix
+        self._leave = self.client.register_script(_LEAVE)
+
+    def _sids_key(self, user_id):
+        return f'{self.prefix}:sids:{user_id}'
+
+    def _announce(self, pipe, user_id, sids, now):
+        pipe.zadd(self.online_key, {str(user_id): now + self.ttl})
+        pipe.sadd(self._sids_key(user_id), *sids)
+        pipe.expire(self._sids_key(user_id), self.ttl)
+
+    def join(self, user_id, sid):
+        pipe = self.client.pipeline()
+        self._announce(pipe, user_id, [sid], time.time())
+        pipe.execute()
+
+    def leave(self, user_id, sid):
+        self._leave(keys=[self.online_key, self._sids_key(user_id)], args=[str(user_id), sid])
+
+    def heartbeat(self, connections):
+        by_user = defaultdict(list)
+        for sid, user_id in connections.items():
+            by_user[user_id].append(sid)
+        if not by_user:
+            return
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        for user_id, sids in by_user.items():
+            self._announce(pipe, user_id, sids, now)
+        pipe.execute()
+
+    def is_online(self, user_id):
+        expires = self.client.zscore(self.online_key, str(user_id))
+        return expires is not None and expires > time.time()
+
+    def count(self):
+        pipe = self.client.pipeline()
+        pipe.zremrangebyscore(self.online_key, '-inf', time.time())
+        pipe.zcard(self.online_key)
+        return pipe.execute()[1]
+
+
+def presence_store(url, ttl=60):
+    """Store for PRESENCE_URL: redis://... or memory://"""
+    if url and url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisPresence(url, ttl)
+    if url and not url.startswith('memory://'):
+        raise ValueError(f'Unsupported PRESENCE_URL {url!r}; use redis://... or memory://')
+    return MemoryPresence(ttl)
@@ -0,0 +1,224 @@
+# On-demand request profiling (cProfile + stack sampling) and tracemalloc snapshots
+#
+# State is per worker process: arm profiling on the worker you want to
+# inspect, or run a single worker while investigating.
+from collections import Counter
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from flask import request
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f'{filename}:{code.co_name}'
+
+
+class StackSampler:
+    """Background thread sampling the stacks of registered threads into collapsed-stack counts"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self._threads = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def watch(self, thread_id):
+        with self._lock:
+            self._threads.add(thread_id)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+
+    def unwatch(self, thread_id):
+        with self._lock:
+            self._threads.discard(thread_id)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                watched = set(self._threads)
+            if not watched:
+                return
+            frames = sys._current_frames()
+            for thread_id in watched:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[';'.join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def collapsed(self):
+        """Brendan Gregg collapsed-stack text, ready for flamegraph.pl / speedscope"""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """Profile the next N requests whose path matches a pattern"""
+
+    def __init__(self):
+        self.pattern = None
+        self.remaining = 0
+        self.profiled = 0
+        self.stats = None
+        self.sampler = StackSampler()
+        self._busy = threading.Lock()  # cProfile can only run one profile at a time
+        self._lock = threading.Lock()
+
+    def arm(self, pattern, count, sample_interval=0.005):
+        with self._lock:
+            self.pattern = re.compile(pattern)
+            self.remaining = count
+            self.sampler.interval = sample_interval
+
+    def reset(self):
+        with self._lock:
+            self.pattern = None
+            self.remaining = 0
+            self.profiled = 0
+            self.stats = None
+            self.sampler = StackSampler(self.sampler.interval)
+
+    def status(self):
+        return {
+            'pattern': self.pattern.pattern if self.pattern else None,
+            'remaining': self.remaining,
+            'profiled': self.profiled,
+            'sampled_stacks': sum(self.sampler.stacks.values())
+        }
+
+    def _claim(self, path):
+        with self._lock:
+            if self.remaining <= 0 or not self.pattern or not self.pattern.search(path):
+                return False
+            if not self._busy.acquire(blocking=False):
+                return False
+            self.remaining -= 1
+            return True
+
+    def start(self, path):
+        """Begin profiling the current request; returns a token for finish() or None"""
+        if not self._claim(path):
+            return None
+        profile = cProfile.Profile()
+        self.sampler.watch(threading.get_ident())
+        profile.enable()
+        return profile
+
+    def finish(self, profile):
+        profile.disable()
+        self.sampler.unwatch(threading.get_ident())
+        with self._lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+            self.profiled += 1
+        self._busy.release()
+
+    def dump_pstats(self):
+        """Binary pstats dump (load with pstats.Stats / snakeviz)"""
+        if self.stats is None:
+            return None
+        fd, path = tempfile.mkstemp(suffix='.pstats')
+        os.close(fd)
+        try:
+            self.stats.dump_stats(path)
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            os.unlink(path)
+
+    def report(self, sort='cumulative', limit=50):
+        if self.stats is None:
+            return ''
+        out = io.StringIO()
+        self.stats.stream = out
+        self.stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+class MemorySnapshots:
+    """Numbered tracemalloc snapshots with top-N diffs between any two"""
+
+    def __init__(self, keep=10):
+        self.keep = keep
+        self.snapshots = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def take(self, frames=25):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self.snapshots[snapshot_id] = (time.time(), snapshot)
+            for old_id in sorted(self.snapshots)[:-self.keep]:
+                del self.snapshots[old_id]
+        return snapshot_id
+
+    def stop(self):
+        with self._lock:
+            self.snapshots.clear()
+        tracemalloc.stop()
+
+    def listing(self):
+        return [{
+            'id': snapshot_id,
+            'taken_at': taken_at,
+            'total_bytes': sum(stat.size for stat in snapshot.statistics('filename'))
+        } for snapshot_id, (taken_at, snapshot) in sorted(self.snapshots.items())]
+
+    def diff(self, from_id, to_id, key_type='lineno', limit=30):
+        """Text report of the largest allocation changes between two snapshots"""
+        old = self.snapshots[from_id][1]
+        new = self.snapshots[to_id][1]
+        lines = [f'Top {limit} differences ({key_type}) between snapshot {from_id} and {to_id}:']
+        for stat in new.compare_to(old, key_type)[:limit]:
+            lines.append(str(stat))
+            if key_type == 'traceback':
+                lines.extend(f'    {line}' for line in stat.traceback.format())
+        return '\n'.join(lines) + '\n'
+
+
+profiler = RequestProfiler()
+memory_snapshots = MemorySnapshots()
+
+
+def init_profiling(app):
+    """Hook armed profiling into the request cycle"""
+
+    @app.before_request
+    def _maybe_start_profile():
+        token = profiler.start(request.path)
+        if token is not None:
+            request.environ['qa.profile'] = token
+
+    @app.teardown_request
+    def _finish_profile(exc):
+        token = request.environ.pop('qa.profile', None)
+        if token is not None:
+            profiler.finish(token)
@@ -0,0 +1,138 @@
+# Socket.IO message queue selection, with an in-process stand-in
+#
+# SOCKETIO_MESSAGE_QUEUE takes any URL Flask-SocketIO understands (redis://,
+# amqp:// via kombu, kafka://, zmq+tcp://), so emits and room membership
+# reach clients held by every worker. local://<channel> is the stand-in for
+# tests and single-process runs: Socket.IO servers in one process share
+# emits on the channel, as workers sharing a broker would.
+#
+# Every client manager built here applies backpressure where packets are
+# handed to sockets: events marked droppable (coalesced state deltas) skip
+# clients whose outgoing queue already holds more than max_backlog packets,
+# rather than piling up behind a slow connection. Skipped clients are sent
+# resync_event once they drain, and refetch the state they missed.
+from collections import defaultdict
+import json
+import threading
+
+import socketio
+
+from utils.metrics import registry
+
+DEFAULT_CHANNEL = 'flask-socketio'
+
+BACKPRESSURE_SKIPS = registry.counter(
+    'realtime_backpressure_skips_total', 'Droppable events not sent to a backed-up client', ('event',))
+
+
+class BackpressureManager(socketio.Manager):
+    """Client manager that drops ``droppable`` events for clients with a send backlog
+
+    Sits below the pub/sub managers in the MRO, so it filters the final
+    local delivery on every worker, including emits arriving from the queue.
+    """
+    droppable = frozenset()
+    max_backlog = 32
+    resync_event = 'resync'
+
+    def __init__(self):
+        super().__init__()
+        self.stale = {}  # sid -> rooms whose droppable events it missed
+
+    def _backlog(self, eio_sid):
+        socket = self.server.eio.sockets.get(eio_sid) if self.server else None
+        return socket.queue.qsize() if socket is not None else 0
+
+    def emit(self, event, data, namespace=None, room=None, skip_sid=None, callback=None, to=None, **kwargs):
+        room = to or room
+        namespace = namespace or '/'
+        if event not in self.droppable or namespace not in self.rooms:
+            return super().emit(event, data, namespace=namespace, room=room, skip_sid=skip_sid, callback=callback)
+        skip = list(skip_sid) if isinstance(skip_sid, list) else [skip_sid]
+        for sid, eio_sid in list(self.get_participants(namespace, room)):
+            if sid in skip:
+                continue
+            if self._backlog(eio_sid) > self.max_backlog:
+                skip.append(sid)
+                self.stale.setdefault(sid, set()).add(room)
+                BACKPRESSURE_SKIPS.inc(event=event)
+            elif sid in self.stale:
+                rooms = [r for r in self.stale.pop(sid) if r is not None]
+                socketio.Manager.emit(self, self.resync_event, {'rooms': sorted(rooms)}, namespace, room=sid)
+        return super().emit(event, data, namespace=namespace, room=room, skip_sid=skip, callback=callback)
+
+    def basic_disconnect(self, sid, namespace, **kwargs):
+        self.stale.pop(sid, None)
+        return super().basic_disconnect(sid, namespace, **kwargs)
+
+
+# channel -> managers of the Socket.IO servers in this process
+_channels = defaultdict(list)
+_lock = threading.Lock()
+
+
+class LocalManager(BackpressureManager):
+    """Client manager fanning emits out to every server on its channel in this process
+
+    Delivery is synchronous and payloads are JSON round-tripped, as they
+    would be through a broker. Unlike PubSubManager subclasses it works with
+    Flask-SocketIO's test client.
+    """
+    name = 'local'
+
+    def __init__(self, channel=DEFAULT_CHANNEL, write_only=False):
+        super().__init__()
+        self.channel = channel
+        self.write_only = write_only
+        if not write_only:
+            with _lock:
+                _channels[channel].append(self)
+
+    def emit(self, event, data, namespace=None, room=None, skip_sid=None, callback=None, to=None, **kwargs):
+        room = to or room
+        namespace = namespace or '/'
+        if not self.write_only:
+            super().emit(event, data, namespace=namespace, room=room, skip_sid=skip_sid, callback=callback)
+        with _lock:
+            others = [manager for manager in _channels[self.channel]
+                      if manager is not self and getattr(manager, 'server', None) is not None]
+        if not others:
+            return
+        payload = json.loads(json.dumps(data))
+        if isinstance(data, tuple):
+            payload = tuple(payload)  # several event arguments
+        for manager in others:
+            # Acknowledgement callbacks only work for this server's own clients
+            BackpressureManager.emit(manager, event, payload, namespace=namespace, room=room, skip_sid=skip_sid)
+
+
+def is_shared(url):
+    """Whether ``url`` connects separate processes (local:// does not)"""
+    return bool(url) and not url.startswith('local://')
+
+
+def _broker_manager_class(url):
+    """Flask-SocketIO's manager for ``url``, with backpressure on local delivery"""
+    if url.startswith(('redis://', 'rediss://')):
+        base = socketio.RedisManager
+    elif url.startswith('kafka://'):
+        base = socketio.KafkaManager
+    elif url.startswith('zmq'):
+        base = socketio.ZmqManager
+    else:
+        base = socketio.KombuManager
+    # MRO: base, PubSubManager, BackpressureManager, Manager
+    return type(f'Backpressure{base.__name__}', (base, BackpressureManager), {})
+
+
+def queue_options(url, channel=DEFAULT_CHANNEL, write_only=False, droppable=(), max_backlog=32):
+    """SocketIO.init_app() keyword arguments for the message queue at ``url`` (None for none)"""
+    if not url:
+        manager = BackpressureManager()
+    elif url.startswith('local://'):
+        manager = LocalManager(channel=url[len('local://'):] or channel, write_only=write_only)
+    else:
+        manager = _broker_manager_class(url)(url, channel=channel, write_only=write_only)
+    manager.droppable = frozenset(droppable)
+    manager.max_backlog = max_backlog
+    return {'client_manager': manager}
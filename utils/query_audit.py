@@ -0,0 +1,194 @@
+# Development/test query auditing: N+1 detection and per-route query budgets
+#
+# Enabled with QUERY_AUDIT (env or app config). Every SQL statement issued
+# during a request is recorded and grouped by normalized shape; shapes that
+# repeat N+1_THRESHOLD or more times are reported with the application stack
+# that issued them. Views can declare a budget with @query_budget(n); with
+# QUERY_BUDGET_STRICT set (e.g. under pytest) exceeding it raises.
+from contextlib import contextmanager
+import os
+import re
+import threading
+import traceback
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+N_PLUS_ONE_THRESHOLD = 3
+
+_recorders = threading.local()
+
+# Instrumentation modules left out of reported stacks
+INSTRUMENTATION_FILES = {
+    os.path.join(PROJECT_ROOT, 'utils', name)
+    for name in ('query_audit.py', 'metrics.py', 'compression.py', 'server_timing.py', 'profiling.py')
+}
+
+
+def exclude_from_stacks(filename):
+    """Hide an instrumentation module's frames from application_stack()"""
+    INSTRUMENTATION_FILES.add(os.path.abspath(filename))
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A route issued more SQL statements than it declared"""
+
+
+def normalize_statement(statement):
+    """Collapse literals, bind parameters and IN lists so repeated queries share a shape"""
+    shape = re.sub(r'\s+', ' ', statement.strip())
+    shape = re.sub(r"'(?:[^']|'')*'", '?', shape)
+    shape = re.sub(r'%\(\w+\)s|:\w+|\$\d+|%s', '?', shape)
+    shape = re.sub(r'\b\d+(\.\d+)?\b', '?', shape)
+    shape = re.sub(r'\(\s*\?(\s*,\s*\?)*\s*\)', '(?)', shape)
+    return shape
+
+
+def application_stack(limit=8):
+    """The innermost project frames (outside instrumentation modules) that led to a query"""
+    frames = []
+    for frame in traceback.extract_stack()[:-1]:
+        if frame.filename.startswith('<'):
+            continue  # <frozen ...>, <string>, <stdin>
+        filename = os.path.abspath(frame.filename)
+        if not filename.startswith(PROJECT_ROOT) or filename in INSTRUMENTATION_FILES:
+            continue
+        if f'{os.sep}site-packages{os.sep}' in filename:
+            continue
+        frames.append(f'{os.path.relpath(filename, PROJECT_ROOT)}:{frame.lineno} in {frame.name}')
+    return frames[-limit:]
+
+
+class QueryRecorder:
+    """Collects statements issued while active, grouped by normalized shape"""
+
+    def __init__(self, capture_stacks=True):
+        self.capture_stacks = capture_stacks
+        self.statements = []
+        self.shapes = {}  # shape -> {'count': n, 'stack': [...]} (stack of the first occurrence)
+
+    def __len__(self):
+        return len(self.statements)
+
+    def record(self, statement):
+        self.statements.append(statement)
+        shape = normalize_statement(statement)
+        entry = self.shapes.get(shape)
+        if entry is None:
+            self.shapes[shape] = {
+                'count': 1,
+                'stack': application_stack() if self.capture_stacks else []
+            }
+        else:
+            entry['count'] += 1
+
+    def repeated_shapes(self, threshold=N_PLUS_ONE_THRESHOLD):
+        """Shapes issued at least ``threshold`` times, most frequent first"""
+        repeated = [dict(shape=shape, **entry) for shape, entry in self.shapes.items()
+                    if entry['count'] >= threshold]
+        return sorted(repeated, key=lambda entry: -entry['count'])
+
+    def report(self):
+        return {
+            'total': len(self.statements),
+            'distinct_shapes': len(self.shapes),
+            'n_plus_one': self.repeated_shapes()
+        }
+
+
+def _active_recorders():
+    stack = getattr(_recorders, 'stack', None)
+    if stack is None:
+        stack = _recorders.stack = []
+    return stack
+
+
+@contextmanager
+def record_queries(capture_stacks=True):
+    """Record every statement issued on this thread, e.g. ``with record_queries() as q: ...``"""
+    recorder = QueryRecorder(capture_stacks)
+    _active_recorders().append(recorder)
+    try:
+        yield recorder
+    finally:
+        _active_recorders().remove(recorder)
+
+
+@contextmanager
+def assert_max_queries(budget):
+    """Fail a test block that issues more than ``budget`` statements"""
+    with record_queries() as recorder:
+        yield recorder
+    if len(recorder) > budget:
+        raise QueryBudgetExceeded(_budget_message('block', budget, recorder))
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    for recorder in _active_recorders():
+        recorder.record(statement)
+
+
+def query_budget(max_queries):
+    """Declare the maximum number of SQL statements a view may issue"""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def _budget_message(name, budget, recorder):
+    lines = [f'{name} issued {len(recorder)} queries (budget {budget})']
+    for entry in recorder.repeated_shapes():
+        lines.append(f"  {entry['count']}x {entry['shape'][:160]}")
+        lines.extend(f'      {frame}' for frame in entry['stack'])
+    return '\n'.join(lines)
+
+
+def init_query_audit(app):
+    """Install per-request recording when QUERY_AUDIT is enabled"""
+    app.config.setdefault('QUERY_AUDIT', os.environ.get('QUERY_AUDIT', '').lower() in ('1', 'true', 'yes'))
+    app.config.setdefault('QUERY_BUDGET_STRICT', os.environ.get('QUERY_BUDGET_STRICT', '').lower() in ('1', 'true', 'yes'))
+
+    if not app.config['QUERY_AUDIT']:
+        return
+
+    @app.before_request
+    def _start_query_audit():
+        g.query_audit_context = record_queries()
+        g.query_audit = g.query_audit_context.__enter__()
+
+    @app.after_request
+    def _finish_query_audit(response):
+        recorder = _stop_recording()
+        if recorder is None:
+            return response
+
+        response.headers['X-Query-Count'] = str(len(recorder))
+        for entry in recorder.repeated_shapes():
+            current_app.logger.warning(
+                'Possible N+1 in %s: %dx %s\n    %s', request.endpoint, entry['count'],
+                entry['shape'][:200], '\n    '.join(entry['stack']))
+
+        view = current_app.view_functions.get(request.endpoint)
+        budget = getattr(view, 'query_budget', None)
+        if budget is not None and len(recorder) > budget:
+            message = _budget_message(request.endpoint, budget, recorder)
+            if current_app.config['QUERY_BUDGET_STRICT']:
+                raise QueryBudgetExceeded(message)
+            current_app.logger.warning(message)
+        return response
+
+    @app.teardown_request
+    def _abandon_query_audit(exc):
+        _stop_recording()
+
+
+def _stop_recording():
+    if not has_request_context() or 'query_audit_context' not in g:
+        return None
+    context = g.pop('query_audit_context')
+    context.__exit__(None, None, None)
+    return g.query_audit
@@ -0,0 +1,29 @@
+# Deferred view and template filter registration for the application factory
+#
+# app.py declares its views at import, before any Flask app exists. They are
+# recorded here with Flask's decorator signatures and added to each app built
+# by create_app(), under the same endpoint names (url_for('index') etc.).
+
+
+class DeferredRoutes:
+    """Collects @route and @template_filter declarations for init_app()"""
+
+    def __init__(self):
+        self._deferred = []
+
+    def route(self, rule, **options):
+        def decorator(view):
+            endpoint = options.pop('endpoint', None)
+            self._deferred.append(lambda app: app.add_url_rule(rule, endpoint, view, **options))
+            return view
+        return decorator
+
+    def template_filter(self, name=None):
+        def decorator(f):
+            self._deferred.append(lambda app: app.add_template_filter(f, name=name))
+            return f
+        return decorator
+
+    def init_app(self, app):
+        for register in self._deferred:
+            register(app)
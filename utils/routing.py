@@ -0,0 +1,181 @@
+# Read replica routing for safe (GET/HEAD/OPTIONS) requests
+#
+# DATABASE_REPLICA_URLS lists replicas of DATABASE_URL (comma separated);
+# each becomes a Flask-SQLAlchemy bind named replica_<n>. RoutingSession
+# sends the reads of a safe request to one healthy replica, chosen at
+# request start, and everything else to the primary: flushes, DML
+# statements, Core writes on session.connection(), every read after the
+# session wrote, all unsafe requests, and work outside a request
+# (scheduler, CLIs).
+#
+# Read-your-writes: a request that wrote stamps the client's session cookie,
+# and that client's reads stay on the primary for DB_REPLICA_STICKY_SECONDS.
+#
+# Fallback: a replica is used only while its last health check (SELECT 1,
+# plus replay lag on PostgreSQL) passed within DB_REPLICA_CHECK_SECONDS.
+# Checks run on a background thread, so a dead replica never stalls a
+# request, and a connection error on a replica marks it down at once.
+# With every replica down or lagging, reads go to the primary.
+import random
+import threading
+import time
+
+from flask import g, has_request_context, request, session as client_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+
+from utils.engine import engine_options, register_engine
+from utils.metrics import Gauge, registry
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_KEY = '_primary_until'
+
+READ_ROUTES = registry.counter(
+    'db_read_routes_total', 'Safe requests by the database their reads went to', ('target',))
+
+# Seconds since the last replayed transaction, or 0 when the replica has
+# replayed everything it received (an idle primary is not lag)
+PG_REPLAY_LAG = text(
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END')
+
+
+def replica_binds(urls):
+    """SQLALCHEMY_BINDS entries for the replica URLs, each with its own engine profile"""
+    binds = {}
+    for index, url in enumerate(urls, 1):
+        key = f'replica_{index}'
+        binds[key] = dict(engine_options(url, role=key), url=url)
+    return binds
+
+
+class ReplicaMonitor:
+    """Cached health and lag per replica, refreshed in the background"""
+
+    def __init__(self, check_interval=2.0, max_lag=5.0):
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self._status = {}  # key -> {'ok', 'lag', 'error', 'checked_at'}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def check(self, key, engine):
+        """Run one health check now and store the result"""
+        started = time.perf_counter()
+        try:
+            with engine.connect() as connection:
+                if engine.dialect.name == 'postgresql':
+                    lag = float(connection.execute(PG_REPLAY_LAG).scalar() or 0)
+                else:
+                    connection.execute(text('SELECT 1'))
+                    lag = 0.0  # SQLite stand-ins have no replication
+            status = {'ok': lag <= self.max_lag, 'lag': round(lag, 3), 'error': None}
+        except Exception as e:
+            status = {'ok': False, 'lag': None, 'error': type(e).__name__}
+        status['latency_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        status['checked_at'] = time.monotonic()
+        with self._lock:
+            self._status[key] = status
+            self._refreshing.discard(key)
+        return status
+
+    def healthy(self, key, engine):
+        """Whether ``key`` may serve reads; starts a refresh when the status is stale"""
+        with self._lock:
+            status = self._status.get(key)
+            stale = status is None or time.monotonic() - status['checked_at'] >= self.check_interval
+            if stale and key not in self._refreshing:
+                self._refreshing.add(key)
+                threading.Thread(target=self.check, args=(key, engine),
+                                 name=f'replica-check-{key}', daemon=True).start()
+        # Unchecked replicas wait for their first check; expired ones keep
+        # serving on their last result until the refresh lands
+        return bool(status and status['ok'])
+
+    def mark_down(self, key, error):
+        with self._lock:
+            self._status[key] = {'ok': False, 'lag': None, 'error': error, 'checked_at': time.monotonic()}
+
+    def status(self):
+        with self._lock:
+            return {key: {k: v for k, v in entry.items() if k != 'checked_at'}
+                    for key, entry in self._status.items()}
+
+
+monitor = ReplicaMonitor()
+
+
+class RoutingSession(Session):
+    """Session sending a safe request's reads to its replica (g.db_replica)"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            # Flushes, DML, and session.connection() (how services issue
+            # Core writes) go to the primary, and so do the request's later reads
+            if self._flushing or getattr(clause, 'is_dml', False) or (mapper is None and clause is None):
+                g.db_wrote = True
+                g.db_replica = None
+            elif g.get('db_replica') is not None:
+                return self._db.engines[g.db_replica]
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+def choose_replica(db):
+    """Bind key of a healthy replica for this request, or None for the primary"""
+    engines = db.engines
+    keys = [key for key in engines if isinstance(key, str) and key.startswith('replica_')]
+    healthy = [key for key in keys if monitor.healthy(key, engines[key])]
+    return random.choice(healthy) if healthy else None
+
+
+def init_read_routing(app, db):
+    """Route safe requests' reads to DATABASE_REPLICA_URLS; no-op without replicas"""
+    if not app.config.get('SQLALCHEMY_BINDS'):
+        return
+    monitor.check_interval = app.config['DB_REPLICA_CHECK_SECONDS']
+    monitor.max_lag = app.config['DB_REPLICA_MAX_LAG_SECONDS']
+    sticky_seconds = app.config['DB_REPLICA_STICKY_SECONDS']
+
+    with app.app_context():
+        for key, engine in db.engines.items():
+            if isinstance(key, str) and key.startswith('replica_'):
+                register_engine(key, engine)
+                event.listen(engine, 'handle_error', _mark_down_on_disconnect(key))
+
+    @app.before_request
+    def _route_reads():
+        g.db_replica = None
+        g.db_wrote = False
+        if request.method not in SAFE_METHODS or request.endpoint in (None, 'static'):
+            return
+        if client_session.get(STICKY_KEY, 0) > time.time():
+            READ_ROUTES.inc(target='primary_sticky')
+            return
+        g.db_replica = choose_replica(db)
+        READ_ROUTES.inc(target='replica' if g.db_replica else 'primary_fallback')
+
+    @app.after_request
+    def _stick_after_write(response):
+        if g.get('db_wrote'):
+            client_session[STICKY_KEY] = time.time() + sticky_seconds
+        return response
+
+
+def _mark_down_on_disconnect(key):
+    def handle_error(context):
+        if context.is_disconnect or context.connection is None:
+            monitor.mark_down(key, type(context.original_exception).__name__)
+    return handle_error
+
+
+def _collect_replicas():
+    lag = Gauge('db_replica_lag_seconds', 'Replication lag at the last health check', ('replica',))
+    up = Gauge('db_replica_up', 'Whether the replica passed its last health check', ('replica',))
+    for key, status in monitor.status().items():
+        up.set(1 if status['ok'] else 0, replica=key)
+        if status['lag'] is not None:
+            lag.set(status['lag'], replica=key)
+    return [lag, up]
+
+
+registry.add_collector(_collect_replicas)
@@ -0,0 +1,82 @@
+# Server-Timing response headers with a per-stage breakdown
+#
+#     from utils.server_timing import stage
+#     with stage('ai-similar'):
+#         similar = ai_engine.get_similar_questions(id)
+#
+# Only a sampled fraction of requests (SERVER_TIMING_SAMPLE_RATE) collect
+# timings; for the rest stage() is a no-op apart from a flask.g lookup.
+from contextlib import contextmanager
+import os
+import random
+import time
+
+from flask import g, has_request_context, template_rendered, before_render_template
+from flask.json.provider import DefaultJSONProvider
+
+
+@contextmanager
+def stage(name):
+    """Accumulate the duration of the enclosed block under ``name`` for this request"""
+    timings = g.get('server_timing') if has_request_context() else None
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start)
+
+
+def format_header(timings):
+    """Render {stage: seconds} as a Server-Timing header value (durations in ms)"""
+    return ', '.join(f'{name};dur={seconds * 1000:.1f}' for name, seconds in timings.items())
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider that books serialization time under the 'serialize' stage"""
+
+    def dumps(self, obj, **kwargs):
+        with stage('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+def _template_started(sender, template, context, **extra):
+    if g.get('server_timing') is not None:
+        g.setdefault('server_timing_templates', []).append(time.perf_counter())
+
+
+def _template_finished(sender, template, context, **extra):
+    starts = g.get('server_timing_templates')
+    if starts:
+        timings = g.server_timing
+        timings['template-render'] = timings.get('template-render', 0.0) + (time.perf_counter() - starts.pop())
+
+
+def init_server_timing(app):
+    """Sample requests and attach a Server-Timing header to their responses"""
+    default_rate = '1.0' if app.debug else '0.1'
+    app.config.setdefault('SERVER_TIMING_SAMPLE_RATE', float(os.environ.get('SERVER_TIMING_SAMPLE_RATE', default_rate)))
+
+    app.json_provider_class = TimedJSONProvider
+    app.json = TimedJSONProvider(app)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+
+    @app.before_request
+    def _sample_server_timing():
+        if random.random() < app.config['SERVER_TIMING_SAMPLE_RATE']:
+            g.server_timing = {}
+            g.server_timing_start = time.perf_counter()
+
+    @app.after_request
+    def _add_server_timing(response):
+        timings = g.get('server_timing')
+        if timings is None:
+            return response
+        if 'metrics_db_time' in g:
+            timings = {'db': g.metrics_db_time, **timings}
+        timings['total'] = time.perf_counter() - g.server_timing_start
+        response.headers['Server-Timing'] = format_header(timings)
+        return response
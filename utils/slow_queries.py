@@ -0,0 +1,151 @@
+# Slow query log with EXPLAIN capture
+#
+# Statements slower than SLOW_QUERY_THRESHOLD_MS are aggregated by
+# normalized shape with redacted parameters, the originating route and the
+# project call site. The first time a shape turns up slow its plan is
+# captured with EXPLAIN QUERY PLAN (SQLite) or EXPLAIN (PostgreSQL).
+import os
+import threading
+import time
+
+from flask import current_app, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.query_audit import application_stack, exclude_from_stacks, normalize_statement
+
+exclude_from_stacks(__file__)
+
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+}
+
+
+def redact(parameters):
+    """Keep parameter structure and types, drop values"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return [redact(parameters[0]), f'... x{len(parameters)}']
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class SlowQueryLog:
+    """Aggregates slow statements by shape; thread-safe, bounded by ``max_shapes``"""
+
+    def __init__(self, threshold_ms=100.0, max_shapes=500):
+        self.threshold = threshold_ms / 1000.0
+        self.max_shapes = max_shapes
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._explaining = threading.local()
+
+    def record(self, conn, statement, parameters, elapsed, executemany):
+        shape = normalize_statement(statement)
+        route = request.endpoint if has_request_context() else None
+
+        with self._lock:
+            entry = self.entries.get(shape)
+            is_new = entry is None
+            if is_new:
+                if len(self.entries) >= self.max_shapes:
+                    # Evict the cheapest shape so the log stays bounded
+                    cheapest = min(self.entries, key=lambda s: self.entries[s]['total_ms'])
+                    del self.entries[cheapest]
+                entry = self.entries[shape] = {
+                    'shape': shape,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'routes': {},
+                    'call_site': application_stack(limit=4),
+                    'parameters': redact(parameters),
+                    'plan': None,
+                    'last_seen': None
+                }
+            entry['count'] += 1
+            entry['total_ms'] += elapsed * 1000
+            entry['max_ms'] = max(entry['max_ms'], elapsed * 1000)
+            entry['last_seen'] = time.time()
+            if route:
+                entry['routes'][route] = entry['routes'].get(route, 0) + 1
+
+        if is_new and not executemany:
+            entry['plan'] = self.explain(conn, statement, parameters)
+
+    def explain(self, conn, statement, parameters):
+        """Run EXPLAIN for the statement on the same connection; never raises or breaks its transaction"""
+        prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+        if prefix is None or not statement.lstrip().upper().startswith(('SELECT', 'WITH', 'UPDATE', 'DELETE')):
+            return None
+        # Runs inside the request's transaction; on PostgreSQL a failed
+        # statement aborts it, so EXPLAIN gets a savepoint to roll back to
+        savepoint = conn.dialect.name == 'postgresql'
+        self._explaining.active = True
+        try:
+            cursor = conn.connection.cursor()
+            try:
+                if savepoint:
+                    cursor.execute('SAVEPOINT slow_query_explain')
+                try:
+                    cursor.execute(prefix + statement, parameters)
+                    plan = [' | '.join(str(col) for col in row) for row in cursor.fetchall()]
+                except Exception:
+                    if savepoint:
+                        cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+                    raise
+                finally:
+                    if savepoint:
+                        cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+                return plan
+            finally:
+                cursor.close()
+        except Exception as e:
+            return [f'EXPLAIN failed: {e}']
+        finally:
+            self._explaining.active = False
+
+    def ranked(self, limit=50, route=None):
+        """Entries ordered by total time spent"""
+        with self._lock:
+            entries = [dict(entry, routes=dict(entry['routes'])) for entry in self.entries.values()]
+        if route:
+            entries = [entry for entry in entries if route in entry['routes']]
+        entries.sort(key=lambda entry: -entry['total_ms'])
+        for entry in entries:
+            entry['avg_ms'] = entry['total_ms'] / entry['count']
+        return entries[:limit]
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _check_duration(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('slow_query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if elapsed >= slow_query_log.threshold and not getattr(slow_query_log._explaining, 'active', False):
+        slow_query_log.record(conn, statement, parameters, elapsed, executemany)
+        if has_request_context():
+            current_app.logger.warning('Slow query (%.1f ms) in %s: %s', elapsed * 1000,
+                                       request.endpoint, normalize_statement(statement)[:200])
+
+
+def init_slow_query_log(app):
+    """Apply SLOW_QUERY_THRESHOLD_MS (default 100 ms) from config or env"""
+    app.config.setdefault('SLOW_QUERY_THRESHOLD_MS', float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100)))
+    slow_query_log.threshold = app.config['SLOW_QUERY_THRESHOLD_MS'] / 1000.0
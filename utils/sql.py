@@ -0,0 +1,16 @@
+# Dialect-aware SQL helpers
+#
+# Dialect modules are imported on first use: pulling in every PostgreSQL
+# extension type at import time showed up in cold-start profiles.
+
+
+def dialect_insert(bind, table):
+    """Return an INSERT construct supporting ON CONFLICT for the bind's dialect"""
+    name = bind.dialect.name
+    if name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert(table)
+    if name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert(table)
+    raise NotImplementedError(f'ON CONFLICT inserts are not supported on {name}')
@@ -0,0 +1,145 @@
+# Version stamps for cheap change detection
+#
+# Writes bump a small set of counters in the ``entity_version`` table
+# (``questions``, ``question:<id>``, ``tags``, ``tag_vocabulary``, ``users``,
+# ``badges``), so all workers see a consistent stamp. Flushes only collect
+# the keys; they are bumped once the session commits, in a short transaction
+# of their own. Bumping inside the writer's transaction held the row lock on
+# hot keys such as ``questions`` until commit, serializing every concurrent
+# writer on PostgreSQL. A rolled-back session bumps nothing.
+from datetime import datetime
+import logging
+
+from sqlalchemy import event, inspect, select
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'pending_version_keys'  # session.info entry
+
+# User columns that show up in API payloads (profile_views is bumped on reads)
+USER_VISIBLE_FIELDS = ('username', 'reputation', 'badge_level')
+
+
+def _attribute_changed(obj, name):
+    return inspect(obj).attrs[name].history.has_changes()
+
+
+def _answer_question_ids(connection, answer_ids):
+    """Resolve answer ids to question ids without touching the ORM"""
+    from app import Answer
+    if not answer_ids:
+        return set()
+    rows = connection.execute(
+        select(Answer.question_id).where(Answer.id.in_(answer_ids))
+    )
+    return {row[0] for row in rows}
+
+
+def collect_version_keys(session, connection):
+    """Work out which version keys the pending flush touches"""
+    keys = set()
+    vote_answer_ids = set()
+
+    for state, objects in (('new', session.new), ('dirty', session.dirty), ('deleted', session.deleted)):
+        for obj in objects:
+            if state == 'dirty' and not session.is_modified(obj):
+                continue
+            kind = type(obj).__name__
+
+            if kind == 'Question':
+                keys.update(['questions', 'tags', f'question:{obj.id}'])
+            elif kind == 'Answer':
+                keys.update(['questions', f'question:{obj.question_id}'])
+            elif kind == 'Vote':
+                keys.add('questions')
+                if obj.question_id:
+                    keys.add(f'question:{obj.question_id}')
+                if obj.answer_id:
+                    vote_answer_ids.add(obj.answer_id)
+            elif kind == 'Tag':
+                keys.update(['tags', 'tag_vocabulary'])
+            elif kind == 'TagKeyword':
+                keys.add('tag_vocabulary')
+            elif kind == 'User':
+                if state != 'dirty' or any(_attribute_changed(obj, f) for f in USER_VISIBLE_FIELDS):
+                    keys.add('users')
+            elif kind in ('Badge', 'UserBadge'):
+                keys.add('badges')
+
+    for question_id in _answer_question_ids(connection, vote_answer_ids):
+        keys.add(f'question:{question_id}')
+
+    return keys
+
+
+def bump_versions(connection, keys):
+    """Increment the given version keys, creating rows as needed"""
+    from app import EntityVersion
+    from utils.sql import dialect_insert
+
+    if not keys:
+        return
+
+    now = datetime.utcnow()
+    table = EntityVersion.__table__
+    for key in sorted(keys):  # stable order avoids lock inversion on PostgreSQL
+        stmt = dialect_insert(connection, table).values(key=key, version=1, updated_at=now)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={'version': table.c.version + 1, 'updated_at': now}
+        )
+        connection.execute(stmt)
+
+
+def _defer(session, keys):
+    if keys:
+        session.info.setdefault(PENDING_KEY, set()).update(keys)
+
+
+def touch(*keys):
+    """Bump version keys, when the session commits, for writes that bypass the ORM flush (bulk updates/deletes)"""
+    from app import db
+    session = db.session()
+    if not session.in_transaction():
+        session.begin()  # so the commit that follows fires after_commit
+    _defer(session, keys)
+
+
+def get_versions(keys):
+    """Return {key: (version, updated_at)} for the requested keys in one query"""
+    from app import EntityVersion, db
+
+    rows = db.session.execute(
+        select(EntityVersion.key, EntityVersion.version, EntityVersion.updated_at)
+        .where(EntityVersion.key.in_(list(keys)))
+    ).all()
+
+    versions = {key: (0, None) for key in keys}
+    for row in rows:
+        versions[row.key] = (row.version, row.updated_at)
+    return versions
+
+
+def track_entity_versions(db):
+    """Register the session listeners that keep version stamps current"""
+
+    @event.listens_for(db.session, 'after_flush')
+    def _collect_on_flush(session, flush_context):
+        _defer(session, collect_version_keys(session, session.connection()))
+
+    @event.listens_for(db.session, 'after_commit')
+    def _bump_after_commit(session):
+        keys = session.info.pop(PENDING_KEY, None)
+        if not keys:
+            return
+        try:
+            with db.engine.begin() as connection:
+                bump_versions(connection, keys)
+        except Exception:
+            # The write is committed; caches catch up on the next bump
+            logger.exception('Could not bump version keys %s', sorted(keys))
+
+    @event.listens_for(db.session, 'after_soft_rollback')
+    def _discard_on_rollback(session, previous_transaction):
+        if previous_transaction.parent is None:  # not a savepoint
+            session.info.pop(PENDING_KEY, None)
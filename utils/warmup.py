@@ -0,0 +1,91 @@
+# Process warm-up: build in-memory indexes before a worker takes traffic
+#
+# Each task builds something the request path would otherwise build lazily
+# on first use (the tag suggester automaton, the tag name -> id cache, the
+# AI engine singletons). serve.py runs them once in the gunicorn master when
+# preloading, so forked workers inherit the built structures, or in a
+# background thread of each worker otherwise. status() reports progress.
+import threading
+import time
+
+# name -> callable, in registration (and run) order
+tasks = {}
+_status = {}
+_started = False
+_lock = threading.Lock()
+
+
+def warmup_task(name):
+    """Register a warm-up step"""
+    def decorator(func):
+        tasks[name] = func
+        with _lock:
+            _status[name] = {'state': 'pending', 'seconds': None, 'error': None}
+        return func
+    return decorator
+
+
+def run_warmup(app):
+    """Run every task in an app context; failures are recorded, not raised"""
+    global _started
+    _started = True
+    with app.app_context():
+        for name, func in tasks.items():
+            with _lock:
+                _status[name] = {'state': 'running', 'seconds': None, 'error': None}
+            started = time.perf_counter()
+            try:
+                func()
+                state, error = 'ready', None
+            except Exception as e:
+                state, error = 'failed', str(e)
+                app.logger.warning('Warm-up task %s failed: %s', name, e)
+            with _lock:
+                _status[name] = {'state': state, 'seconds': round(time.perf_counter() - started, 3), 'error': error}
+    return status()
+
+
+def start_warmup(app):
+    """run_warmup() on a daemon thread so the worker can start accepting connections"""
+    thread = threading.Thread(target=run_warmup, args=(app,), name='warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def ensure_warmup(app):
+    """Start a background warm-up unless this process has already run or started one"""
+    global _started
+    with _lock:
+        if _started:
+            return None
+        _started = True
+    return start_warmup(app)
+
+
+def status():
+    with _lock:
+        return {name: dict(entry) for name, entry in _status.items()}
+
+
+def is_warm():
+    """True once every task has finished (a failed task falls back to lazy building)"""
+    with _lock:
+        return all(entry['state'] in ('ready', 'failed') for entry in _status.values())
+
+
+@warmup_task('ai_engines')
+def _ai_engines():
+    from utils.helpers import get_ai_engines
+    get_ai_engines()
+
+
+@warmup_task('tag_resolver')
+def _tag_resolver():
+    from services.tag_resolver import tag_resolver
+    tag_resolver.warm()
+
+
+@warmup_task('tag_suggester')
+def _tag_suggester():
+    from ai_features import tag_suggester
+    tag_suggester.build()